@@ -0,0 +1,249 @@
+import threading
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from app import models
+from app.countries import ALPHA3
+from app.money import apply_rate, to_units
+from app.rules import RULE_TABLE, CardType, calculate_discounts
+from app.summary import NO_BENEFIT
+
+"""
+===========================================================
+📈 Módulo: analytics.py
+===========================================================
+
+Analítica de descuentos en memoria, por columnas.
+
+- `PurchaseColumns` guarda `purchases` unida con `clients` como arrays
+  NumPy, una por campo (≈38 bytes por compra, sin objetos Python por fila):
+  tarjeta, beneficio y país van como códigos categóricos y el descuento se
+  calcula al cargar con `calculate_discounts` (vectorizada).
+- `refresh` es incremental: lee en bloques las compras con id mayor a la
+  marca de agua (`watermark`) menos una ventana de solapamiento (`overlap`)
+  y agrega al final las que no estaban cargadas. Los ids se asignan al
+  insertar pero se confirman en cualquier orden (Postgres: una transacción
+  con un id menor puede confirmar después de otra con uno mayor); la
+  ventana vuelve a mirar esos ids. Una compra que confirma cuando ya hay
+  más de `overlap` ids por encima de ella no se ve hasta `reset`. Las
+  compras no se modifican una vez insertadas.
+- `group_by` agrega con reducciones vectorizadas sobre la clave combinada
+  de las dimensiones pedidas (`np.bincount` para contar, `np.add.at` en
+  int64 para sumar).
+- Monto y descuento son centavos int64 y las sumas por grupo también: son
+  exactas hasta 2**63 centavos.
+
+Dimensiones: cardType, weekday (0=Lunes), benefit, country (alfa-3), scope
+(domestic/foreign).
+===========================================================
+"""
+
+COLUMNS = {
+    "id": "int64",
+    "client_id": "int32",
+    "day": "int32",       # días desde 1970-01-01
+    "weekday": "int8",
+    "card": "int8",       # índice en PurchaseColumns.card_types
+    "country": "int16",   # país de la compra, ISO numérico
+    "foreign": "bool",
+    "benefit": "int8",    # índice en RULE_TABLE.benefits
+    "amount": "int64",    # centavos
+    "discount": "int64",  # centavos
+}
+
+DIMENSIONS = ("cardType", "weekday", "benefit", "country", "scope")
+SCOPES = ("domestic", "foreign")
+
+
+class PurchaseColumns:
+    """Compras en columnas NumPy, actualizadas por marca de agua de id."""
+
+    def __init__(self, table=RULE_TABLE, chunk_size: int = 50_000, overlap: int = 1_000):
+        import numpy as np
+
+        self.table = table
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.size = 0
+        self.watermark = 0
+        self.card_types = [card.value for card in CardType]  # diccionario de la columna `card`
+        self._data = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._lock = threading.Lock()
+
+    # ---------- carga ----------
+
+    def _reserve(self, extra: int) -> None:
+        """Asegura capacidad para `extra` filas más (duplica al crecer)."""
+        import numpy as np
+
+        capacity = len(self._data["id"])
+        needed = self.size + extra
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity, 1024)
+        for name, column in self._data.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._data[name] = grown
+
+    def _encode_cards(self, cards):
+        """Códigos de `card_types` para una columna de tipos de tarjeta (agrega los nuevos)."""
+        import numpy as np
+
+        uniques, inverse = np.unique(np.asarray(cards, dtype=str), return_inverse=True)
+        for card in uniques:
+            if card not in self.card_types:
+                self.card_types.append(str(card))
+        mapping = np.array([self.card_types.index(card) for card in uniques], dtype=np.int8)
+        return mapping[inverse]
+
+    def append(self, rows: list) -> None:
+        """Agrega filas (id, client_id, amount, purchase_date, purchase_country, card_type, client_country)."""
+        import numpy as np
+
+        if not rows:
+            return
+        ids, client_ids, amounts, dates, countries, cards, client_countries = zip(*rows)
+        amount = np.array(amounts, dtype=np.int64)
+        day = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+        weekday = (day + 3) % 7  # 1970-01-01 fue jueves
+        country = np.array(countries, dtype=np.int16)
+        foreign = country != np.array(client_countries, dtype=np.int16)
+        card = self._encode_cards(cards)
+        rates, benefits = calculate_discounts(
+            {"card_type": cards, "amount": amount, "weekday": weekday, "foreign": foreign}, self.table
+        )
+
+        n = len(rows)
+        self._reserve(n)
+        chunk = {
+            "id": ids, "client_id": client_ids, "day": day, "weekday": weekday, "card": card,
+            "country": country, "foreign": foreign, "benefit": benefits,
+            "amount": amount, "discount": apply_rate(amount, rates),
+        }
+        for name, values in chunk.items():
+            self._data[name][self.size:self.size + n] = values
+        self.size += n
+        self.watermark = max(self.watermark, int(max(ids)))
+
+    def refresh(self, bind: Engine) -> int:
+        """
+        Carga las compras nuevas: relee desde `watermark - overlap` y
+        descarta los ids ya cargados.
+
+        Returns:
+            int: Compras agregadas.
+        """
+        with self._lock:
+            low = max(self.watermark - self.overlap, 0)
+            ids = self._data["id"][:self.size]
+            seen = set(ids[ids > low].tolist())
+            query = (
+                select(
+                    models.Purchase.id,
+                    models.Purchase.client_id,
+                    models.Purchase.amount,
+                    models.Purchase.purchase_date,
+                    models.Purchase.purchase_country,
+                    models.Client.card_type,
+                    models.Client.country,
+                )
+                .join(models.Client, models.Client.id == models.Purchase.client_id)
+                .where(models.Purchase.id > low)
+                .order_by(models.Purchase.id)
+            )
+            loaded = 0
+            with bind.connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(query)
+                for partition in result.partitions():
+                    rows = [row for row in partition if row[0] not in seen]
+                    self.append(rows)
+                    loaded += len(rows)
+            return loaded
+
+    def reset(self) -> None:
+        """Descarta lo cargado; el próximo `refresh` relee todo."""
+        with self._lock:
+            self.size = 0
+            self.watermark = 0
+
+    # ---------- consulta ----------
+
+    def columns(self) -> dict:
+        """Vista de las filas cargadas (las cargas posteriores no la modifican)."""
+        with self._lock:
+            return {name: column[:self.size] for name, column in self._data.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns().values())
+
+    def _dimension(self, name: str, cols: dict):
+        """(códigos, cantidad de valores posibles, etiqueta de cada código) de una dimensión."""
+        if name == "cardType":
+            cards = tuple(self.card_types)
+            return cols["card"], len(cards), cards.__getitem__
+        if name == "weekday":
+            return cols["weekday"], 7, int
+        if name == "benefit":
+            benefits = self.table.benefits
+            return cols["benefit"], len(benefits), lambda code: benefits[code] or NO_BENEFIT
+        if name == "country":
+            return cols["country"], 1000, lambda code: ALPHA3.get(code, str(code))
+        if name == "scope":
+            return cols["foreign"], 2, SCOPES.__getitem__
+        raise ValueError(f"Dimensión desconocida: {name}")
+
+    def group_by(self, dimensions: list[str], date_from: date | None = None, date_to: date | None = None) -> tuple[int, list[dict]]:
+        """
+        Compras, monto y descuento por combinación de `dimensions`.
+
+        Returns:
+            (int, list[dict]): compras consideradas y un grupo por combinación
+            con al menos una compra, en orden de códigos.
+        """
+        import numpy as np
+
+        cols = self.columns()
+        mask = None
+        if date_from is not None:
+            mask = cols["day"] >= np.datetime64(date_from, "D").astype(np.int64)
+        if date_to is not None:
+            before = cols["day"] < np.datetime64(date_to, "D").astype(np.int64)
+            mask = before if mask is None else mask & before
+        if mask is not None:
+            cols = {name: column[mask] for name, column in cols.items()}
+        dims = [self._dimension(name, cols) for name in dimensions]
+
+        sizes = [size for _, size, _ in dims] or [1]
+        if dims:
+            key = np.ravel_multi_index([codes.astype(np.intp) for codes, _, _ in dims], sizes)
+        else:
+            key = np.zeros(len(cols["id"]), dtype=np.intp)
+        length = int(np.prod(sizes))
+        counts = np.bincount(key, minlength=length)
+        # Sumas en int64 (`bincount` con pesos acumula en float64 y pierde centavos)
+        amounts = np.zeros(length, dtype=np.int64)
+        np.add.at(amounts, key, cols["amount"])
+        discounts = np.zeros(length, dtype=np.int64)
+        np.add.at(discounts, key, cols["discount"])
+
+        present = np.flatnonzero(counts)
+        codes = np.unravel_index(present, sizes)
+        groups = []
+        for i, slot in enumerate(present):
+            count = int(counts[slot])
+            group = {name: label(int(codes[d][i])) for d, (name, (_, _, label)) in enumerate(zip(dimensions, dims))}
+            group.update(
+                purchaseCount=count,
+                totalAmount=to_units(int(amounts[slot])),
+                totalDiscount=to_units(int(discounts[slot])),
+                avgDiscount=round(to_units(int(discounts[slot])) / count, 2),
+            )
+            groups.append(group)
+        return len(cols["id"]), groups
+
+
+purchase_columns = PurchaseColumns()
@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import func, select
+
+from app import models
+from app.money import apply_rate, to_units
+from app.rules import DISCOUNT_RULES, DiscountRule, RuleTable, calculate_discounts, compile_rules
+from app.summary import NO_BENEFIT
+
+"""
+===========================================================
+🧪 Módulo: backtest.py
+===========================================================
+
+Backtesting de reglas de descuento sobre el historial de compras: cuánto
+habría cambiado el descuento si `DISCOUNT_RULES` hubiera sido otro.
+
+- `purchases` se parte en rangos de id de `--chunk-size` y cada rango se
+  procesa en un pool de procesos (`--workers`, por defecto los núcleos).
+- Cada worker lee su rango (unido con `clients`), lo evalúa con
+  `calculate_discounts` (vectorizada) contra las reglas actuales y las
+  candidatas, y devuelve solo totales por tarjeta (descuentos en centavos,
+  sumas enteras exactas) y cambios de beneficio.
+- El proceso principal mantiene a lo sumo 2 rangos por worker en vuelo y
+  suma los totales: la memoria depende del tamaño del rango, no de la tabla.
+
+Reglas candidatas: JSON con la lista de reglas, con los campos de
+`DiscountRule` (`weekdays` como lista de días, 0=Lunes). Para partir de las
+reglas actuales:
+    python -m app.backtest dump-rules > candidate.json
+    python -m app.backtest run candidate.json --workers 8 --out backtest.json
+===========================================================
+"""
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+# ============================================================
+# 📄 Reglas candidatas
+# ============================================================
+
+def rules_to_json(rules: tuple[DiscountRule, ...]) -> list[dict]:
+    return [
+        {**rule._asdict(), "card_type": str(getattr(rule.card_type, "value", rule.card_type)), "weekdays": sorted(rule.weekdays)}
+        for rule in rules
+    ]
+
+
+def rules_from_json(data: list[dict]) -> tuple[DiscountRule, ...]:
+    """
+    Reglas desde su forma JSON.
+
+    Raises:
+        ValueError: Si falta un campo, sobra uno o `scope` no es válido.
+    """
+    rules = []
+    for i, item in enumerate(data):
+        if set(item) != set(DiscountRule._fields):
+            raise ValueError(f"Regla {i}: campos esperados {', '.join(DiscountRule._fields)}")
+        if item["scope"] not in ("foreign", "domestic", "any"):
+            raise ValueError(f"Regla {i}: scope inválido {item['scope']!r}")
+        rules.append(DiscountRule(**{**item, "weekdays": frozenset(item["weekdays"])}))
+    return tuple(rules)
+
+
+def load_rules(path: Path) -> tuple[DiscountRule, ...]:
+    return rules_from_json(json.loads(Path(path).read_text()))
+
+
+def compile_candidate(rules: tuple[DiscountRule, ...]) -> RuleTable:
+    """
+    Compila las reglas candidatas (también su versión NumPy) en el proceso
+    principal: un error sale aquí con su mensaje y no como un
+    `BrokenProcessPool` al inicializar los workers.
+    """
+    table = compile_rules(rules)
+    table.arrays
+    return table
+
+
+# ============================================================
+# 🧮 Evaluación de un rango
+# ============================================================
+
+def id_ranges(low: int | None, high: int | None, chunk_size: int) -> Iterator[tuple[int, int]]:
+    """Rangos [desde, hasta) de `chunk_size` ids que cubren [low, high]."""
+    if low is None:
+        return
+    for start in range(low, high + 1, chunk_size):
+        yield start, min(start + chunk_size, high + 1)
+
+
+def score_rows(rows, current: RuleTable, candidate: RuleTable) -> dict:
+    """
+    Totales de un bloque de filas (card_type, amount, purchase_date, purchase_country, client_country).
+
+    Returns:
+        dict: {"cards": {tarjeta: [compras, descuento actual, descuento candidato (centavos), compras con cambio]},
+               "benefits": Counter{(tarjeta, beneficio actual, beneficio candidato): compras}}
+    """
+    import numpy as np
+
+    result = {"cards": {}, "benefits": Counter()}
+    if not rows:
+        return result
+    cards, amounts, dates, countries, client_countries = zip(*rows)
+    card = np.asarray(cards, dtype=str)
+    amount = np.array(amounts, dtype=np.int64)
+    day = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+    batch = {
+        "amount": amount,
+        "weekday": (day + 3) % 7,  # 1970-01-01 fue jueves
+        "foreign": np.array(countries, dtype=np.int16) != np.array(client_countries, dtype=np.int16),
+    }
+    rate_now, code_now = calculate_discounts({**batch, "card_type": card}, current)
+    rate_new, code_new = calculate_discounts({**batch, "card_type": card}, candidate)
+    discount_now = apply_rate(amount, rate_now)
+    discount_new = apply_rate(amount, rate_new)
+
+    benefit_now = np.array([b or NO_BENEFIT for b in current.benefits], dtype=object)[code_now]
+    benefit_new = np.array([b or NO_BENEFIT for b in candidate.benefits], dtype=object)[code_new]
+    changed = (rate_now != rate_new) | (benefit_now != benefit_new)
+
+    uniques, inverse = np.unique(card, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(uniques))
+    # Descuentos sumados en int64 (`bincount` con pesos acumula en float64)
+    now = np.zeros(len(uniques), dtype=np.int64)
+    np.add.at(now, inverse, discount_now)
+    new = np.zeros(len(uniques), dtype=np.int64)
+    np.add.at(new, inverse, discount_new)
+    changes = np.bincount(inverse, weights=changed, minlength=len(uniques))
+    for i, name in enumerate(uniques):
+        result["cards"][str(name)] = [int(counts[i]), int(now[i]), int(new[i]), int(changes[i])]
+
+    for row in np.flatnonzero(benefit_now != benefit_new):
+        result["benefits"][(str(card[row]), benefit_now[row], benefit_new[row])] += 1
+    return result
+
+
+def merge(total: dict, part: dict) -> dict:
+    for card, values in part["cards"].items():
+        entry = total["cards"].setdefault(card, [0, 0, 0, 0])
+        for i, value in enumerate(values):
+            entry[i] += value
+    total["benefits"].update(part["benefits"])
+    return total
+
+
+# --- Estado de cada worker del pool ---
+_tables: tuple[RuleTable, RuleTable] | None = None
+
+
+def _init_worker(candidate_rules: tuple[DiscountRule, ...]) -> None:
+    global _tables
+    from app.database import dispose_after_fork
+
+    dispose_after_fork()
+    _tables = (compile_rules(DISCOUNT_RULES), compile_rules(candidate_rules))
+
+
+def score_range(bounds: tuple[int, int]) -> dict:
+    """Lee y evalúa las compras con id en [desde, hasta) (corre en un worker)."""
+    from app.database import engine
+
+    start, stop = bounds
+    query = (
+        select(
+            models.Client.card_type,
+            models.Purchase.amount,
+            models.Purchase.purchase_date,
+            models.Purchase.purchase_country,
+            models.Client.country,
+        )
+        .join(models.Client, models.Client.id == models.Purchase.client_id)
+        .where(models.Purchase.id >= start, models.Purchase.id < stop)
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(query).all()
+    return score_rows(rows, *_tables)
+
+
+def backtest(candidate_rules: tuple[DiscountRule, ...], workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Compara las reglas actuales con `candidate_rules` sobre todo `purchases`.
+
+    Returns:
+        dict: Totales combinados (ver `score_rows`) más "chunks" procesados.
+    """
+    from app.database import engine
+
+    workers = workers or os.cpu_count() or 1
+    total = {"cards": {}, "benefits": Counter(), "chunks": 0}
+    with engine.connect() as conn:
+        low, high = conn.execute(select(func.min(models.Purchase.id), func.max(models.Purchase.id))).one()
+    engine.dispose()  # los workers no heredan conexiones abiertas
+    ranges = id_ranges(low, high, chunk_size)
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(candidate_rules,)) as pool:
+        pending = set()
+        for bounds in ranges:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(total, future.result())
+                    total["chunks"] += 1
+            pending.add(pool.submit(score_range, bounds))
+        for future in pending:
+            merge(total, future.result())
+            total["chunks"] += 1
+    return total
+
+
+def report(total: dict) -> dict:
+    """Resultado en forma de JSON: por tarjeta y cambios de beneficio más frecuentes primero."""
+    cards = []
+    for card, (count, now, new, changed) in sorted(total["cards"].items()):
+        cards.append({
+            "cardType": card,
+            "purchaseCount": count,
+            "currentDiscount": to_units(now),
+            "candidateDiscount": to_units(new),
+            "discountDelta": to_units(new - now),
+            "changedPurchases": changed,
+        })
+    benefits = [
+        {"cardType": card, "from": before, "to": after, "purchaseCount": count}
+        for (card, before, after), count in total["benefits"].most_common()
+    ]
+    return {
+        "purchaseCount": sum(c["purchaseCount"] for c in cards),
+        "discountDelta": to_units(sum(new - now for _, now, new, _ in total["cards"].values())),
+        "cards": cards,
+        "benefitChanges": benefits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtesting de reglas de descuento sobre el historial de compras")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("dump-rules", help="Imprime las reglas actuales en JSON")
+    run = commands.add_parser("run", help="Compara las reglas actuales con las de un archivo JSON")
+    run.add_argument("rules", type=Path, help="Reglas candidatas (JSON)")
+    run.add_argument("--workers", type=int, default=None, help="Procesos (por defecto los núcleos de la CPU)")
+    run.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Ids por rango")
+    run.add_argument("--out", type=Path, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    if args.command == "dump-rules":
+        print(json.dumps(rules_to_json(DISCOUNT_RULES), ensure_ascii=False, indent=2))
+        return
+
+    try:
+        candidate = load_rules(args.rules)
+        compile_candidate(candidate)
+    except (OSError, ValueError, TypeError, ArithmeticError) as e:
+        sys.exit(f"❌ Reglas candidatas inválidas: {e}")
+
+    result = report(backtest(candidate, args.workers, args.chunk_size))
+    for card in result["cards"]:
+        print(f"{card['cardType']:>10}: {card['purchaseCount']:>9} compras  "
+              f"{card['currentDiscount']:>14.2f} → {card['candidateDiscount']:>14.2f}  "
+              f"Δ {card['discountDelta']:>+13.2f}  ({card['changedPurchases']} con cambio)")
+    for change in result["benefitChanges"][:10]:
+        print(f"  {change['cardType']}: {change['from']} → {change['to']}: {change['purchaseCount']}")
+    print(f"✅ {result['purchaseCount']} compras, Δ descuento total {result['discountDelta']:+.2f}")
+
+    if args.out:
+        args.out.write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
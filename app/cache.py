@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+
+"""
+===========================================================
+🧠 Módulo: cache.py
+===========================================================
+
+Cachés en memoria (por proceso) para la ruta caliente de compras.
+
+- `TTLCache` → LRU con límite de tamaño y expiración por TTL.
+- `client_cache` → perfiles de cliente con solo los campos que usan las reglas
+  (`card_type`, `country`), llenada por lectura y por `register_client`.
+===========================================================
+"""
+
+
+class ClientProfile(NamedTuple):
+    id: int
+    card_type: str
+    country: int  # código ISO numérico
+
+
+class TTLCache:
+    """LRU con límite de tamaño y TTL, seguro entre hilos. `maxsize=0` la desactiva."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+client_cache = TTLCache(settings.CLIENT_CACHE_SIZE, settings.CLIENT_CACHE_TTL_SECONDS)
+
+
+def cache_client(client: models.Client | ClientProfile) -> ClientProfile:
+    """Guarda (o reemplaza) el perfil de un cliente recién leído o escrito."""
+    profile = ClientProfile(client.id, client.card_type, client.country)
+    client_cache.put(client.id, profile)
+    return profile
+
+
+def load_client_profile(db: Session, client_id: int) -> ClientProfile | None:
+    """Lee el perfil de la base de datos y lo deja en caché (sin consultar la caché)."""
+    client = db.query(models.Client).filter(models.Client.id == client_id).first()
+    if client is None:
+        return None
+    return cache_client(client)
+
+
+def get_client_profile(db: Session, client_id: int) -> ClientProfile | None:
+    """Perfil del cliente desde la caché; si no está, lo lee de la base de datos."""
+    profile = client_cache.get(client_id)
+    if profile is not None:
+        return profile
+    return load_client_profile(db, client_id)
+
+
+async def aget_client_profile(db: AsyncSession, client_id: int) -> ClientProfile | None:
+    """Versión asíncrona de `get_client_profile` (la consulta corre vía `run_sync`)."""
+    profile = client_cache.get(client_id)
+    if profile is not None:
+        return profile
+    return await db.run_sync(load_client_profile, client_id)
+
+
+def get_client_profiles(db: Session, client_ids: set[int]) -> dict[int, ClientProfile]:
+    """Perfiles de varios clientes; los que faltan se leen con una sola consulta `IN`."""
+    profiles = {}
+    missing = set()
+    for client_id in client_ids:
+        profile = client_cache.get(client_id)
+        if profile is None:
+            missing.add(client_id)
+        else:
+            profiles[client_id] = profile
+
+    if missing:
+        for client in db.query(models.Client).filter(models.Client.id.in_(missing)):
+            profiles[client.id] = cache_client(client)
+    return profiles
@@ -1,12 +1,55 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    DATABASE_URL: str
-    JWT_SECRET: str
-    JWT_ALGORITHM: str
+    DATABASE_URL: str = "sqlite:///./vise_db.db"
+    JWT_SECRET: str | None = None
+    JWT_ALGORITHM: str | None = None
+
+    # Caché en memoria de perfiles de cliente (0 = desactivada)
+    CLIENT_CACHE_SIZE: int = 10_000
+    CLIENT_CACHE_TTL_SECONDS: float = 300.0
+
+    # Perfil del motor de base de datos (pool de conexiones)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # segundos, -1 = nunca
+    DB_STATEMENT_CACHE_SIZE: int = 500
+
+    # Escritura agrupada de compras (group commit)
+    PURCHASE_GROUP_COMMIT: bool = False
+    GROUP_COMMIT_MAX_ROWS: int = 256
+    GROUP_COMMIT_MAX_DELAY_MS: float = 2.0
+
+    # Claves de idempotencia de /purchase: ventana de reintentos y LRU en memoria (0 = sin LRU)
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 3600
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+
+    # PRAGMAs aplicados a cada conexión SQLite
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64_000  # negativo = KiB
+
+    # Trazas: "off" (sin instrumentar), "sampled" (muestreo por razón respetando al padre)
+    # o "full" (todas). Las compras rechazadas se trazan siempre que haya trazas.
+    TRACING_PROFILE: Literal["off", "sampled", "full"] = "sampled"
+    TRACING_SAMPLE_RATIO: float = 0.1
+    TRACING_EXCLUDED_URLS: str = "^[^/]*//[^/]+/$,/db/pool$,/cache/clients$,/docs,/openapi.json$"
+
+    # Perfilado por request (`Server-Timing` por fases, ver app/profiling.py); desactivado no
+    # instala nada. Captura cProfile de una fracción de requests o de los que traen `X-Profile: 1`.
+    PROFILING_ENABLED: bool = False
+    PROFILING_CPROFILE_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = "./profiles"
 
     model_config = {
-        "env_file": ".env"
+        "env_file": ".env",
+        "extra": "ignore",
     }
 
 settings = Settings()
@@ -0,0 +1,62 @@
+from typing import NamedTuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.idempotency import StoredResponse, save_responses
+from app.summary import apply_purchases
+
+"""
+===========================================================
+💾 Módulo: crud.py
+===========================================================
+
+Escrituras compartidas por los routers, el escritor agrupado y el modo
+asíncrono (vía `AsyncSession.run_sync`).
+
+- Los ids se obtienen en la misma sentencia (`INSERT ... RETURNING`,
+  SQLite ≥ 3.35 y Postgres): no hace falta `refresh()` después del commit.
+- Ninguna función hace commit; la transacción la controla quien llama.
+- Cada compra insertada actualiza `client_spend_summary` en la misma transacción.
+- Las compras con `Idempotency-Key` insertan su respuesta en la misma transacción.
+===========================================================
+"""
+
+
+def create_client(db: Session, values: dict) -> int:
+    """Inserta un cliente y devuelve su id."""
+    return db.scalar(insert(models.Client).returning(models.Client.id), values)
+
+
+class PurchaseRecord(NamedTuple):
+    """Compra aprobada: columnas de `purchases` más el descuento y beneficio calculados."""
+    values: dict
+    discount: int  # centavos
+    benefit: str | None
+    idempotency: tuple[str, StoredResponse] | None = None  # (clave, respuesta)
+
+
+def create_purchases(db: Session, purchases: list[PurchaseRecord], return_ids: bool = True) -> list[int]:
+    """
+    Inserta compras en bloque, actualiza su resumen y devuelve los ids en el mismo orden.
+
+    Con `return_ids=False` se usa un executemany simple: garantizar el orden de
+    RETURNING obliga a SQLite a insertar fila por fila.
+    """
+    if not purchases:
+        return []
+    rows = [p.values for p in purchases]
+    if return_ids:
+        ids = db.scalars(
+            insert(models.Purchase).returning(models.Purchase.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+    else:
+        db.execute(insert(models.Purchase), rows)
+        ids = []
+    apply_purchases(db, purchases)
+    keys = [p.idempotency for p in purchases if p.idempotency is not None]
+    if keys:
+        save_responses(db, keys)
+    return ids
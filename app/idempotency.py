@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import time
+from typing import Annotated, NamedTuple
+
+from fastapi import Header
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.cache import TTLCache
+from app.config import settings
+
+"""
+===========================================================
+🔁 Módulo: idempotency.py
+===========================================================
+
+Reintentos seguros de `POST /purchase` con la cabecera `Idempotency-Key`.
+
+- La primera respuesta de cada clave se guarda (estado y bytes del cuerpo) y
+  un reintento la recibe tal cual, sin volver a validar, calcular el
+  descuento ni insertar. Lleva la cabecera `Idempotent-Replayed: true`.
+- Compras aprobadas → fila en `idempotency_keys`, insertada en la misma
+  transacción que la compra (también con el escritor agrupado): si el commit
+  falla no queda ni la compra ni la clave.
+- Rechazos → solo en la LRU en memoria: no escriben nada, así que un
+  reintento atendido por otro proceso simplemente vuelve a evaluarse.
+- `idempotency_cache` (LRU con TTL) evita la lectura de la tabla en los
+  reintentos que llegan al mismo proceso.
+- Una clave reutilizada con otra compra responde 422.
+- Dos requests simultáneos con la misma clave: el segundo INSERT choca con la
+  clave primaria, se deshace su transacción y se responde lo guardado.
+- Las claves vencen a los `IDEMPOTENCY_TTL_SECONDS`. Una clave vencida se
+  puede reutilizar; las filas vencidas se borran con:
+    python -m app.idempotency purge
+===========================================================
+"""
+
+IdempotencyKeyHeader = Annotated[
+    str | None,
+    Header(
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Clave única por compra; los reintentos con la misma clave reciben la respuesta original.",
+    ),
+]
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: bytes
+    expires_at: float  # epoch, segundos
+
+
+idempotency_cache = TTLCache(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+def fingerprint(data: BaseModel) -> str:
+    """Huella del cuerpo del request: detecta una clave reutilizada con otra compra."""
+    return hashlib.sha256(data.model_dump_json().encode()).hexdigest()
+
+
+def stored(fingerprint: str, response: Response) -> StoredResponse:
+    """Respuesta a guardar para una clave, con vencimiento desde ahora."""
+    return StoredResponse(fingerprint, response.status_code, bytes(response.body), time.time() + settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+def remember(key: str, response: StoredResponse) -> None:
+    idempotency_cache.put(key, response)
+
+
+def _fresh(response: StoredResponse | None) -> StoredResponse | None:
+    if response is None or response.expires_at <= time.time():
+        return None
+    return response
+
+
+def load(db: Session, key: str) -> StoredResponse | None:
+    """Lee una clave vigente de la tabla (sin consultar la LRU) y la deja en la LRU."""
+    row = db.execute(
+        select(
+            models.IdempotencyKey.fingerprint,
+            models.IdempotencyKey.status_code,
+            models.IdempotencyKey.body,
+            models.IdempotencyKey.expires_at,
+        ).where(models.IdempotencyKey.key == key, models.IdempotencyKey.expires_at > time.time())
+    ).first()
+    if row is None:
+        return None
+    response = StoredResponse(*row)
+    remember(key, response)
+    return response
+
+
+def lookup(db: Session, key: str) -> StoredResponse | None:
+    """Respuesta guardada de una clave vigente: LRU → tabla."""
+    response = _fresh(idempotency_cache.get(key))
+    if response is not None:
+        return response
+    return load(db, key)
+
+
+async def alookup(db: AsyncSession, key: str) -> StoredResponse | None:
+    """Versión asíncrona de `lookup` (la consulta corre vía `run_sync`)."""
+    response = _fresh(idempotency_cache.get(key))
+    if response is not None:
+        return response
+    return await db.run_sync(load, key)
+
+
+def replay(response: StoredResponse, fingerprint: str) -> Response:
+    """Respuesta original de la clave, o 422 si la clave llega con otra compra."""
+    if response.fingerprint != fingerprint:
+        return ORJSONResponse(
+            status_code=422,
+            content={"status": "Rejected", "error": "Idempotency-Key ya usada con otra compra"},
+        )
+    return Response(
+        response.body,
+        status_code=response.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def save_responses(db: Session, responses: list[tuple[str, StoredResponse]]) -> None:
+    """
+    Inserta las claves en la transacción de `db` (sin commit).
+
+    Antes borra las filas vencidas de esas mismas claves para que puedan
+    reutilizarse; una clave vigente hace fallar el INSERT con IntegrityError.
+    """
+    keys = [key for key, _ in responses]
+    db.execute(
+        delete(models.IdempotencyKey).where(
+            models.IdempotencyKey.key.in_(keys), models.IdempotencyKey.expires_at <= time.time()
+        )
+    )
+    db.execute(insert(models.IdempotencyKey), [
+        {
+            "key": key,
+            "fingerprint": response.fingerprint,
+            "status_code": response.status_code,
+            "body": response.body,
+            "expires_at": response.expires_at,
+        }
+        for key, response in responses
+    ])
+
+
+def purge_expired(db: Session) -> int:
+    """Borra las claves vencidas y devuelve cuántas eran."""
+    deleted = db.execute(
+        delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at <= time.time())
+    ).rowcount
+    db.commit()
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de idempotency_keys")
+    parser.add_argument("command", choices=["purge"])
+    parser.parse_args()
+
+    from app.database import SessionLocal
+    from app.migrate import migrate
+
+    migrate()
+    with SessionLocal() as db:
+        deleted = purge_expired(db)
+    print(f"✅ {deleted} claves de idempotencia vencidas eliminadas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import codecs
+import csv
+import tempfile
+from typing import AsyncIterator, Callable, Iterator
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+
+from app import countries, money
+from app.rules import CardType, validate_client, validate_clients
+
+"""
+===========================================================
+📥 Módulo: importer.py
+===========================================================
+
+Alta masiva de clientes desde un cuerpo CSV o NDJSON recibido en streaming.
+
+- El cuerpo se decodifica y se parte en líneas de forma incremental
+  (un registro por línea; en CSV la primera línea es el encabezado).
+- Las filas se agrupan en bloques de `chunk_size`; cada bloque se valida
+  con `validate_clients` (vectorizada) y las filas válidas se insertan en
+  bloque con su propio commit.
+- Una línea de más de `MAX_LINE_LENGTH` caracteres se descarta mientras
+  llega y cuenta como rechazo de formato: la memoria no depende del largo
+  de una línea.
+- Los rechazos se escriben como NDJSON en un archivo temporal en disco
+  (`SpooledTemporaryFile`): la memoria depende del bloque, no del archivo.
+
+Campos por fila: name, country, monthlyIncome, viseClub, cardType.
+El país se normaliza a su código ISO numérico (`app.countries`); uno
+desconocido es un rechazo de formato. El ingreso se guarda en centavos
+(`app.money`); más de dos decimales también es un rechazo de formato.
+===========================================================
+"""
+
+IMPORT_CHUNK_SIZE = 5_000
+CLIENT_FIELDS = ("name", "country", "monthlyIncome", "viseClub", "cardType")
+CARD_TYPES = {card.value for card in CardType}
+TRUE_VALUES = {"true", "1", "yes", "si", "sí"}
+FALSE_VALUES = {"false", "0", "no", ""}
+MAX_LINE_LENGTH = 64 * 1024  # caracteres por registro
+LINE_TOO_LONG = object()     # marca de `iter_lines` para una línea descartada
+
+
+class LineSplitter:
+    """
+    Parte texto en líneas a medida que llega, guardando solo la línea en curso.
+
+    Una línea de más de `max_length` caracteres se descarta mientras llega
+    (no se acumula) y se entrega como `LINE_TOO_LONG`.
+    """
+
+    def __init__(self, max_length: int = MAX_LINE_LENGTH):
+        self.max_length = max_length
+        self.parts: list[str] = []
+        self.size = 0
+        self.too_long = False
+
+    def _end_line(self, last: str):
+        if self.too_long or self.size + len(last) > self.max_length:
+            line = LINE_TOO_LONG
+        else:
+            line = ("".join(self.parts) + last).rstrip("\r")
+        self.parts.clear()
+        self.size = 0
+        self.too_long = False
+        return line
+
+    def _keep(self, text: str) -> None:
+        if self.too_long or not text:
+            return
+        self.size += len(text)
+        if self.size > self.max_length:
+            self.too_long = True
+            self.parts.clear()
+        else:
+            self.parts.append(text)
+
+    def feed(self, text: str) -> list:
+        """Líneas completas que cierra `text` (solo se parte el texto nuevo)."""
+        *complete, rest = text.split("\n")
+        lines = [self._end_line(piece) for piece in complete]
+        self._keep(rest)
+        return lines
+
+    def close(self) -> list:
+        return [self._end_line("")] if self.parts or self.too_long else []
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_length: int = MAX_LINE_LENGTH) -> AsyncIterator[str | object]:
+    """
+    Convierte bloques de bytes en líneas de texto UTF-8 sin cargar todo el cuerpo;
+    las líneas de más de `max_length` caracteres salen como `LINE_TOO_LONG`.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    splitter = LineSplitter(max_length)
+    async for chunk in chunks:
+        for line in splitter.feed(decoder.decode(chunk)):
+            yield line
+    for line in splitter.feed(decoder.decode(b"", final=True)) + splitter.close():
+        yield line
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Produce (número de fila, registro crudo, error de formato) por cada línea no vacía."""
+    header = None
+    row = 0
+    async for line in lines:
+        if line is LINE_TOO_LONG:
+            row += 1
+            yield row, None, f"Línea de más de {MAX_LINE_LENGTH} caracteres"
+            continue
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            row += 1
+            if len(values) != len(header):
+                yield row, None, f"Se esperaban {len(header)} columnas y llegaron {len(values)}"
+                continue
+            yield row, dict(zip(header, values)), None
+        else:
+            row += 1
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                yield row, None, "JSON inválido"
+                continue
+            if not isinstance(record, dict):
+                yield row, None, "Se esperaba un objeto JSON"
+                continue
+            yield row, record, None
+
+
+def parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def parse_client(record: dict) -> tuple[dict | None, str | None]:
+    """Convierte un registro crudo a columnas de `clients`, o devuelve el error de formato."""
+    missing = [f for f in CLIENT_FIELDS if record.get(f) in (None, "")]
+    if missing:
+        return None, f"Faltan campos: {', '.join(missing)}"
+    card_type = str(record["cardType"]).strip()
+    if card_type not in CARD_TYPES:
+        return None, f"Tipo de tarjeta inválido: {card_type}"
+    country = countries.lookup(str(record["country"]))
+    if country is None:
+        return None, f"País desconocido: {str(record['country']).strip()}"
+    try:
+        income = money.to_cents(record["monthlyIncome"])
+    except (ValueError, ArithmeticError):  # ArithmeticError: errores de `decimal`
+        return None, "monthlyIncome no es un monto válido"
+    try:
+        vise_club = parse_bool(record["viseClub"])
+    except ValueError:
+        return None, "viseClub no es booleano"
+    return {
+        "name": str(record["name"]).strip(),
+        "country": country,
+        "monthly_income": income,
+        "vise_club": vise_club,
+        "card_type": card_type,
+    }, None
+
+
+def validate_chunk(chunk: list[tuple[int, dict | None, str | None]]) -> tuple[list[dict], list[tuple[int, str]]]:
+    """
+    Separa un bloque en filas válidas y rechazos, conservando el orden de entrada.
+
+    Las filas con error de formato llegan con `values=None`; el resto pasa por
+    `validate_clients` y solo las rechazadas repiten `validate_client` para el mensaje.
+    """
+    parsed = [(row, values) for row, values, error in chunk if error is None]
+    ok = validate_clients({
+        "card_type": [values["card_type"] for _, values in parsed],
+        "income": [values["monthly_income"] for _, values in parsed],
+        "vise_club": [values["vise_club"] for _, values in parsed],
+        "country": [values["country"] for _, values in parsed],
+    }) if parsed else []
+    passed = {row for (row, _), good in zip(parsed, ok) if good}
+
+    valid, rejected = [], []
+    for row, values, error in chunk:
+        if error is not None:
+            rejected.append((row, error))
+        elif row in passed:
+            valid.append(values)
+        else:
+            _, msg = validate_client(values["card_type"], values["monthly_income"], values["vise_club"], values["country"])
+            rejected.append((row, msg))
+    return valid, rejected
+
+
+async def import_clients(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    insert_rows: Callable[[list[dict]], None],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> tuple[dict, tempfile.SpooledTemporaryFile]:
+    """
+    Importa clientes desde `chunks` e inserta cada bloque válido con `insert_rows`
+    (se ejecuta en el threadpool).
+
+    Returns:
+        (dict, SpooledTemporaryFile): resumen y rechazos en NDJSON, posicionado al inicio.
+    """
+    rejections = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    received = imported = rejected = 0
+    pending: list[tuple[int, dict | None, str | None]] = []
+
+    async def flush() -> None:
+        nonlocal imported, rejected
+        valid, invalid = validate_chunk(pending)
+        for row, error in invalid:
+            rejections.write(orjson.dumps({"row": row, "status": "Rejected", "error": error}) + b"\n")
+        rejected += len(invalid)
+        if valid:
+            await run_in_threadpool(insert_rows, valid)
+            imported += len(valid)
+        pending.clear()
+
+    async for row, record, error in iter_records(iter_lines(chunks), fmt):
+        received += 1
+        values = None
+        if error is None:
+            values, error = parse_client(record)
+        pending.append((row, values, error))
+        if len(pending) >= chunk_size:
+            await flush()
+    if pending:
+        await flush()
+
+    rejections.seek(0)
+    summary = {"status": "Completed", "received": received, "imported": imported, "rejected": rejected}
+    return summary, rejections
+
+
+def iter_import_response(summary: dict, rejections, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Cuerpo NDJSON de la respuesta: primero el resumen y luego cada rechazo."""
+    try:
+        yield orjson.dumps(summary) + b"\n"
+        while block := rejections.read(block_size):
+            yield block
+    finally:
+        rejections.close()
@@ -0,0 +1,161 @@
+import time
+
+from opentelemetry import metrics
+
+from app import profiling
+
+"""
+===========================================================
+📈 Módulo: metrics.py
+===========================================================
+
+Métricas de negocio (OpenTelemetry) del flujo de registro y compras.
+
+Los instrumentos se crean una sola vez con el `MeterProvider` global: sin
+proveedor son no-op y, cuando `setup_otel` lo registra, la API los enlaza
+al proveedor real. Los atributos son de baja cardinalidad (tarjeta,
+estado, motivo, operación) y se arman una vez y se reutilizan: registrar
+un valor en la ruta caliente no crea diccionarios nuevos.
+
+Instrumentos:
+- vise.purchases (counter) → compras por status, card_type y reason.
+- vise.client.registrations (counter) → altas por status y card_type.
+- vise.purchase.discount_rate (histogram) → tasa aplicada por card_type.
+- vise.rules.calculate_discount.duration (histogram, s) → `calculate_discount`.
+- vise.db.commit.duration (histogram, s) → commits por operation.
+- vise.client_cache.utilization / vise.client_cache.hit_ratio (gauges).
+- vise.db.pool.utilization (gauge) → conexiones en uso / máximo del pool.
+===========================================================
+"""
+
+# Motivos de rechazo de compras (atributo `reason`)
+CLIENT_NOT_FOUND = "client_not_found"
+BANNED_COUNTRY = "banned_country"
+
+meter = metrics.get_meter("vise-api")
+
+PURCHASES = meter.create_counter(
+    "vise.purchases", unit="{purchase}", description="Compras evaluadas por resultado"
+)
+CLIENT_REGISTRATIONS = meter.create_counter(
+    "vise.client.registrations", unit="{client}", description="Registros de clientes por resultado"
+)
+DISCOUNT_RATE = meter.create_histogram(
+    "vise.purchase.discount_rate", unit="1", description="Tasa de descuento de las compras aprobadas"
+)
+DISCOUNT_DURATION = meter.create_histogram(
+    "vise.rules.calculate_discount.duration", unit="s", description="Duración de calculate_discount"
+)
+COMMIT_DURATION = meter.create_histogram(
+    "vise.db.commit.duration", unit="s", description="Duración de los commits de base de datos"
+)
+
+# Atributos ya armados, indexados por valor (card_type, motivo...): la ruta
+# caliente solo hace búsquedas en diccionarios. Cada combinación se arma la
+# primera vez que aparece; la cardinalidad está acotada por tarjetas y motivos.
+_approved: dict[str, dict] = {}
+_rejected: dict[str, dict[str | None, dict]] = {}
+_by_card: dict[str, dict] = {}
+_registrations: dict[bool, dict[str, dict]] = {True: {}, False: {}}
+
+
+def record_approved_purchase(card_type: str, rate: float) -> None:
+    attrs = _approved.get(card_type)
+    if attrs is None:
+        attrs = _approved.setdefault(card_type, {"status": "approved", "card_type": card_type})
+    PURCHASES.add(1, attrs)
+
+    card_attrs = _by_card.get(card_type)
+    if card_attrs is None:
+        card_attrs = _by_card.setdefault(card_type, {"card_type": card_type})
+    DISCOUNT_RATE.record(rate, card_attrs)
+
+
+def record_rejected_purchase(card_type: str | None, reason: str) -> None:
+    by_card = _rejected.get(reason)
+    if by_card is None:
+        by_card = _rejected.setdefault(reason, {})
+    attrs = by_card.get(card_type)
+    if attrs is None:
+        attrs = by_card.setdefault(
+            card_type, {"status": "rejected", "card_type": card_type or "unknown", "reason": reason}
+        )
+    PURCHASES.add(1, attrs)
+
+
+def record_registration(card_type: str, approved: bool) -> None:
+    by_card = _registrations[approved]
+    attrs = by_card.get(card_type)
+    if attrs is None:
+        attrs = by_card.setdefault(
+            card_type, {"status": "registered" if approved else "rejected", "card_type": card_type}
+        )
+    CLIENT_REGISTRATIONS.add(1, attrs)
+
+
+# Atributos de `vise.db.commit.duration` por operación
+COMMIT_CLIENT = {"operation": "client"}
+COMMIT_CLIENT_IMPORT = {"operation": "client_import"}
+COMMIT_PURCHASE = {"operation": "purchase"}
+COMMIT_PURCHASE_BATCH = {"operation": "purchase_batch"}
+COMMIT_GROUP = {"operation": "group_commit"}
+
+
+def timed_commit(db, operation: dict) -> None:
+    """`db.commit()` registrando su duración."""
+    start = time.perf_counter()
+    db.commit()
+    elapsed = time.perf_counter() - start
+    COMMIT_DURATION.record(elapsed, operation)
+    profiling.record("commit", elapsed)
+
+
+async def atimed_commit(db, operation: dict) -> None:
+    """Versión asíncrona de `timed_commit` para `AsyncSession`."""
+    start = time.perf_counter()
+    await db.commit()
+    elapsed = time.perf_counter() - start
+    COMMIT_DURATION.record(elapsed, operation)
+    profiling.record("commit", elapsed)
+
+
+# ============================================================
+# 📊 Gauges observables (se leen al exportar, no en cada request)
+# ============================================================
+
+def _observe_client_cache(options):
+    from app.cache import client_cache
+
+    stats = client_cache.stats()
+    if stats["maxsize"] > 0:
+        yield metrics.Observation(stats["size"] / stats["maxsize"])
+
+
+def _observe_client_cache_hits(options):
+    from app.cache import client_cache
+
+    yield metrics.Observation(client_cache.stats()["hitRatio"])
+
+
+def _observe_pool(options):
+    from app.config import settings
+    from app.database import pool_status
+
+    status = pool_status()
+    capacity = settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0)
+    if "checkedOut" in status and capacity > 0:
+        yield metrics.Observation(status["checkedOut"] / capacity, {"pool": status["pool"]})
+
+
+meter.create_observable_gauge(
+    "vise.client_cache.utilization", [_observe_client_cache], unit="1",
+    description="Entradas de la caché de perfiles / tamaño máximo",
+)
+meter.create_observable_gauge(
+    "vise.client_cache.hit_ratio", [_observe_client_cache_hits], unit="1",
+    description="Aciertos / consultas de la caché de perfiles",
+)
+meter.create_observable_gauge(
+    "vise.db.pool.utilization", [_observe_pool], unit="1",
+    description="Conexiones en uso / máximo del pool (size + overflow)",
+)
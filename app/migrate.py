@@ -0,0 +1,130 @@
+import argparse
+
+from sqlalchemy import Integer, inspect, text
+from sqlalchemy.engine import Engine
+
+from app import countries, models  # noqa: F401  (registra las tablas en Base.metadata)
+from app.database import engine, init_db
+
+"""
+===========================================================
+🗄️ Módulo: migrate.py
+===========================================================
+
+Paso explícito de esquema: crea tablas e índices que falten.
+La app no toca el esquema al importarse ni al arrancar; este comando se
+ejecuta antes de levantar los workers (ver Dockerfile).
+
+Países (`migrate_country_codes`): las columnas de país que sigan siendo
+texto se convierten a código ISO 3166-1 numérico (SMALLINT). Cada valor
+distinto se normaliza con `app.countries`; los que no se reconocen quedan
+como `countries.UNKNOWN` (0) y se informan.
+
+Montos (`migrate_money_to_cents`): las columnas de dinero que sigan siendo
+de punto flotante (unidades) se convierten a centavos enteros (BIGINT),
+redondeando al centavo más cercano.
+
+Uso:
+    python -m app.migrate
+===========================================================
+"""
+
+COUNTRY_COLUMNS = (("clients", "country"), ("purchases", "purchase_country"))
+MONEY_COLUMNS = (
+    ("clients", "monthly_income"),
+    ("purchases", "amount"),
+    ("client_spend_summary", "total_amount"),
+    ("client_spend_summary", "total_discount"),
+)
+
+
+def pending_columns(bind: Engine, columns: tuple[tuple[str, str], ...]) -> list[tuple[str, str, set[str]]]:
+    """(tabla, columna, columnas de la tabla) de las columnas que todavía no son enteras."""
+    pending = []
+    inspector = inspect(bind)
+    for table, column in columns:
+        if not inspector.has_table(table):
+            continue
+        types = {c["name"]: c["type"] for c in inspector.get_columns(table)}
+        if not isinstance(types[column], Integer):
+            pending.append((table, column, set(types)))
+    return pending
+
+
+def replace_column(conn, table: str, column: str, staging: str) -> None:
+    """Reemplaza `column` por la columna ya cargada `staging` (mismo nombre, NOT NULL fuera de SQLite)."""
+    conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+    conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN {staging} TO {column}"))
+    if conn.dialect.name != "sqlite":
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+
+
+def migrate_country_codes(bind: Engine = engine) -> dict[str, list[str]]:
+    """
+    Convierte a códigos numéricos las columnas de país que todavía son texto.
+
+    Returns:
+        dict: "tabla.columna" → valores no reconocidos (guardados como UNKNOWN).
+    """
+    unknown = {}
+    for table, column, existing in pending_columns(bind, COUNTRY_COLUMNS):
+        staging = f"{column}_code"
+        with bind.begin() as conn:
+            if staging not in existing:  # puede quedar de una corrida interrumpida
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {staging} SMALLINT"))
+            values = conn.execute(text(f"SELECT DISTINCT {column} FROM {table}")).scalars().all()
+            codes = {value: countries.lookup(str(value)) for value in values if value is not None}
+            missing = sorted(value for value, code in codes.items() if code is None)
+            if codes:
+                conn.execute(
+                    text(f"UPDATE {table} SET {staging} = :code WHERE {column} = :value"),
+                    [{"code": countries.UNKNOWN if code is None else code, "value": value} for value, code in codes.items()],
+                )
+            replace_column(conn, table, column, staging)
+        if missing:
+            unknown[f"{table}.{column}"] = missing
+    return unknown
+
+
+def migrate_money_to_cents(bind: Engine = engine) -> list[str]:
+    """
+    Convierte a centavos enteros las columnas de dinero que todavía son de punto flotante.
+
+    Returns:
+        list[str]: "tabla.columna" convertidas en esta corrida.
+    """
+    converted = []
+    for table, column, existing in pending_columns(bind, MONEY_COLUMNS):
+        staging = f"{column}_cents"
+        with bind.begin() as conn:
+            if staging not in existing:  # puede quedar de una corrida interrumpida
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {staging} BIGINT"))
+            conn.execute(text(f"UPDATE {table} SET {staging} = CAST(ROUND({column} * 100) AS BIGINT)"))
+            replace_column(conn, table, column, staging)
+        converted.append(f"{table}.{column}")
+    return converted
+
+
+def migrate() -> dict[str, list[str]]:
+    """
+    Lleva el esquema de la base de datos configurada a la versión actual.
+
+    Returns:
+        dict: Países no reconocidos al convertir columnas de texto (ver `migrate_country_codes`).
+    """
+    init_db()
+    unknown = migrate_country_codes()
+    migrate_money_to_cents()
+    return unknown
+
+
+def main():
+    argparse.ArgumentParser(description="Migra el esquema de la base de datos").parse_args()
+    unknown = migrate()
+    for column, values in unknown.items():
+        print(f"⚠️ {column}: países no reconocidos guardados como {countries.UNKNOWN}: {', '.join(values)}")
+    print("✅ Esquema de base de datos al día.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,3 @@
 from .client import Client, Purchase
+from .idempotency import IdempotencyKey
+from .summary import ClientSpendSummary
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, DateTime
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 # Modelo de cliente (tabla `clients`).Representa a un cliente dentro del sistema VISE.
 # Cada cliente puede estar inscrito en Vise Club y tener un tipo de tarjeta asignado.
 # Además, se relaciona con la tabla `purchases` para registrar sus compras.
+# Los países se guardan como código ISO 3166-1 numérico (ver app/countries.py).
+# Los montos (ingreso, compra) se guardan en centavos enteros (ver app/money.py).
 
 
 class Client(Base):
@@ -12,22 +14,29 @@ class Client(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    country = Column(String, nullable=False)
-    monthly_income = Column(Float, nullable=False)
+    country = Column(SmallInteger, nullable=False)
+    monthly_income = Column(BigInteger, nullable=False)
     vise_club = Column(Boolean, default=False)
     card_type = Column(String, nullable=False)
 
     purchases = relationship("Purchase", back_populates="client")
 
 
+# El índice (client_id, purchase_date, id) respalda el historial paginado por
+# keyset de `GET /clients/{id}/purchases`.
+
+
 class Purchase(Base):
     __tablename__ = "purchases"
+    __table_args__ = (
+        Index("ix_purchases_client_date_id", "client_id", "purchase_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"))
-    amount = Column(Float, nullable=False)
+    amount = Column(BigInteger, nullable=False)
     currency = Column(String, default="USD")
     purchase_date = Column(DateTime, nullable=False)
-    purchase_country = Column(String, nullable=False)
+    purchase_country = Column(SmallInteger, nullable=False)
 
     client = relationship("Client", back_populates="purchases")
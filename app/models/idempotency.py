@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Float, Index, Integer, LargeBinary, String
+from app.database import Base
+
+# Respuestas guardadas por `Idempotency-Key` (tabla `idempotency_keys`).
+# La clave primaria es la propia clave, así que la búsqueda de un reintento es
+# una lectura por índice. La fila se inserta en la misma transacción que la
+# compra; `expires_at` (epoch, segundos) marca el fin de la ventana de reintentos
+# y su índice respalda la purga de claves vencidas.
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    expires_at = Column(Float, nullable=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey
+from app.database import Base
+
+# Resumen de gasto por cliente (tabla `client_spend_summary`).
+# Se actualiza en la misma transacción que cada INSERT en `purchases`, así que leer
+# el resumen no depende del tamaño del historial. Una fila por (cliente, dimensión, grupo):
+# - dimension="total",   bucket=""                    → totales del cliente.
+# - dimension="benefit", bucket=<beneficio>           → desglose por beneficio.
+# - dimension="month",   bucket="AAAA-MM"             → desglose por mes.
+# Monto y descuento en centavos: los incrementos del UPSERT son sumas enteras exactas.
+
+
+class ClientSpendSummary(Base):
+    __tablename__ = "client_spend_summary"
+
+    client_id = Column(Integer, ForeignKey("clients.id"), primary_key=True)
+    dimension = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True)
+    purchase_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(BigInteger, nullable=False, default=0)
+    total_discount = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,68 @@
+from decimal import Decimal, InvalidOperation
+
+"""
+===========================================================
+💵 Módulo: money.py
+===========================================================
+
+Montos en unidades menores (centavos) como enteros.
+
+- Base de datos, reglas, resúmenes y analítica trabajan en centavos: las
+  sumas son exactas y las columnas NumPy son int64.
+- La API recibe y devuelve unidades (250.75); la conversión ocurre solo en
+  el borde (`to_cents` al validar la entrada, `to_units` al responder).
+- Las tasas de descuento se expresan en puntos básicos (1500 = 15%) y
+  `apply_rate` redondea el descuento al centavo (mitad hacia arriba).
+===========================================================
+"""
+
+CENTS = 100
+RATE_SCALE = 10_000  # puntos básicos por unidad de tasa
+# Mayor monto admitido: `apply_rate` multiplica centavos por puntos básicos en int64
+# (columnas NumPy), así que el producto también tiene que entrar en 64 bits.
+MAX_CENTS = (2**63 - 1) // RATE_SCALE
+
+
+def to_cents(value) -> int:
+    """
+    Monto en unidades (número o texto) → centavos.
+
+    Raises:
+        ValueError: Si no es un número finito, tiene más de dos decimales o
+            supera `MAX_CENTS` en valor absoluto.
+    """
+    if isinstance(value, bool):
+        raise ValueError("Monto inválido")
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Monto inválido: {value}") from None
+    if not amount.is_finite():
+        raise ValueError(f"Monto inválido: {value}")
+    # Antes de multiplicar: con exponentes enormes ("1e999999") el producto desborda el contexto decimal
+    if amount.adjusted() >= len(str(MAX_CENTS)):
+        raise ValueError(f"Monto fuera de rango: {value}")
+    cents = amount * CENTS
+    if abs(cents) > MAX_CENTS:
+        raise ValueError(f"Monto fuera de rango: {value}")
+    if cents != cents.to_integral_value():
+        raise ValueError(f"El monto admite a lo sumo dos decimales: {value}")
+    return int(cents)
+
+
+def to_units(cents: int) -> float:
+    """Centavos → unidades, para las respuestas y exportaciones."""
+    return cents / CENTS
+
+
+def rate_to_bp(rate: float) -> int:
+    """Tasa como fracción (0.15) → puntos básicos (1500)."""
+    return round(rate * RATE_SCALE)
+
+
+def apply_rate(cents, rate_bp):
+    """
+    Descuento en centavos de `cents` a `rate_bp` puntos básicos, redondeado
+    a la mitad hacia arriba. Acepta enteros o arrays NumPy enteros.
+    """
+    return (cents * rate_bp + RATE_SCALE // 2) // RATE_SCALE
@@ -0,0 +1,324 @@
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+
+from app.config import settings
+
+"""
+===========================================================
+⏱️ Módulo: profiling.py
+===========================================================
+
+Perfilado por request, opcional (`PROFILING_ENABLED`). Desactivado, no se
+instala el middleware ni los listeners de SQLAlchemy: `phase()`,
+`record()` y los bordes de `ProfiledRoute` solo leen una ContextVar vacía
+y vuelven.
+
+Fases de cada request (milisegundos):
+- parse  → desde que llega el request hasta que arranca el endpoint
+           (lectura del cuerpo, validación Pydantic, dependencias).
+- db     → tiempo en el driver de cada sentencia y cantidad de consultas
+           (`before/after_cursor_execute`).
+- rules  → validación y cálculo de descuento (`phase("rules")`).
+- commit → commits (`metrics.timed_commit`) y espera del escritor agrupado.
+- encode → desde que termina el endpoint hasta el inicio de la respuesta
+           (validación y serialización del resultado).
+
+El desglose sale en la cabecera `Server-Timing` y, si hay un span de
+servidor grabando, como atributos `vise.profile.*`.
+
+Captura cProfile: una fracción `PROFILING_CPROFILE_SAMPLE_RATE` de los
+requests, o los que traen `X-Profile: 1`, se perfilan completos y se
+guardan como `.prof` en `PROFILING_DIR` (abrir con `pstats` o snakeviz).
+Hay una sola captura a la vez por proceso; mientras corre también se
+perfila lo que otros requests ejecuten en el event loop.
+===========================================================
+"""
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("parse", "db", "rules", "commit", "encode")
+PROFILE_HEADER = b"x-profile"
+TRUE_VALUES = {b"1", b"true", b"yes"}
+
+_NOOP = nullcontext()
+_capture_lock = threading.Lock()
+_capture_ids = itertools.count(1)
+
+
+class RequestProfile:
+    """Tiempos acumulados (segundos) de un request."""
+
+    __slots__ = ("start", "phases", "queries", "endpoint_start", "endpoint_end", "profiler", "thread_profilers")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.endpoint_start: float | None = None
+        self.endpoint_end: float | None = None
+        self.profiler = None
+        self.thread_profilers = []
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def close(self, end: float) -> float:
+        """Completa parse/encode con los bordes del endpoint y devuelve el total."""
+        if self.endpoint_start is not None:
+            self.phases["parse"] = self.endpoint_start - self.start
+        if self.endpoint_end is not None:
+            self.phases["encode"] = end - self.endpoint_end
+        return end - self.start
+
+    def server_timing(self, total: float) -> str:
+        entries = []
+        for name, seconds in self.phases.items():
+            entry = f"{name};dur={seconds * 1000:.3f}"
+            if name == "db":
+                entry += f';desc="{self.queries} queries"'
+            entries.append(entry)
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+    def attributes(self, total: float) -> dict:
+        attributes = {f"vise.profile.{name}_ms": round(seconds * 1000, 3) for name, seconds in self.phases.items()}
+        attributes["vise.profile.db_queries"] = self.queries
+        attributes["vise.profile.total_ms"] = round(total * 1000, 3)
+        return attributes
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("vise_request_profile", default=None)
+
+
+class _Phase:
+    __slots__ = ("profile", "name", "started")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profile.add(self.name, time.perf_counter() - self.started)
+
+
+def phase(name: str):
+    """Context manager que suma su duración a la fase `name` del request actual (no-op sin perfil)."""
+    profile = _current.get()
+    if profile is None:
+        return _NOOP
+    return _Phase(profile, name)
+
+
+def record(name: str, seconds: float) -> None:
+    """Suma una duración ya medida a la fase `name` del request actual."""
+    profile = _current.get()
+    if profile is not None:
+        profile.add(name, seconds)
+
+
+# ============================================================
+# 🗄️ Consultas (listeners de SQLAlchemy)
+# ============================================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._vise_profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = getattr(context, "_vise_profile_start", None)
+    if profile is not None and started is not None:
+        profile.queries += 1
+        profile.add("db", time.perf_counter() - started)
+
+
+def uninstrument_engine(sync_engine) -> None:
+    """Quita los listeners de `instrument_engine`."""
+    from sqlalchemy import event
+
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def instrument_engine(sync_engine) -> None:
+    """Cuenta y mide las sentencias de `sync_engine` (para un motor async, su `sync_engine`)."""
+    from sqlalchemy import event
+
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ============================================================
+# 🧭 Bordes del endpoint
+# ============================================================
+
+def _thread_profiler():
+    """Perfilador para el hilo del threadpool; None si el principal ya cubre todos los hilos (3.12+)."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+
+def timed_endpoint(call):
+    """Envuelve un endpoint para marcar su inicio y fin (mismo tipo: corrutina o función)."""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def endpoint(**values):
+            profile = _current.get()
+            if profile is None:
+                return await call(**values)
+            profile.endpoint_start = time.perf_counter()
+            try:
+                return await call(**values)
+            finally:
+                profile.endpoint_end = time.perf_counter()
+    else:
+        # Corre en el threadpool de Starlette: la captura cProfile necesita su propio perfilador
+        @functools.wraps(call)
+        def endpoint(**values):
+            profile = _current.get()
+            if profile is None:
+                return call(**values)
+            profiler = _thread_profiler() if profile.profiler is not None else None
+            profile.endpoint_start = time.perf_counter()
+            try:
+                return call(**values)
+            finally:
+                profile.endpoint_end = time.perf_counter()
+                if profiler is not None:
+                    profiler.disable()
+                    profile.thread_profilers.append(profiler)
+
+    endpoint._vise_profiled = True
+    return endpoint
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Ruta que envuelve su endpoint con `timed_endpoint` antes de construirse
+    (`route_class` de los routers y de la app). `functools.wraps` conserva la
+    firma, así que parámetros, dependencias y `response_model` no cambian.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not getattr(endpoint, "_vise_profiled", False):
+            endpoint = timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+# ============================================================
+# 🧩 Middleware
+# ============================================================
+
+class ProfilingMiddleware:
+    """Middleware ASGI: crea el perfil del request, agrega `Server-Timing` y guarda las capturas cProfile."""
+
+    def __init__(self, app, sample_rate: float | None = None, directory: str | None = None):
+        self.app = app
+        self.sample_rate = settings.PROFILING_CPROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.directory = directory or settings.PROFILING_DIR
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(time.perf_counter())
+        token = _current.set(profile)
+        capture = self.wants_capture(scope) and _capture_lock.acquire(blocking=False)
+        if capture:
+            import cProfile
+
+            profile.profiler = cProfile.Profile()
+            profile.profiler.enable()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = profile.close(time.perf_counter())
+                headers = list(message.get("headers", ()))
+                headers.append((b"server-timing", profile.server_timing(total).encode()))
+                message = {**message, "headers": headers}
+                annotate_span(profile, total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if capture:
+                profile.profiler.disable()
+                try:
+                    self.dump(scope, profile)
+                finally:
+                    _capture_lock.release()
+
+    def wants_capture(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return value.strip().lower() in TRUE_VALUES
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def dump(self, scope, profile: RequestProfile) -> str | None:
+        """Escribe la captura en `directory`; un error se registra sin afectar al request."""
+        import pstats
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_capture_ids)}-{scope['method']}-{slug}.prof"
+        try:
+            stats = pstats.Stats(profile.profiler)
+            for profiler in profile.thread_profilers:
+                stats.add(profiler)
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            stats.dump_stats(path)
+        except (OSError, TypeError) as e:
+            logger.warning("No se pudo guardar la captura cProfile %s: %s", name, e)
+            return None
+        return path
+
+
+def annotate_span(profile: RequestProfile, total: float) -> None:
+    """Copia el desglose al span actual si se está grabando."""
+    from opentelemetry import trace
+
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes(profile.attributes(total))
+
+
+def instrument_app(app) -> None:
+    """
+    Con `PROFILING_ENABLED`: agrega el middleware y mide las sentencias de
+    los motores de la app. Los bordes de cada endpoint los marca
+    `ProfiledRoute`. Se llama antes de arrancar.
+    """
+    if not settings.PROFILING_ENABLED:
+        return
+    from app.database import async_engine, engine
+
+    app.add_middleware(ProfilingMiddleware)
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
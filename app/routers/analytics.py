@@ -0,0 +1,58 @@
+from datetime import date
+
+from fastapi import APIRouter, Query
+from fastapi.responses import ORJSONResponse
+
+from app import profiling, schemas
+from app.analytics import DIMENSIONS, purchase_columns
+from app.database import engine
+
+"""
+===========================================================
+📈 Módulo: analytics.py (router)
+===========================================================
+
+`GET /analytics/discounts` → compras, monto y descuento (total y promedio)
+agrupados por las dimensiones de `groupBy`, sobre las columnas en memoria
+de `app.analytics`. Cada request carga antes las compras nuevas (las que
+superan la marca de agua y las confirmadas tarde dentro de su ventana).
+===========================================================
+"""
+
+router = APIRouter(tags=["Analytics"], route_class=profiling.ProfiledRoute)
+
+
+@router.get(
+    "/analytics/discounts",
+    response_model=schemas.DiscountAnalytics,
+    response_model_exclude_unset=True,
+    responses={400: {"model": schemas.PurchaseResponse, "description": "Dimensión desconocida."}},
+)
+def discount_analytics(
+    groupBy: str = Query("cardType,weekday,benefit", description=f"Dimensiones separadas por coma: {', '.join(DIMENSIONS)}"),
+    dateFrom: date | None = Query(None, description="Desde (incluido)"),
+    dateTo: date | None = Query(None, description="Hasta (excluido)"),
+):
+    """
+    📈 Reporte de descuentos por tipo de tarjeta × día de la semana × beneficio
+    (u otras dimensiones).
+
+    Returns:
+        schemas.DiscountAnalytics | ORJSONResponse:
+            - 200 → un grupo por combinación con compras.
+            - 400 → Dimensión desconocida o repetida.
+    """
+    dimensions = [name.strip() for name in groupBy.split(",") if name.strip()]
+    unknown = [name for name in dimensions if name not in DIMENSIONS]
+    if unknown or len(set(dimensions)) != len(dimensions):
+        error = f"Dimensión desconocida: {', '.join(unknown)}" if unknown else "Dimensión repetida"
+        return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": error})
+
+    purchase_columns.refresh(engine)
+    count, groups = purchase_columns.group_by(dimensions, dateFrom, dateTo)
+    return schemas.DiscountAnalytics(
+        groupBy=dimensions,
+        purchaseCount=count,
+        watermark=purchase_columns.watermark,
+        groups=[schemas.DiscountGroup(**group) for group in groups],
+    )
@@ -1,42 +1,118 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app import models, schemas
+from app.database import ASYNC_MODE, SessionLocal, get_async_db, get_db
+from app import crud, metrics, models, profiling, schemas
+from app.importer import import_clients, iter_import_response
+from app.cache import ClientProfile, cache_client, client_cache
 from app.rules import validate_client
 
-router = APIRouter(tags=["Clients"])
+router = APIRouter(tags=["Clients"], route_class=profiling.ProfiledRoute)
 
 """
  Registrar un nuevo cliente en el sistema.
 
  - Valida los datos del cliente (tipo de tarjeta, ingresos, membresía Vise Club y país).
- - Si pasa la validación, se crea un registro en la base de datos y se devuelve el cliente creado.
+ - Si pasa la validación, se crea un registro en la base de datos y se devuelve el cliente creado
+   (el id sale del mismo INSERT, sin `refresh()` posterior).
+ - Con un DATABASE_URL asíncrono (aiosqlite/asyncpg) se expone `register_client_async`.
  Retorna:
  - 200 → Cliente registrado exitosamente.
  - 400 → Error de validación
     """
 
-@router.post("/client", responses={200: {"model": schemas.ClientResponse}, 400: {"model": schemas.ClientErrorResponse}})
 def register_client(data: schemas.ClientCreate, db: Session = Depends(get_db)):
     ok, msg = validate_client(data.cardType, data.monthlyIncome, data.viseClub, data.country)
+    metrics.record_registration(data.cardType.value, ok)
     if not ok:
-        return JSONResponse(status_code=400, content={"status": "Rejected", "error": msg})
-
-    c = models.Client(
-        name=data.name,
-        country=data.country,
-        monthly_income=data.monthlyIncome,
-        vise_club=data.viseClub,
-        card_type=data.cardType.value if hasattr(data.cardType, "value") else data.cardType
-    )
-    db.add(c)
-    db.commit()
-    db.refresh(c)
+        return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": msg})
+
+    values = client_values(data)
+    client_id = crud.create_client(db, values)
+    metrics.timed_commit(db, metrics.COMMIT_CLIENT)
+    cache_client(ClientProfile(client_id, values["card_type"], values["country"]))
+    return client_response(client_id, values, msg)
+
+
+async def register_client_async(data: schemas.ClientCreate, db: AsyncSession = Depends(get_async_db)):
+    ok, msg = validate_client(data.cardType, data.monthlyIncome, data.viseClub, data.country)
+    metrics.record_registration(data.cardType.value, ok)
+    if not ok:
+        return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": msg})
+
+    values = client_values(data)
+    client_id = await db.run_sync(crud.create_client, values)
+    await metrics.atimed_commit(db, metrics.COMMIT_CLIENT)
+    cache_client(ClientProfile(client_id, values["card_type"], values["country"]))
+    return client_response(client_id, values, msg)
+
+
+def client_values(data: schemas.ClientCreate) -> dict:
+    """Columnas de la fila `clients` para un cliente validado."""
+    return {
+        "name": data.name,
+        "country": data.country,
+        "monthly_income": data.monthlyIncome,
+        "vise_club": data.viseClub,
+        "card_type": data.cardType.value if hasattr(data.cardType, "value") else data.cardType,
+    }
+
+
+def client_response(client_id: int, values: dict, msg: str) -> dict:
     return {
-        "clientId": c.id,
-        "name": c.name,
-        "cardType": c.card_type,
+        "clientId": client_id,
+        "name": values["name"],
+        "cardType": values["card_type"],
         "status": "Registered",
         "message": msg,
     }
+
+
+router.add_api_route(
+    "/client",
+    register_client_async if ASYNC_MODE else register_client,
+    methods=["POST"],
+    name="register_client",
+    response_model=schemas.ClientResponse,
+    responses={400: {"model": schemas.ClientErrorResponse}},
+)
+
+
+"""
+ Importar clientes en bloque desde un cuerpo CSV o NDJSON.
+
+ - El cuerpo se lee en streaming; se valida y se inserta por bloques, así que la memoria
+   depende del tamaño de bloque y no del archivo.
+ - El formato sale de `format` o, si no se indica, del Content-Type (text/csv → CSV).
+ - La respuesta es NDJSON: la primera línea es el resumen
+   ({"status", "received", "imported", "rejected"}) y luego un rechazo por línea
+   ({"row", "status", "error"}; `row` cuenta registros de datos desde 1).
+ - Los bloques ya insertados se conservan aunque un bloque posterior falle.
+ - Los clientes importados no se precargan en la caché de perfiles.
+"""
+
+@router.post("/clients/import")
+async def import_clients_route(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(None),
+):
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    summary, rejections = await import_clients(request.stream(), fmt, insert_clients)
+    return StreamingResponse(iter_import_response(summary, rejections), media_type="application/x-ndjson")
+
+
+def insert_clients(rows: list[dict]) -> None:
+    """Inserta un bloque de clientes validados (executemany) y confirma el bloque."""
+    with SessionLocal() as db:
+        db.execute(insert(models.Client), rows)
+        metrics.timed_commit(db, metrics.COMMIT_CLIENT_IMPORT)
+
+
+@router.get("/cache/clients", tags=["Cache"])
+def client_cache_stats():
+    """Contadores de la caché de perfiles de cliente (aciertos, fallos, desalojos)."""
+    return client_cache.stats()
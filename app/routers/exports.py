@@ -0,0 +1,117 @@
+import csv
+import io
+from typing import Iterator, Literal
+
+import orjson
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app import models, profiling
+from app.countries import ALPHA3
+from app.database import engine
+from app.money import RATE_SCALE, apply_rate, to_units
+from app.rules import RULE_TABLE
+
+"""
+===========================================================
+📤 Módulo: exports.py
+===========================================================
+
+Exportación completa de `purchases` unida con `clients` para conciliación.
+
+- `GET /exports/purchases?format=ndjson|csv` responde con `StreamingResponse`.
+- Las filas se leen con cursor del lado del servidor (`yield_per` +
+  `stream_results`) y se codifican por bloques: la memoria se mantiene
+  plana sin importar el tamaño de la tabla.
+- El descuento se recalcula con la tabla de reglas (`RULE_TABLE.lookup`, la ruta de `calculate_discount`).
+- Los países se exportan como código ISO alfa-3 y los montos (guardados
+  en centavos) en unidades; la tasa como fracción.
+===========================================================
+"""
+
+router = APIRouter(tags=["Exports"], route_class=profiling.ProfiledRoute)
+
+EXPORT_CHUNK_SIZE = 5_000
+
+EXPORT_COLUMNS = [
+    "purchaseId", "clientId", "clientName", "cardType", "clientCountry",
+    "amount", "currency", "purchaseDate", "purchaseCountry",
+    "discountRate", "discountApplied", "finalAmount", "benefit",
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@router.get("/exports/purchases")
+def export_purchases(format: Literal["ndjson", "csv"] = Query("ndjson")):
+    """
+    📤 Exporta todas las compras con su cliente y el descuento recalculado.
+
+    Returns:
+        StreamingResponse: NDJSON (un objeto por línea) o CSV con encabezado.
+    """
+    return StreamingResponse(
+        iter_purchases_export(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="purchases.{format}"'},
+    )
+
+
+def iter_export_rows(chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list[list]]:
+    """
+    Produce bloques de filas (en el orden de `EXPORT_COLUMNS`) leyendo con cursor
+    del lado del servidor. Abre su propia conexión (la sesión de la dependencia ya
+    se cerró cuando empieza el streaming) y usa filas Core, sin procesamiento ORM.
+    """
+    query = (
+        select(
+            models.Purchase.id,
+            models.Purchase.client_id,
+            models.Client.name,
+            models.Client.card_type,
+            models.Client.country,
+            models.Purchase.amount,
+            models.Purchase.currency,
+            models.Purchase.purchase_date,
+            models.Purchase.purchase_country,
+        )
+        .join(models.Client, models.Client.id == models.Purchase.client_id)
+        .order_by(models.Purchase.id)
+    )
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        for partition in result.partitions():
+            rows = []
+            for purchase_id, client_id, name, card_type, client_country, amount, currency, date, purchase_country in partition:
+                rate, benefit = RULE_TABLE.lookup(card_type, date.weekday(), purchase_country != client_country, amount)
+                discount = apply_rate(amount, rate)
+                rows.append([
+                    purchase_id, client_id, name, card_type, ALPHA3[client_country],
+                    to_units(amount), currency, date.isoformat(), ALPHA3[purchase_country],
+                    rate / RATE_SCALE, to_units(discount), to_units(amount - discount), benefit,
+                ])
+            yield rows
+
+
+def iter_purchases_export(format: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Codifica cada bloque de filas como NDJSON o CSV y lo entrega como bytes."""
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in iter_export_rows(chunk_size):
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    for rows in iter_export_rows(chunk_size):
+        yield b"".join(orjson.dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
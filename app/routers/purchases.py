@@ -1,9 +1,27 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+import base64
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app import models, schemas
-from app.rules import validate_purchase, calculate_discount
+from app.database import ASYNC_MODE, AsyncSessionLocal, SessionLocal, get_async_db, get_db
+from app import countries, crud, idempotency, metrics, models, money, profiling, schemas
+from app.cache import (
+    ClientProfile,
+    aget_client_profile,
+    client_cache,
+    get_client_profile,
+    get_client_profiles,
+    load_client_profile,
+)
+from app.rules import RULE_TABLE, validate_purchase, calculate_discount
+from app.summary import get_summary
+from app.telemetry import trace_rejected_purchase
+from app.writer import purchase_writer
 
 """
 ===========================================================
@@ -14,7 +32,7 @@ from app.rules import validate_purchase, calculate_discount
 Gestiona las operaciones relacionadas con las compras de los clientes en el sistema VISE API.
 
 📑 Flujo principal:
-1️⃣ Verifica que el cliente exista en la base de datos.
+1️⃣ Verifica que el cliente exista (caché de perfiles → base de datos).
 2️⃣ Valida si la compra está permitida (por país o tipo de tarjeta).
 3️⃣ Calcula el descuento aplicable y el beneficio asociado según reglas de negocio.
 4️⃣ Registra la compra en la base de datos.
@@ -28,29 +46,73 @@ Gestiona las operaciones relacionadas con las compras de los clientes en el sist
 - 200 → Compra registrada y aprobada.
 - 400 → Compra rechazada (validación o país prohibido).
 
+🧾 Lotes (`POST /purchases/batch`):
+- A lo sumo `schemas.MAX_BATCH_SIZE` compras por request (más → 422).
+- Carga los clientes que no estén en caché con una sola consulta `IN`.
+- Inserta las compras aprobadas en bloque con un único commit.
+
+⚡ Modo asíncrono:
+- Con un DATABASE_URL aiosqlite/asyncpg, `/purchase` usa `make_purchase_async`.
+
+📜 Historial (`GET /clients/{id}/purchases`):
+- Paginación por keyset sobre (purchase_date, id), de la más reciente a la más antigua.
+- Cada página es un rango del índice (client_id, purchase_date, id): su costo
+  no crece con el tamaño del historial, a diferencia de OFFSET.
+
+📊 Resumen (`GET /clients/{id}/summary`):
+- Totales y desglose por beneficio y por mes desde `client_spend_summary`,
+  que se actualiza en la misma transacción que cada compra.
+
+📈 Métricas (`app.metrics`):
+- Compras aprobadas/rechazadas por tarjeta y motivo, tasa de descuento y
+  duración de cada commit.
+
+🔭 Trazas:
+- Cada rechazo se registra con `trace_rejected_purchase`, que lo conserva
+  aunque la traza del request no haya sido muestreada.
+
+🧬 Serialización:
+- Las respuestas son modelos tipados (`PurchaseResult`, `PurchaseBatchResponse`)
+  que se serializan con pydantic-core y orjson (`ORJSONResponse`), sin pasar
+  por `jsonable_encoder`; los 400/404 también salen con `ORJSONResponse`.
+
+🧮 Cotización (`POST /purchase/quote`):
+- Mismas reglas y mismo cálculo que `/purchase`, sin escribir ni abrir una
+  transacción: el descuento sale de `RULE_TABLE.quote` (memoizado por tarjeta,
+  día, exterior/doméstica y franja de monto) y, con el perfil en caché, no hay
+  ninguna consulta a la base de datos.
+- No cuenta en las métricas de compras.
+
+🔁 Idempotencia:
+- Con la cabecera `Idempotency-Key`, un reintento recibe la respuesta original
+  sin repetir validación, descuento ni INSERT (ver `app.idempotency`).
+
+📝 Escritura agrupada:
+- Con `PURCHASE_GROUP_COMMIT=true` la fila se entrega a `purchase_writer`,
+  que confirma varias compras por commit; la respuesta sale tras el commit.
+  La espera está acotada por `DB_POOL_TIMEOUT`, como la de una conexión.
+
 ===========================================================
 """
 
-router = APIRouter(tags=["Purchases"])
+router = APIRouter(tags=["Purchases"], route_class=profiling.ProfiledRoute)
 
 
-@router.post(
-    "/purchase",
-    responses={
-        200: {"model": schemas.PurchaseResponse, "description": "Compra registrada exitosamente."},
-        400: {"model": schemas.PurchaseResponse, "description": "Compra rechazada por validación o país prohibido."},
-    },
-)
-def make_purchase(data: schemas.PurchaseCreate, db: Session = Depends(get_db)):
+def make_purchase(
+    data: schemas.PurchaseCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: idempotency.IdempotencyKeyHeader = None,
+):
     """
     🛒 Registrar una nueva compra en el sistema.
 
     Args:
         data (schemas.PurchaseCreate): Información de la compra recibida desde el cuerpo del request.
         db (Session): Sesión de base de datos inyectada automáticamente por FastAPI.
+        idempotency_key (str | None): Cabecera `Idempotency-Key` (ver `app.idempotency`).
 
     Returns:
-        dict | JSONResponse:
+        schemas.PurchaseResult | ORJSONResponse:
             - Si la compra es válida → status 200 con detalle de la transacción.
             - Si es rechazada → status 400 con mensaje de error.
 
@@ -88,54 +150,416 @@ def make_purchase(data: schemas.PurchaseCreate, db: Session = Depends(get_db)):
     ```
     """
 
-    # 1️⃣ Verificar existencia del cliente
-    client = db.query(models.Client).filter(models.Client.id == data.clientId).first()
+    # 0️⃣ Reintento con Idempotency-Key → respuesta original, sin repetir el trabajo
+    fingerprint = None
+    if idempotency_key:
+        fingerprint = idempotency.fingerprint(data)
+        stored = idempotency.lookup(db, idempotency_key)
+        if stored is not None:
+            return idempotency.replay(stored, fingerprint)
+
+    # 1️⃣ Verificar existencia del cliente (caché de perfiles → base de datos)
+    client = get_client_profile(db, data.clientId)
     if not client:
-        return JSONResponse(
-            status_code=400,
-            content={"status": "Rejected", "error": "Cliente no encontrado"}
-        )
+        metrics.record_rejected_purchase(None, metrics.CLIENT_NOT_FOUND)
+        trace_rejected_purchase("Cliente no encontrado")
+        return rejected_response("Cliente no encontrado", idempotency_key, fingerprint)
 
-    # 2️⃣ Validar si la compra está permitida según tipo de tarjeta y país
-    ok, err = validate_purchase(client.card_type, data.purchaseCountry)
+    # 2️⃣ y 3️⃣ Validar la compra y calcular descuento y beneficio
+    ok, result = evaluate_purchase(client, data)
     if not ok:
-        return JSONResponse(
-            status_code=400,
-            content={"status": "Rejected", "error": err}
-        )
+        trace_rejected_purchase(result, client.card_type)
+        return rejected_response(result, idempotency_key, fingerprint)
 
-    # 3️⃣ Calcular descuento y beneficio según las reglas de negocio
-    rate, benefit = calculate_discount(
-        client.card_type,
-        data.amount,
-        data.purchaseDate,
-        data.purchaseCountry,
-        client.country
-    )
+    # 4️⃣ Registrar la compra (y su respuesta, si trae clave) en la base de datos
+    response, saved = approved_response(result, idempotency_key, fingerprint)
+    record = purchase_record(client, data, result, saved)
+    try:
+        if purchase_writer.enabled:
+            with profiling.phase("commit"):
+                purchase_writer.write(record)
+        else:
+            crud.create_purchases(db, [record])
+            metrics.timed_commit(db, metrics.COMMIT_PURCHASE)
+    except IntegrityError:
+        # Otro request con la misma clave confirmó primero: se responde lo suyo
+        if saved is None:
+            raise
+        db.rollback()
+        stored = idempotency.load(db, idempotency_key)
+        if stored is None:
+            raise
+        return idempotency.replay(stored, fingerprint)
+
+    # 5️⃣ Retornar resultado final
+    if saved is not None:
+        idempotency.remember(*saved)
+    return response
+
+
+async def make_purchase_async(
+    data: schemas.PurchaseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: idempotency.IdempotencyKeyHeader = None,
+):
+    """
+    ⚡ Versión asíncrona de `make_purchase` (mismo flujo y mismas respuestas).
+
+    La espera por la base de datos no ocupa un hilo del threadpool de Starlette.
+    """
+    fingerprint = None
+    if idempotency_key:
+        fingerprint = idempotency.fingerprint(data)
+        stored = await idempotency.alookup(db, idempotency_key)
+        if stored is not None:
+            return idempotency.replay(stored, fingerprint)
+
+    client = await aget_client_profile(db, data.clientId)
+    if not client:
+        metrics.record_rejected_purchase(None, metrics.CLIENT_NOT_FOUND)
+        trace_rejected_purchase("Cliente no encontrado")
+        return rejected_response("Cliente no encontrado", idempotency_key, fingerprint)
+
+    ok, result = evaluate_purchase(client, data)
+    if not ok:
+        trace_rejected_purchase(result, client.card_type)
+        return rejected_response(result, idempotency_key, fingerprint)
+
+    response, saved = approved_response(result, idempotency_key, fingerprint)
+    record = purchase_record(client, data, result, saved)
+    try:
+        if purchase_writer.enabled:
+            with profiling.phase("commit"):
+                await purchase_writer.awrite(record)
+        else:
+            await db.run_sync(crud.create_purchases, [record])
+            await metrics.atimed_commit(db, metrics.COMMIT_PURCHASE)
+    except IntegrityError:
+        if saved is None:
+            raise
+        await db.rollback()
+        stored = await db.run_sync(idempotency.load, idempotency_key)
+        if stored is None:
+            raise
+        return idempotency.replay(stored, fingerprint)
+
+    if saved is not None:
+        idempotency.remember(*saved)
+    return response
+
+
+def rejected_response(error: str, idempotency_key: str | None, fingerprint: str | None) -> ORJSONResponse:
+    """400 de una compra rechazada; con clave, queda en la LRU de idempotencia (no en la tabla)."""
+    response = ORJSONResponse(status_code=400, content={"status": "Rejected", "error": error})
+    if idempotency_key:
+        idempotency.remember(idempotency_key, idempotency.stored(fingerprint, response))
+    return response
+
+
+def approved_response(
+    result: schemas.PurchaseDetail, idempotency_key: str | None, fingerprint: str | None
+) -> tuple[schemas.PurchaseResult | ORJSONResponse, tuple[str, idempotency.StoredResponse] | None]:
+    """
+    Respuesta de una compra aprobada y, si trae clave, la respuesta a guardar.
+
+    Con clave se serializa aquí mismo: los bytes guardados son los que recibe el cliente.
+    """
+    payload = schemas.PurchaseResult(purchase=result)
+    if not idempotency_key:
+        return payload, None
+    response = ORJSONResponse(payload.model_dump())
+    return response, (idempotency_key, idempotency.stored(fingerprint, response))
+
+
+router.add_api_route(
+    "/purchase",
+    make_purchase_async if ASYNC_MODE else make_purchase,
+    methods=["POST"],
+    name="make_purchase",
+    response_model=schemas.PurchaseResult,
+    responses={
+        200: {"description": "Compra registrada exitosamente (o respuesta original de un reintento)."},
+        400: {"model": schemas.PurchaseResponse, "description": "Compra rechazada por validación o país prohibido."},
+        422: {"model": schemas.PurchaseResponse, "description": "Idempotency-Key ya usada con otra compra."},
+    },
+)
+
+
+@router.post(
+    "/purchase/quote",
+    response_model=schemas.PurchaseResult,
+    responses={
+        200: {"description": "Descuento que tendría la compra (no se registra)."},
+        400: {"model": schemas.PurchaseResponse, "description": "La compra sería rechazada."},
+    },
+)
+async def quote_purchase(data: schemas.PurchaseCreate):
+    """
+    🧮 Cotizar una compra: descuento y monto final sin registrarla.
+
+    No pide una sesión por request: solo si el perfil del cliente no está en
+    caché se abre una para leerlo.
+
+    Returns:
+        schemas.PurchaseResult | ORJSONResponse:
+            - 200 → `status` "Quoted" y el mismo detalle que devolvería `/purchase`.
+            - 400 → Cliente no encontrado o compra que sería rechazada.
+    """
+    client = await cached_client_profile(data.clientId)
+    if client is None:
+        return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": "Cliente no encontrado"})
+
+    with profiling.phase("rules"):
+        ok, err = validate_purchase(client.card_type, data.purchaseCountry)
+        if ok:
+            rate, benefit = RULE_TABLE.quote(
+                client.card_type,
+                data.purchaseDate.weekday(),
+                data.purchaseCountry != client.country,
+                data.amount,
+            )
+    if not ok:
+        return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": err})
 
-    discount = round(data.amount * rate, 2)
-    final = round(data.amount - discount, 2)
+    return schemas.PurchaseResult(status="Quoted", purchase=purchase_detail(client, data, rate, benefit))
 
-    # 4️⃣ Registrar la compra en la base de datos
-    purchase = models.Purchase(
-        client_id=client.id,
-        amount=data.amount,
-        currency=data.currency,
-        purchase_date=data.purchaseDate,
-        purchase_country=data.purchaseCountry,
+
+async def cached_client_profile(client_id: int) -> ClientProfile | None:
+    """Perfil desde la caché; si falta, lo lee con una sesión propia (fuera del event loop en modo síncrono)."""
+    profile = client_cache.get(client_id)
+    if profile is not None:
+        return profile
+    if ASYNC_MODE:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(load_client_profile, client_id)
+
+    def load() -> ClientProfile | None:
+        with SessionLocal() as db:
+            return load_client_profile(db, client_id)
+
+    return await run_in_threadpool(load)
+
+
+@router.post(
+    "/purchases/batch",
+    response_model=schemas.PurchaseBatchResponse,
+    response_model_exclude_unset=True,
+    responses={
+        200: {"description": "Lote procesado (cada compra con su propio resultado)."},
+    },
+)
+def make_purchases_batch(data: schemas.PurchaseBatch, db: Session = Depends(get_db)):
+    """
+    🧾 Registrar un lote de compras en una sola transacción.
+
+    Args:
+        data (schemas.PurchaseBatch): Compras a procesar, en el orden recibido (hasta `MAX_BATCH_SIZE`).
+        db (Session): Sesión de base de datos inyectada automáticamente por FastAPI.
+
+    Returns:
+        schemas.PurchaseBatchResponse: Totales de aprobadas/rechazadas y un
+        resultado por compra, en el mismo orden de entrada.
+    """
+
+    # 1️⃣ Cargar los clientes referenciados: caché y una sola consulta `IN` para el resto
+    clients = get_client_profiles(db, {item.clientId for item in data})
+
+    # 2️⃣ Evaluar cada compra con las mismas reglas que /purchase
+    results = []
+    rows = []
+    for index, item in enumerate(data):
+        client = clients.get(item.clientId)
+        if client is None:
+            metrics.record_rejected_purchase(None, metrics.CLIENT_NOT_FOUND)
+            trace_rejected_purchase("Cliente no encontrado")
+            results.append(schemas.PurchaseBatchItemResult(index=index, status="Rejected", error="Cliente no encontrado"))
+            continue
+
+        ok, result = evaluate_purchase(client, item)
+        if not ok:
+            trace_rejected_purchase(result, client.card_type)
+            results.append(schemas.PurchaseBatchItemResult(index=index, status="Rejected", error=result))
+            continue
+
+        rows.append(purchase_record(client, item, result))
+        results.append(schemas.PurchaseBatchItemResult(index=index, status="Approved", purchase=result))
+
+    # 3️⃣ Insertar en bloque las compras aprobadas con un único commit
+    if rows:
+        crud.create_purchases(db, rows, return_ids=False)
+        metrics.timed_commit(db, metrics.COMMIT_PURCHASE_BATCH)
+
+    return schemas.PurchaseBatchResponse(
+        status="Processed",
+        approved=len(rows),
+        rejected=len(results) - len(rows),
+        results=results,
     )
-    db.add(purchase)
-    db.commit()
-    db.refresh(purchase)
 
-    # 5️⃣ Retornar resultado final
+
+@router.get(
+    "/clients/{client_id}/purchases",
+    response_model=schemas.PurchaseHistoryPage,
+    responses={404: {"model": schemas.PurchaseResponse, "description": "Cliente no encontrado."}},
+)
+def list_client_purchases(
+    client_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None, description="`nextCursor` de la página anterior"),
+    dateFrom: datetime | None = Query(None, description="Desde (incluido)"),
+    dateTo: datetime | None = Query(None, description="Hasta (excluido)"),
+    country: str | None = Query(None, description="País de la compra (nombre o código ISO)"),
+    db: Session = Depends(get_db),
+):
+    """
+    📜 Historial de compras de un cliente, de la más reciente a la más antigua.
+
+    Returns:
+        dict | ORJSONResponse:
+            - 200 → `items` de la página y `nextCursor` (None en la última página).
+            - 404 → Cliente no encontrado.
+            - 400 → Cursor inválido o país desconocido.
+    """
+    if get_client_profile(db, client_id) is None:
+        return ORJSONResponse(status_code=404, content={"status": "Rejected", "error": "Cliente no encontrado"})
+
+    query = select(
+        models.Purchase.id,
+        models.Purchase.amount,
+        models.Purchase.currency,
+        models.Purchase.purchase_date,
+        models.Purchase.purchase_country,
+    ).where(models.Purchase.client_id == client_id)
+
+    if dateFrom is not None:
+        query = query.where(models.Purchase.purchase_date >= dateFrom)
+    if dateTo is not None:
+        query = query.where(models.Purchase.purchase_date < dateTo)
+    if country is not None:
+        code = countries.lookup(country)
+        if code is None:
+            return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": f"País desconocido: {country}"})
+        query = query.where(models.Purchase.purchase_country == code)
+    if cursor is not None:
+        try:
+            after_date, after_id = decode_cursor(cursor)
+        except ValueError:
+            return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": "Cursor inválido"})
+        query = query.where(
+            tuple_(models.Purchase.purchase_date, models.Purchase.id) < tuple_(after_date, after_id)
+        )
+
+    # Se pide una fila de más para saber si hay otra página
+    rows = db.execute(
+        query.order_by(models.Purchase.purchase_date.desc(), models.Purchase.id.desc()).limit(limit + 1)
+    ).all()
+    page = rows[:limit]
+
     return {
-        "status": "Approved",
-        "purchase": {
-            "clientId": client.id,
-            "originalAmount": data.amount,
-            "discountApplied": discount,
-            "finalAmount": final,
-            "benefit": benefit
-        }
+        "clientId": client_id,
+        "items": [
+            {
+                "id": row.id,
+                "amount": money.to_units(row.amount),
+                "currency": row.currency,
+                "purchaseDate": row.purchase_date,
+                "purchaseCountry": row.purchase_country,
+            }
+            for row in page
+        ],
+        "nextCursor": encode_cursor(page[-1].purchase_date, page[-1].id) if len(rows) > limit else None,
     }
+
+
+@router.get(
+    "/clients/{client_id}/summary",
+    response_model=schemas.ClientSummary,
+    responses={404: {"model": schemas.PurchaseResponse, "description": "Cliente no encontrado."}},
+)
+def client_summary(client_id: int, db: Session = Depends(get_db)):
+    """
+    📊 Resumen de gasto de un cliente: compras, monto total y descuento total,
+    con desglose por beneficio y por mes. No recorre el historial de compras.
+    """
+    if get_client_profile(db, client_id) is None:
+        return ORJSONResponse(status_code=404, content={"status": "Rejected", "error": "Cliente no encontrado"})
+    return get_summary(db, client_id)
+
+
+def encode_cursor(purchase_date: datetime, purchase_id: int) -> str:
+    raw = f"{purchase_date.isoformat()}|{purchase_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverso de `encode_cursor`; lanza ValueError si el cursor no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_part, id_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("cursor inválido") from e
+
+
+def evaluate_purchase(client: ClientProfile, data: schemas.PurchaseCreate) -> tuple[bool, schemas.PurchaseDetail | str]:
+    """
+    Aplica las reglas de negocio a una compra de un cliente ya cargado.
+
+    Returns:
+        (bool, PurchaseDetail | str): (True, detalle de la compra) si se aprueba,
+        (False, mensaje de error) si se rechaza.
+    """
+    with profiling.phase("rules"):
+        ok, err = validate_purchase(client.card_type, data.purchaseCountry)
+        if ok:
+            rate, benefit = calculate_discount(
+                client.card_type,
+                data.amount,
+                data.purchaseDate,
+                data.purchaseCountry,
+                client.country
+            )
+    if not ok:
+        metrics.record_rejected_purchase(client.card_type, metrics.BANNED_COUNTRY)
+        return False, err
+
+    metrics.record_approved_purchase(client.card_type, rate / money.RATE_SCALE)
+    return True, purchase_detail(client, data, rate, benefit)
+
+
+def purchase_detail(client: ClientProfile, data: schemas.PurchaseCreate, rate: int, benefit: str | None) -> schemas.PurchaseDetail:
+    """Montos de la compra con la tasa (puntos básicos) ya elegida: aritmética en centavos, salida en unidades."""
+    discount = money.apply_rate(data.amount, rate)
+
+    return schemas.PurchaseDetail(
+        clientId=client.id,
+        originalAmount=money.to_units(data.amount),
+        discountApplied=money.to_units(discount),
+        finalAmount=money.to_units(data.amount - discount),
+        benefit=benefit,
+    )
+
+
+def purchase_record(
+    client: ClientProfile,
+    data: schemas.PurchaseCreate,
+    result: schemas.PurchaseDetail,
+    saved: tuple[str, idempotency.StoredResponse] | None = None,
+) -> crud.PurchaseRecord:
+    """
+    Fila de `purchases` de una compra aprobada, con su descuento para el resumen y su respuesta idempotente.
+
+    Montos en centavos: `discountApplied` sale de centavos exactos, así que volver a convertirlo es exacto.
+    """
+    return crud.PurchaseRecord(
+        values={
+            "client_id": client.id,
+            "amount": data.amount,
+            "currency": data.currency,
+            "purchase_date": data.purchaseDate,
+            "purchase_country": data.purchaseCountry,
+        },
+        discount=money.to_cents(result.discountApplied),
+        benefit=result.benefit,
+        idempotency=saved,
+    )
@@ -1,10 +1,19 @@
+import time
+from bisect import bisect_left
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
+from typing import Mapping, NamedTuple
+
+from app import countries
+from app.money import CENTS, rate_to_bp, to_cents
+from app.metrics import DISCOUNT_DURATION
 
 # ============================================================
-# 🌍 Lista de países prohibidos
+# 🌍 Lista de países prohibidos (códigos ISO 3166-1 numéricos)
 # ============================================================
-BANNED_COUNTRIES = {"China", "Vietnam", "India", "Irán"}
+BANNED_COUNTRIES = frozenset(countries.parse(name) for name in ("China", "Vietnam", "India", "Irán"))
+BANNED_MASK = countries.bitset(BANNED_COUNTRIES)
 
 """
 ===========================================================
@@ -29,7 +38,7 @@ class CardType(str, Enum):
 # 👤 Validación de clientes
 # ============================================================
 
-def validate_client(card_type: str, income: float, vise_club: bool, country: str) -> tuple[bool, str]:
+def validate_client(card_type: str, income: int, vise_club: bool, country: int) -> tuple[bool, str]:
     """
     Valida si un cliente cumple los requisitos para registrarse con un tipo de tarjeta.
 
@@ -40,38 +49,67 @@ def validate_client(card_type: str, income: float, vise_club: bool, country: str
 
     Args:
         card_type (str): Tipo de tarjeta solicitada.
-        income (float): Ingreso mensual declarado.
+        income (int): Ingreso mensual declarado, en centavos.
         vise_club (bool): Indica si pertenece al VISE CLUB.
-        country (str): País de residencia.
+        country (int): País de residencia (código ISO numérico).
 
     Returns:
         (bool, str): Resultado de validación y mensaje asociado.
     """
-    if card_type == CardType.GOLD and income < 500:
+    if card_type == CardType.GOLD and income < 500 * CENTS:
         return False, "El cliente no cumple con el ingreso mínimo de 500 USD para Gold"
 
     if card_type == CardType.PLAT:
-        if income < 1000:
+        if income < 1000 * CENTS:
             return False, "El cliente no cumple con el ingreso mínimo de 1000 USD para Platinum"
         if not vise_club:
             return False, "El cliente no cumple con la suscripción VISE CLUB requerida para Platinum"
 
     if card_type in (CardType.BLACK, CardType.WHITE):
-        if income < 2000:
+        if income < 2000 * CENTS:
             return False, "El cliente no cumple con el ingreso mínimo de 2000 USD"
         if not vise_club:
             return False, "El cliente no cumple con la suscripción VISE CLUB requerida"
-        if country in BANNED_COUNTRIES:
-            return False, f"El cliente con tarjeta {card_type} no puede residir en {country}"
+        if BANNED_MASK >> country & 1:
+            return False, f"El cliente con tarjeta {card_type} no puede residir en {countries.name(country)}"
 
     return True, "Cliente apto"
 
 
+def validate_clients(batch: Mapping[str, object]):
+    """
+    Versión vectorizada de `validate_client` para columnas completas.
+
+    Columnas de `batch`: card_type, income (centavos), vise_club, country (códigos ISO numéricos).
+
+    Returns:
+        np.ndarray: máscara booleana, True donde `validate_client` aprobaría la fila.
+        El mensaje de rechazo se obtiene con `validate_client` solo para las filas en False.
+    """
+    import numpy as np
+
+    card = np.asarray(batch["card_type"]).astype(str)
+    income = np.asarray(batch["income"], dtype=np.int64)
+    club = np.asarray(batch["vise_club"], dtype=bool)
+    banned = countries.membership(BANNED_MASK)[np.asarray(batch["country"], dtype=np.intp)]
+
+    gold = card == CardType.GOLD.value
+    plat = card == CardType.PLAT.value
+    premium = (card == CardType.BLACK.value) | (card == CardType.WHITE.value)
+
+    rejected = (
+        (gold & (income < 500 * CENTS))
+        | (plat & ((income < 1000 * CENTS) | ~club))
+        | (premium & ((income < 2000 * CENTS) | ~club | banned))
+    )
+    return ~rejected
+
+
 # ============================================================
 # 🌐 Validación de compras
 # ============================================================
 
-def validate_purchase(card_type: str, purchase_country: str) -> tuple[bool, str | None]:
+def validate_purchase(card_type: str, purchase_country: int) -> tuple[bool, str | None]:
     """
     Valida si un cliente puede realizar una compra en un país específico.
 
@@ -80,21 +118,182 @@ def validate_purchase(card_type: str, purchase_country: str) -> tuple[bool, str
 
     Args:
         card_type (str): Tipo de tarjeta del cliente.
-        purchase_country (str): País donde se intenta realizar la compra.
+        purchase_country (int): País donde se intenta realizar la compra (código ISO numérico).
 
     Returns:
         (bool, str | None): Resultado de validación y mensaje de error (si aplica).
     """
-    if card_type in (CardType.BLACK, CardType.WHITE) and purchase_country in BANNED_COUNTRIES:
-        return False, f"El cliente con tarjeta {card_type} no puede realizar compras desde {purchase_country}"
+    if card_type in (CardType.BLACK, CardType.WHITE) and BANNED_MASK >> purchase_country & 1:
+        return False, f"El cliente con tarjeta {card_type} no puede realizar compras desde {countries.name(purchase_country)}"
     return True, None
 
 
+# ============================================================
+# 💸 Tabla de reglas de descuento
+# ============================================================
+
+MON_WED  = frozenset({0, 1, 2})
+MON_FRI  = frozenset({0, 1, 2, 3, 4})
+SATURDAY = frozenset({5})
+WEEKEND  = frozenset({5, 6})
+ALL_DAYS = frozenset(range(7))
+
+
+class DiscountRule(NamedTuple):
+    """
+    Regla declarativa de descuento.
+
+    - scope → "foreign" (compra en el exterior), "domestic" (en el país del cliente) o "any".
+    - min_amount → el monto debe ser estrictamente mayor; None = sin condición de monto.
+
+    Montos en unidades y tasa como fracción, como se escriben las reglas;
+    `RuleTable` las compila a centavos y puntos básicos.
+    """
+    card_type: str
+    weekdays: frozenset[int]
+    scope: str
+    min_amount: float | None
+    rate: float
+    benefit: str
+
+
+# Orden = prioridad: para cada tarjeta gana la primera regla que aplique.
+DISCOUNT_RULES: tuple[DiscountRule, ...] = (
+    DiscountRule(CardType.GOLD,  MON_WED,  "any",      100,  0.15, "Lunes - Miércoles 15%"),
+
+    DiscountRule(CardType.PLAT,  ALL_DAYS, "foreign",  None, 0.05, "Exterior 5%"),
+    DiscountRule(CardType.PLAT,  MON_WED,  "domestic", 100,  0.20, "Lunes - Miércoles 20%"),
+    DiscountRule(CardType.PLAT,  SATURDAY, "domestic", 200,  0.30, "Sábado 30%"),
+
+    DiscountRule(CardType.BLACK, ALL_DAYS, "foreign",  None, 0.05, "Exterior 5%"),
+    DiscountRule(CardType.BLACK, MON_WED,  "domestic", 100,  0.25, "Lunes - Miércoles 25%"),
+    DiscountRule(CardType.BLACK, SATURDAY, "domestic", 200,  0.35, "Sábado 35%"),
+
+    DiscountRule(CardType.WHITE, ALL_DAYS, "foreign",  None, 0.05, "Exterior 5%"),
+    DiscountRule(CardType.WHITE, MON_FRI,  "domestic", 100,  0.25, "Lunes - Viernes 25%"),
+    DiscountRule(CardType.WHITE, WEEKEND,  "domestic", 200,  0.35, "Fin de semana 35%"),
+)
+
+
+def _threshold(min_amount: float | None) -> int | None:
+    """Umbral de una regla (unidades) → centavos."""
+    return None if min_amount is None else to_cents(min_amount)
+
+
+class RuleTable:
+    """
+    Reglas de descuento compiladas.
+
+    Cada clave (tipo de tarjeta, día de la semana, es_exterior) apunta a la lista
+    ordenada de candidatos (umbral en centavos, tasa en puntos básicos, código de
+    beneficio); gana el primero cuyo umbral se supere. `benefits[0]` es None
+    (sin beneficio). Los montos a evaluar también van en centavos.
+
+    `thresholds` parte los montos en franjas: dentro de una franja un monto
+    supera exactamente los mismos umbrales, así que el resultado solo depende
+    de (tarjeta, día, es_exterior, franja). `quote` memoiza sobre esa clave.
+    """
+
+    def __init__(self, rules: tuple[DiscountRule, ...]):
+        self.rules = tuple(rules)
+        self.cards = tuple(dict.fromkeys(str(r.card_type.value if isinstance(r.card_type, Enum) else r.card_type)
+                                         for r in self.rules))
+        self.benefits: tuple[str | None, ...] = (None, *dict.fromkeys(r.benefit for r in self.rules))
+        codes = {b: i for i, b in enumerate(self.benefits)}
+
+        self.entries: dict[tuple[str, int, bool], tuple[tuple[int | None, int, int], ...]] = {}
+        for card in self.cards:
+            for wd in range(7):
+                for foreign in (False, True):
+                    scope = "foreign" if foreign else "domestic"
+                    candidates = tuple(
+                        (_threshold(r.min_amount), rate_to_bp(r.rate), codes[r.benefit])
+                        for r in self.rules
+                        if r.card_type == card and wd in r.weekdays and r.scope in (scope, "any")
+                    )
+                    if candidates:
+                        self.entries[(card, wd, foreign)] = candidates
+
+        self.thresholds = tuple(sorted({_threshold(r.min_amount) for r in self.rules if r.min_amount is not None}))
+        self._quotes: dict[tuple[str, int, bool, int], tuple[int, str | None]] = {}
+
+    def lookup(self, card_type: str, weekday: int, foreign: bool, amount: int) -> tuple[int, str | None]:
+        """Evalúa una compra (monto en centavos) contra la tabla (ruta escalar)."""
+        for threshold, rate, code in self.entries.get((card_type, weekday, foreign), ()):
+            if threshold is None or amount > threshold:
+                return rate, self.benefits[code]
+        return 0, None
+
+    def band(self, amount: int) -> int:
+        """Franja de `amount`: cuántos umbrales supera estrictamente."""
+        return bisect_left(self.thresholds, amount)
+
+    def quote(self, card_type: str, weekday: int, foreign: bool, amount: int) -> tuple[int, str | None]:
+        """
+        `lookup` memoizado por (tarjeta, día, es_exterior, franja de monto).
+
+        La memo tiene a lo sumo tarjetas × 7 × 2 × (umbrales + 1) entradas; los
+        tipos de tarjeta desconocidos se evalúan pero no se guardan.
+        """
+        key = (card_type, weekday, foreign, bisect_left(self.thresholds, amount))
+        result = self._quotes.get(key)
+        if result is None:
+            result = self.lookup(card_type, weekday, foreign, amount)
+            if card_type in self.cards:
+                self._quotes[key] = result
+        return result
+
+    @cached_property
+    def arrays(self):
+        """
+        Versión NumPy de la tabla: umbrales (centavos), tasas (puntos básicos)
+        y códigos con forma (tarjetas + 1, 7, 2, candidatos), todo entero. La
+        última fila de tarjetas es para tipos desconocidos (sin reglas); los
+        huecos tienen el umbral máximo de int64 y "sin condición de monto" el
+        mínimo.
+        """
+        import numpy as np
+
+        limits = np.iinfo(np.int64)
+        slots = max((len(c) for c in self.entries.values()), default=1)
+        shape = (len(self.cards) + 1, 7, 2, slots)
+        thresholds = np.full(shape, limits.max, dtype=np.int64)
+        rates = np.zeros(shape, dtype=np.int64)
+        codes = np.zeros(shape, dtype=np.int8)
+        for (card, wd, foreign), candidates in self.entries.items():
+            c = self.cards.index(card)
+            for slot, (threshold, rate, code) in enumerate(candidates):
+                thresholds[c, wd, int(foreign), slot] = limits.min if threshold is None else threshold
+                rates[c, wd, int(foreign), slot] = rate
+                codes[c, wd, int(foreign), slot] = code
+        return thresholds, rates, codes
+
+    def card_codes(self, card_types):
+        """Convierte una columna de tipos de tarjeta a índices de la tabla."""
+        import numpy as np
+
+        values = np.asarray(card_types)
+        if values.dtype.kind in "iu":
+            return values
+        uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+        index = {card: i for i, card in enumerate(self.cards)}
+        mapped = np.array([index.get(u, len(self.cards)) for u in uniques], dtype=np.intp)
+        return mapped[inverse.reshape(values.shape)]
+
+
+def compile_rules(rules: tuple[DiscountRule, ...]) -> RuleTable:
+    """Compila un conjunto de reglas declarativas en una `RuleTable`."""
+    return RuleTable(rules)
+
+
+RULE_TABLE = compile_rules(DISCOUNT_RULES)
+
+
 # ============================================================
 # 💸 Cálculo de descuentos
 # ============================================================
 
-def calculate_discount(card_type: str, amount: float, date: datetime, purchase_country: str, client_country: str) -> tuple[float, str | None]:
+def calculate_discount(card_type: str, amount: int, date: datetime, purchase_country: int, client_country: int) -> tuple[int, str | None]:
     """
     Calcula el descuento aplicable a una compra según reglas de negocio.
 
@@ -102,7 +301,7 @@ def calculate_discount(card_type: str, amount: float, date: datetime, purchase_c
     1️⃣ Compras en el exterior → 5%
     2️⃣ Descuentos por día y monto según el tipo de tarjeta
 
-    Reglas:
+    Reglas (ver `DISCOUNT_RULES`):
     - Classic → No aplica descuento.
     - Gold → 15% Lunes-Miércoles si el monto > 100.
     - Platinum → 20% Lunes-Miércoles (>100), 30% Sábados (>200), 5% exterior.
@@ -111,56 +310,66 @@ def calculate_discount(card_type: str, amount: float, date: datetime, purchase_c
 
     Args:
         card_type (str): Tipo de tarjeta.
-        amount (float): Monto de la compra.
+        amount (int): Monto de la compra, en centavos.
         date (datetime): Fecha de la compra.
-        purchase_country (str): País donde se realiza la compra.
-        client_country (str): País de residencia del cliente.
+        purchase_country (int): País donde se realiza la compra (código ISO numérico).
+        client_country (int): País de residencia del cliente (código ISO numérico).
 
     Returns:
-        tuple[float, str | None]: (tasa de descuento, descripción del beneficio)
+        tuple[int, str | None]: (tasa de descuento en puntos básicos, descripción del beneficio).
+        El descuento en centavos es `money.apply_rate(amount, tasa)`.
+
+    Registra su duración en `vise.rules.calculate_discount.duration`; los recorridos
+    masivos (exportación, reconstrucción de resúmenes) usan `RULE_TABLE.lookup`
+    directamente para no mezclar sus millones de llamadas con la ruta de requests.
     """
+    start = time.perf_counter()
+    result = RULE_TABLE.lookup(card_type, date.weekday(), purchase_country != client_country, amount)
+    DISCOUNT_DURATION.record(time.perf_counter() - start)
+    return result
+
 
-    wd = date.weekday()  # 0=Lunes ... 6=Domingo
-
-    # --- CLASSIC ---
-    if card_type == CardType.CLASSIC:
-        return 0.0, None
-
-    # --- GOLD ---
-    if card_type == CardType.GOLD:
-        if wd in (0, 1, 2) and amount > 100:
-            return 0.15, "Lunes - Miércoles 15%"
-        return 0.0, None
-
-    # --- PLATINUM ---
-    elif card_type == CardType.PLAT:
-        if purchase_country != client_country:
-            return 0.05, "Exterior 5%"
-        if wd in (0, 1, 2) and amount > 100:
-            return 0.20, "Lunes - Miércoles 20%"
-        if wd == 5 and amount > 200:
-            return 0.30, "Sábado 30%"
-        return 0.0, None
-
-    # --- BLACK ---
-    elif card_type == CardType.BLACK:
-        if purchase_country != client_country:
-            return 0.05, "Exterior 5%"
-        if wd in (0, 1, 2) and amount > 100:
-            return 0.25, "Lunes - Miércoles 25%"
-        if wd == 5 and amount > 200:
-            return 0.35, "Sábado 35%"
-        return 0.0, None
-
-    # --- WHITE ---
-    elif card_type == CardType.WHITE:
-        # 🚨 Prioridad: exterior antes que día
-        if purchase_country != client_country:
-            return 0.05, "Exterior 5%"
-        if wd in (0, 1, 2, 3, 4) and amount > 100:
-            return 0.25, "Lunes - Viernes 25%"
-        if wd in (5, 6) and amount > 200:
-            return 0.35, "Fin de semana 35%"
-        return 0.0, None
-
-    return 0.0, None
+def calculate_discounts(batch: Mapping[str, object], table: RuleTable = RULE_TABLE):
+    """
+    Versión vectorizada de `calculate_discount` para columnas completas.
+
+    Columnas de `batch` (arrays del mismo largo):
+    - card_type → tipos de tarjeta (texto) o índices de `table.cards`.
+    - amount → montos en centavos (enteros).
+    - weekday (0=Lunes) o date (datetime64 / datetimes sin zona horaria).
+    - foreign (bool) o purchase_country + client_country (códigos ISO numéricos).
+
+    Returns:
+        (np.ndarray, np.ndarray): tasas en puntos básicos (int64) y códigos de beneficio (int8);
+        `table.benefits[código]` da la descripción (0 → None).
+    """
+    import numpy as np
+
+    cards = table.card_codes(batch["card_type"])
+    amount = np.asarray(batch["amount"], dtype=np.int64)
+
+    if "weekday" in batch:
+        weekday = np.asarray(batch["weekday"], dtype=np.intp)
+    else:
+        days = np.asarray(batch["date"], dtype="datetime64[D]").astype(np.int64)
+        weekday = (days + 3) % 7  # 1970-01-01 fue jueves
+
+    if "foreign" in batch:
+        foreign = np.asarray(batch["foreign"], dtype=bool)
+    else:
+        foreign = np.asarray(batch["purchase_country"]) != np.asarray(batch["client_country"])
+    foreign = foreign.astype(np.intp)
+
+    thresholds, rates, codes = table.arrays
+    out_rates = np.zeros(amount.shape, dtype=np.int64)
+    out_codes = np.zeros(amount.shape, dtype=np.int8)
+    pending = np.ones(amount.shape, dtype=bool)
+
+    for slot in range(thresholds.shape[-1]):
+        threshold = thresholds[cards, weekday, foreign, slot]
+        hit = pending & (amount > threshold)
+        out_rates[hit] = rates[cards, weekday, foreign, slot][hit]
+        out_codes[hit] = codes[cards, weekday, foreign, slot][hit]
+        pending &= ~hit
+
+    return out_rates, out_codes
@@ -1,7 +1,28 @@
-from pydantic import BaseModel, Field
+from typing import Annotated
+
+from pydantic import BaseModel, BeforeValidator, Field, PlainSerializer, WithJsonSchema
 from datetime import datetime
+from app import countries, money
 from app.rules import CardType
 
+# País: entra como nombre o código ISO ("USA", "US", "Estados Unidos"), se
+# valida como código numérico ISO 3166-1 y sale como alfa-3.
+Country = Annotated[
+    int,
+    BeforeValidator(countries.parse),
+    PlainSerializer(countries.alpha3, return_type=str),
+    WithJsonSchema({"type": "string", "description": "Nombre o código ISO 3166-1 del país"}),
+]
+
+# Monto de entrada: llega en unidades (250.75, a lo sumo dos decimales), se
+# valida como centavos enteros (25075) y sale de nuevo en unidades.
+Money = Annotated[
+    int,
+    BeforeValidator(money.to_cents),
+    PlainSerializer(money.to_units, return_type=float),
+    WithJsonSchema({"type": "number", "description": "Monto en unidades, con a lo sumo dos decimales"}),
+]
+
 """
     Esquema de entrada para registrar un nuevo cliente.
     
@@ -16,8 +37,8 @@ from app.rules import CardType
 # ---------- CLIENTES ----------
 class ClientCreate(BaseModel):
     name: str = Field(..., example="Alice Classic")
-    country: str = Field(..., example="USA")
-    monthlyIncome: float = Field(..., example=1000.50)
+    country: Country = Field(..., example="USA")
+    monthlyIncome: Money = Field(..., example=1000.50)
     viseClub: bool = Field(..., example=False)
     cardType: CardType = Field(..., example="Classic")  # Enum, pero ejemplo como string
 
@@ -39,22 +60,90 @@ class ClientErrorResponse(BaseModel):
 # ---------- COMPRAS ----------
 class PurchaseCreate(BaseModel):
     clientId: int = Field(..., example=1)
-    amount: float = Field(..., example=250.75)
+    amount: Money = Field(..., example=250.75)
     currency: str = Field(..., example="USD")
     purchaseDate: datetime = Field(..., example="2025-09-29T12:00:00Z")
-    purchaseCountry: str = Field(..., example="Colombia")
+    purchaseCountry: Country = Field(..., example="Colombia")
+
+class PurchaseDetail(BaseModel):
+    clientId: int = Field(..., example=1)
+    originalAmount: float = Field(..., example=250.75)
+    discountApplied: float = Field(..., example=75.23)
+    finalAmount: float = Field(..., example=175.52)
+    benefit: str | None = Field(default=None, example="Sábado 30%")
+
+class PurchaseResult(BaseModel):
+    status: str = Field("Approved", example="Approved")
+    purchase: PurchaseDetail
 
 class PurchaseResponse(BaseModel):
-    status: str = Field(..., example="Success")
-    purchase: dict | None = Field(
-        default=None,
-        example={
-            "id": 101,
-            "clientId": 1,
-            "amount": 250.75,
-            "currency": "USD",
-            "purchaseDate": "2025-09-29T12:00:00Z",
-            "purchaseCountry": "Colombia"
-        }
-    )
+    status: str = Field(..., example="Rejected")
+    purchase: PurchaseDetail | None = Field(default=None, example=None)
+    error: str | None = Field(default=None, example="Cliente no encontrado")
+
+
+# ---------- LOTES DE COMPRAS ----------
+MAX_BATCH_SIZE = 1000  # compras por request (acota también la consulta `IN` de clientes)
+
+PurchaseBatch = Annotated[list[PurchaseCreate], Field(max_length=MAX_BATCH_SIZE)]
+
+class PurchaseBatchItemResult(BaseModel):
+    index: int = Field(..., example=0)
+    status: str = Field(..., example="Approved")
+    purchase: PurchaseDetail | None = Field(default=None)
     error: str | None = Field(default=None, example=None)
+
+class PurchaseBatchResponse(BaseModel):
+    status: str = Field(..., example="Processed")
+    approved: int = Field(..., example=1)
+    rejected: int = Field(..., example=0)
+    results: list[PurchaseBatchItemResult]
+
+
+# ---------- HISTORIAL DE COMPRAS ----------
+class PurchaseHistoryItem(BaseModel):
+    id: int = Field(..., example=101)
+    amount: float = Field(..., example=250.75)
+    currency: str | None = Field(default=None, example="USD")
+    purchaseDate: datetime = Field(..., example="2025-09-29T12:00:00")
+    purchaseCountry: Country = Field(..., example="COL")
+
+class PurchaseHistoryPage(BaseModel):
+    clientId: int = Field(..., example=1)
+    items: list[PurchaseHistoryItem]
+    nextCursor: str | None = Field(default=None, example="MjAyNS0wOS0yOVQxMjowMDowMHwxMDE")
+
+
+# ---------- RESUMEN DE GASTO ----------
+class SpendBucket(BaseModel):
+    key: str = Field(..., example="2025-09")
+    purchaseCount: int = Field(..., example=3)
+    totalAmount: float = Field(..., example=750.25)
+    totalDiscount: float = Field(..., example=112.54)
+
+class ClientSummary(BaseModel):
+    clientId: int = Field(..., example=1)
+    purchaseCount: int = Field(..., example=3)
+    totalAmount: float = Field(..., example=750.25)
+    totalDiscount: float = Field(..., example=112.54)
+    byBenefit: list[SpendBucket]
+    byMonth: list[SpendBucket]
+
+
+# ---------- ANALÍTICA DE DESCUENTOS ----------
+class DiscountGroup(BaseModel):
+    cardType: str | None = Field(default=None, example="Platinum")
+    weekday: int | None = Field(default=None, example=5)
+    benefit: str | None = Field(default=None, example="Sábado 30%")
+    country: str | None = Field(default=None, example="USA")
+    scope: str | None = Field(default=None, example="domestic")
+    purchaseCount: int = Field(..., example=42)
+    totalAmount: float = Field(..., example=12600.0)
+    totalDiscount: float = Field(..., example=3780.0)
+    avgDiscount: float = Field(..., example=90.0)
+
+class DiscountAnalytics(BaseModel):
+    groupBy: list[str] = Field(..., example=["cardType", "weekday", "benefit"])
+    purchaseCount: int = Field(..., example=1200)
+    watermark: int = Field(..., example=1200)
+    groups: list[DiscountGroup]
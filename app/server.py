@@ -0,0 +1,140 @@
+import argparse
+import os
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+from sqlalchemy.engine import make_url
+
+"""
+===========================================================
+🚀 Módulo: server.py
+===========================================================
+
+Servidor de producción con varios workers (gunicorn + UvicornWorker).
+
+- Workers → `--workers`, `WEB_CONCURRENCY` o, por defecto, los núcleos de la CPU.
+- La app se importa una sola vez en el proceso maestro (`preload_app`) y los
+  workers la heredan por fork: el costo de importación se paga una vez.
+- Tras el fork (`post_fork`) cada worker descarta el pool de conexiones
+  heredado. Trazas, métricas y logs se configuran en el lifespan, que corre
+  dentro de cada worker, así que ningún proveedor ni hilo exportador cruza
+  el fork. El escritor agrupado y las cachés ya son por proceso.
+- El esquema se migra en el maestro antes de crear los workers.
+
+SQLite con varios procesos sobre el mismo archivo (`tune_for_workers`):
+- Una base en memoria no se comparte entre procesos → error al arrancar.
+- WAL: los lectores no bloquean al escritor.
+- `PURCHASE_GROUP_COMMIT` → un solo hilo escritor de compras por worker: a lo
+  sumo N escritores compiten por el lock en lugar de un hilo por request.
+- `SQLITE_BUSY_TIMEOUT_MS` crece con los workers (1 s por worker, mínimo el
+  configurado), para esperar el turno en lugar de fallar con "database is locked".
+Solo se ajusta lo que no esté definido en el entorno o en `.env`.
+
+Uso:
+    python -m app.server --bind 0.0.0.0:80
+    python -m app.server --workers 4 --skip-migrate
+===========================================================
+"""
+
+WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+
+
+def tune_for_workers(settings, workers: int) -> dict:
+    """
+    Ajusta `settings` para `workers` procesos sobre la misma base SQLite.
+
+    Returns:
+        dict: Valores cambiados (vacío si no hizo falta ningún ajuste).
+    """
+    url = make_url(settings.DATABASE_URL)
+    if workers <= 1 or url.get_backend_name() != "sqlite":
+        return {}
+    if url.database in (None, "", ":memory:") or url.query.get("mode") == "memory":
+        raise ValueError("SQLite en memoria no se comparte entre workers: usar un archivo o --workers 1")
+
+    wanted = {
+        "SQLITE_JOURNAL_MODE": "WAL",
+        "PURCHASE_GROUP_COMMIT": True,
+        "SQLITE_BUSY_TIMEOUT_MS": max(settings.SQLITE_BUSY_TIMEOUT_MS, 1000 * workers),
+    }
+    changed = {}
+    for name, value in wanted.items():
+        if name not in settings.model_fields_set and getattr(settings, name) != value:
+            setattr(settings, name, value)
+            changed[name] = value
+    return changed
+
+
+def post_fork(server, worker) -> None:
+    """Hook de gunicorn: corre en cada worker recién creado."""
+    from app.database import dispose_after_fork
+
+    dispose_after_fork()
+
+
+def gunicorn_options(bind: str, workers: int, timeout: int) -> dict:
+    return {
+        "bind": bind,
+        "workers": workers,
+        "worker_class": WORKER_CLASS,
+        "preload_app": True,
+        "post_fork": post_fork,
+        "timeout": timeout,
+        "graceful_timeout": 30,
+        "keepalive": 5,
+    }
+
+
+class ViseServer(BaseApplication):
+    """Gunicorn configurado desde código (sin archivo de configuración)."""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de producción de VISE API")
+    parser.add_argument("--bind", default=f"0.0.0.0:{os.getenv('PORT', '80')}")
+    parser.add_argument("--workers", type=int, default=None, help="Por defecto WEB_CONCURRENCY o los núcleos de la CPU")
+    parser.add_argument("--timeout", type=int, default=30, help="Segundos antes de reiniciar un worker colgado")
+    parser.add_argument("--skip-migrate", action="store_true", help="No migrar el esquema al arrancar")
+    args = parser.parse_args()
+
+    load_dotenv()
+    workers = args.workers or default_workers()
+
+    from app.config import settings
+
+    try:
+        changed = tune_for_workers(settings, workers)
+    except ValueError as e:
+        parser.error(str(e))
+    if changed:
+        print(f"Ajustes para {workers} workers sobre SQLite: {changed}")
+
+    if not args.skip_migrate:
+        from app.database import engine
+        from app.migrate import migrate
+
+        migrate()
+        engine.dispose()  # el maestro no se queda con conexiones que heredarían los workers
+
+    ViseServer(gunicorn_options(args.bind, workers, args.timeout)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.money import apply_rate, to_units
+from app.rules import RULE_TABLE
+
+"""
+===========================================================
+📊 Módulo: summary.py
+===========================================================
+
+Agregados de gasto por cliente mantenidos de forma incremental.
+
+- `apply_purchases` suma las compras nuevas a `client_spend_summary` con un
+  UPSERT de incrementos, dentro de la transacción que inserta las compras.
+- `rebuild_summaries` recalcula todo desde `purchases` (descuento vía
+  `calculate_discount`).
+- Montos y descuentos en centavos enteros: sumar incrementos no acumula
+  error de redondeo; `get_summary` los devuelve en unidades.
+
+Reconstrucción manual:
+    python -m app.summary rebuild
+===========================================================
+"""
+
+NO_BENEFIT = "Sin beneficio"
+
+# (client_id, dimension, bucket) → [compras, monto, descuento] (centavos)
+Totals = dict[tuple[int, str, str], list]
+
+
+def summary_keys(client_id: int, purchase_date, benefit: str | None) -> tuple[tuple[int, str, str], ...]:
+    return (
+        (client_id, "total", ""),
+        (client_id, "benefit", benefit or NO_BENEFIT),
+        (client_id, "month", purchase_date.strftime("%Y-%m")),
+    )
+
+
+def accumulate(totals: Totals, client_id: int, purchase_date, amount: int, discount: int, benefit: str | None) -> None:
+    for key in summary_keys(client_id, purchase_date, benefit):
+        entry = totals.setdefault(key, [0, 0, 0])
+        entry[0] += 1
+        entry[1] += amount
+        entry[2] += discount
+
+
+def upsert_totals(db: Session, totals: Totals) -> None:
+    """Suma `totals` a las filas existentes (o las crea) con un solo executemany."""
+    if not totals:
+        return
+    dialect = db.get_bind().dialect.name
+    insert = {"sqlite": sqlite_insert, "postgresql": pg_insert}[dialect]
+    table = models.ClientSpendSummary.__table__
+
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.client_id, table.c.dimension, table.c.bucket],
+        set_={
+            "purchase_count": table.c.purchase_count + stmt.excluded.purchase_count,
+            "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+            "total_discount": table.c.total_discount + stmt.excluded.total_discount,
+        },
+    )
+    db.execute(stmt, [
+        {
+            "client_id": client_id,
+            "dimension": dimension,
+            "bucket": bucket,
+            "purchase_count": count,
+            "total_amount": amount,
+            "total_discount": discount,
+        }
+        for (client_id, dimension, bucket), (count, amount, discount) in totals.items()
+    ])
+
+
+def apply_purchases(db: Session, purchases: Iterable) -> None:
+    """Agrega compras recién insertadas (`crud.PurchaseRecord`) al resumen."""
+    totals: Totals = {}
+    for p in purchases:
+        accumulate(totals, p.values["client_id"], p.values["purchase_date"], p.values["amount"], p.discount, p.benefit)
+    upsert_totals(db, totals)
+
+
+def rebuild_summaries(db: Session, chunk_size: int = 10_000) -> int:
+    """
+    Recalcula `client_spend_summary` desde `purchases` en una sola transacción.
+
+    Lee las compras en bloques (`yield_per`) y escribe cada bloque como
+    incrementos, así que la memoria no depende del tamaño de la tabla.
+
+    Returns:
+        int: Compras procesadas.
+    """
+    db.execute(delete(models.ClientSpendSummary))
+    query = (
+        select(
+            models.Purchase.client_id,
+            models.Purchase.amount,
+            models.Purchase.purchase_date,
+            models.Purchase.purchase_country,
+            models.Client.card_type,
+            models.Client.country,
+        )
+        .join(models.Client, models.Client.id == models.Purchase.client_id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    processed = 0
+    for chunk in db.execute(query).partitions():
+        totals: Totals = {}
+        for client_id, amount, purchase_date, purchase_country, card_type, client_country in chunk:
+            rate, benefit = RULE_TABLE.lookup(card_type, purchase_date.weekday(), purchase_country != client_country, amount)
+            accumulate(totals, client_id, purchase_date, amount, apply_rate(amount, rate), benefit)
+        upsert_totals(db, totals)
+        processed += len(chunk)
+    db.commit()
+    return processed
+
+
+def get_summary(db: Session, client_id: int) -> dict:
+    """Resumen de un cliente (lectura por clave primaria, O(grupos))."""
+    rows = db.execute(
+        select(models.ClientSpendSummary).where(models.ClientSpendSummary.client_id == client_id)
+    ).scalars().all()
+
+    summary = {
+        "clientId": client_id,
+        "purchaseCount": 0,
+        "totalAmount": 0.0,
+        "totalDiscount": 0.0,
+        "byBenefit": [],
+        "byMonth": [],
+    }
+    groups = defaultdict(list)
+    for row in rows:
+        if row.dimension == "total":
+            summary["purchaseCount"] = row.purchase_count
+            summary["totalAmount"] = to_units(row.total_amount)
+            summary["totalDiscount"] = to_units(row.total_discount)
+        else:
+            groups[row.dimension].append({
+                "key": row.bucket,
+                "purchaseCount": row.purchase_count,
+                "totalAmount": to_units(row.total_amount),
+                "totalDiscount": to_units(row.total_discount),
+            })
+    summary["byBenefit"] = sorted(groups["benefit"], key=lambda g: g["key"])
+    summary["byMonth"] = sorted(groups["month"], key=lambda g: g["key"])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de client_spend_summary")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+    from app.migrate import migrate
+
+    migrate()
+    with SessionLocal() as db:
+        processed = rebuild_summaries(db, chunk_size=args.chunk_size)
+    print(f"✅ Resumen reconstruido a partir de {processed} compras.")
+
+
+if __name__ == "__main__":
+    main()
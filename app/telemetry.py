@@ -1,5 +1,145 @@
 import os
-from azure.monitor.opentelemetry import configure_azure_monitor
+
+from app.config import settings
+
+"""
+===========================================================
+📡 Módulo: telemetry.py
+===========================================================
+
+Observabilidad con Grafana Cloud (OTLP) y Azure Application Insights.
+
+Los módulos de OpenTelemetry y de Azure se importan dentro de cada función
+y solo si sus variables de entorno están definidas: sin configuración,
+importar la app no carga ningún SDK ni exportador.
+
+- `otlp_configured()` / `azure_configured()` → qué destinos están activos.
+- `instrument_app(app)` → capa ASGI de trazas (ver `app.tracing`); se llama al
+  crear la app porque Starlette no admite middlewares una vez arrancada.
+- `setup_otel()` / `setup_azure_monitor()` → proveedores y exportadores; se
+  llaman desde el lifespan. Los middlewares usan los proveedores globales de
+  forma diferida, así que toman los exportadores configurados después.
+- `trace_rejected_purchase()` → deja constancia de un rechazo en la traza;
+  si la traza no fue muestreada crea un span forzado, con el proveedor de
+  OTLP o con el de Azure Monitor. Sin trazas no hace nada.
+===========================================================
+"""
+
+_rejection_tracer = None
+
+
+def otlp_endpoint() -> tuple[str, str]:
+    return (
+        os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "").rstrip("/"),
+        os.getenv("OTEL_EXPORTER_OTLP_HEADERS", ""),
+    )
+
+
+def otlp_configured() -> bool:
+    endpoint, headers = otlp_endpoint()
+    return bool(endpoint and headers)
+
+
+def azure_configured() -> bool:
+    return bool(os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING"))
+
+
+def telemetry_configured() -> bool:
+    return otlp_configured() or azure_configured()
+
+
+def tracing_enabled() -> bool:
+    return settings.TRACING_PROFILE != "off" and telemetry_configured()
+
+
+def instrument_app(app) -> None:
+    """Instrumenta la app si hay trazas activas y algún destino configurado."""
+    if not tracing_enabled():
+        return
+
+    from app.tracing import instrument_app as instrument
+
+    instrument(app)
+
+
+def use_tracer_provider(provider) -> None:
+    """Tracer con el que `trace_rejected_purchase` crea sus spans forzados."""
+    global _rejection_tracer
+    _rejection_tracer = provider.get_tracer("app.purchases")
+
+
+def trace_rejected_purchase(reason: str, card_type: str | None = None) -> None:
+    """Anota un rechazo en el span actual, o en un span forzado si la traza no se muestreó."""
+    if _rejection_tracer is None:
+        return
+
+    from opentelemetry import trace
+
+    from app.tracing import FORCE_SAMPLE_ATTRIBUTE
+
+    attributes = {"vise.purchase.rejection_reason": reason}
+    if card_type is not None:
+        attributes["vise.card_type"] = card_type
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.add_event("purchase.rejected", attributes)
+        return
+    _rejection_tracer.start_span("purchase.rejected", attributes={**attributes, FORCE_SAMPLE_ATTRIBUTE: True}).end()
+
+
+def setup_otel(service_name: str = "vise-api"):
+    """Configura exportadores OTLP para Grafana Cloud (solo con endpoint y cabeceras definidos)."""
+    if not otlp_configured():
+        print("OpenTelemetry OTLP no configurado (faltan variables de entorno).")
+        return
+    endpoint, headers = otlp_endpoint()
+
+    from opentelemetry import _logs, metrics
+    from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter
+    from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.instrumentation.logging import LoggingInstrumentor
+    from opentelemetry.instrumentation.requests import RequestsInstrumentor
+    from opentelemetry.sdk._logs import LoggerProvider
+    from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+
+    resource = Resource.create({
+        "service.name": service_name,
+        "service.namespace": "vise",
+        "deployment.environment": "production",
+    })
+    auth = {"Authorization": headers}
+
+    # --- Traces ---
+    if settings.TRACING_PROFILE != "off":
+        from app.tracing import install_tracer_provider
+
+        tracer_provider = install_tracer_provider(
+            resource, OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces", headers=auth)
+        )
+        use_tracer_provider(tracer_provider)
+
+    # --- Metrics ---
+    metric_reader = PeriodicExportingMetricReader(
+        OTLPMetricExporter(endpoint=f"{endpoint}/v1/metrics", headers=auth)
+    )
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[metric_reader]))
+
+    # --- Logs ---
+    logger_provider = LoggerProvider(resource=resource)
+    logger_provider.add_log_record_processor(
+        BatchLogRecordProcessor(OTLPLogExporter(endpoint=f"{endpoint}/v1/logs", headers=auth))
+    )
+    _logs.set_logger_provider(logger_provider)
+
+    LoggingInstrumentor().instrument(set_logging_format=True)
+    RequestsInstrumentor().instrument()
+
+    print("✅ OpenTelemetry configurado para Grafana Cloud.")
+
 
 def setup_azure_monitor():
     """Inicializa Application Insights si existe la variable de conexión."""
@@ -10,7 +150,21 @@ def setup_azure_monitor():
         return
 
     try:
-        configure_azure_monitor(connection_string=connection_string)
+        from azure.monitor.opentelemetry import configure_azure_monitor
+
+        options = {"instrumentation_options": {"fastapi": {"enabled": False}}}
+        if settings.TRACING_PROFILE == "off":
+            options["disable_tracing"] = True
+        elif settings.TRACING_PROFILE == "sampled":
+            options["sampling_ratio"] = settings.TRACING_SAMPLE_RATIO
+        configure_azure_monitor(connection_string=connection_string, **options)
+        if settings.TRACING_PROFILE != "off":
+            # Azure registra su propio proveedor global: se le agrega el muestreo forzado
+            from opentelemetry import trace
+
+            from app.tracing import force_sample_marked_spans
+
+            use_tracer_provider(force_sample_marked_spans(trace.get_tracer_provider()))
         print("Application Insights configurado correctamente.")
     except Exception as e:
         print(f"Error configurando Application Insights: {e}")
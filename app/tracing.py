@@ -0,0 +1,91 @@
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_ON,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+
+from app.config import settings
+
+"""
+===========================================================
+🔭 Módulo: tracing.py
+===========================================================
+
+Perfil de trazas (`TRACING_PROFILE`). Solo se importa cuando hay trazas
+activas: `app.telemetry` lo carga de forma diferida.
+
+- Una única capa ASGI (`FastAPIInstrumentor`): el middleware de Starlette
+  duplicaba el span de servidor de cada request.
+- "sampled" → `ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO))` y sin
+  los spans internos de send/receive; "full" → todas las trazas.
+- Las URLs de `TRACING_EXCLUDED_URLS` (raíz, monitoreo, docs) no se trazan.
+- `ForceSampleOverride` conserva cualquier span creado con el atributo
+  `vise.force_sample` aunque su traza no haya sido muestreada: así se
+  guardan siempre las compras rechazadas. Con Azure Monitor, que crea su
+  propio proveedor, se agrega después con `force_sample_marked_spans`.
+===========================================================
+"""
+
+FORCE_SAMPLE_ATTRIBUTE = "vise.force_sample"
+
+
+class ForceSampleOverride(Sampler):
+    """Muestrea los spans marcados con `vise.force_sample`; el resto lo decide `delegate`."""
+
+    def __init__(self, delegate: Sampler):
+        self._delegate = delegate
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        if attributes and attributes.get(FORCE_SAMPLE_ATTRIBUTE):
+            return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes, trace_state)
+        return self._delegate.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self) -> str:
+        return f"ForceSampleOverride{{{self._delegate.get_description()}}}"
+
+
+def build_sampler(profile: str = None, ratio: float = None) -> Sampler:
+    profile = profile or settings.TRACING_PROFILE
+    ratio = settings.TRACING_SAMPLE_RATIO if ratio is None else ratio
+    delegate = ALWAYS_ON if profile == "full" else ParentBased(TraceIdRatioBased(ratio))
+    return ForceSampleOverride(delegate)
+
+
+def install_tracer_provider(resource=None, exporter=None) -> TracerProvider:
+    """Registra el `TracerProvider` global con el muestreo del perfil y el exportador dado."""
+    kwargs = {"sampler": build_sampler()}
+    if resource is not None:
+        kwargs["resource"] = resource
+    provider = TracerProvider(**kwargs)
+    if exporter is not None:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def force_sample_marked_spans(provider):
+    """
+    Envuelve en `ForceSampleOverride` el muestreador de un proveedor creado por
+    otro (Azure Monitor); vale para los tracers que se pidan después.
+    """
+    sampler = getattr(provider, "sampler", None)
+    if sampler is not None and not isinstance(sampler, ForceSampleOverride):
+        provider.sampler = ForceSampleOverride(sampler)
+    return provider
+
+
+def instrument_app(app, tracer_provider=None) -> None:
+    """Instrumenta la app con una sola capa ASGI según el perfil activo."""
+    FastAPIInstrumentor().instrument_app(
+        app,
+        tracer_provider=tracer_provider,
+        excluded_urls=settings.TRACING_EXCLUDED_URLS,
+        exclude_spans=None if settings.TRACING_PROFILE == "full" else ["receive", "send"],
+    )
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from app import crud, metrics
+from app.config import settings
+from app.database import SessionLocal
+
+"""
+===========================================================
+📝 Módulo: writer.py
+===========================================================
+
+Escritura agrupada (group commit) de compras.
+
+- Los handlers encolan la compra (`crud.PurchaseRecord`) y esperan un `Future`.
+- Un único hilo escritor junta filas hasta `GROUP_COMMIT_MAX_ROWS` o
+  `GROUP_COMMIT_MAX_DELAY_MS` y las inserta con un solo commit.
+- Cada `Future` se resuelve con el id asignado solo después del commit,
+  así que el cliente recibe la respuesta con la misma durabilidad que antes.
+- `write` / `awrite` esperan como mucho `timeout` (`DB_POOL_TIMEOUT`), igual
+  que un handler esperando una conexión del pool; al vencer, la compra se
+  cancela si el escritor todavía no la tomó.
+- `stop` confirma lo encolado antes de la parada; lo que llega detrás falla
+  con `WriterStopped` en lugar de quedar esperando para siempre.
+- Si el lote falla, se reintenta fila por fila para aislar la que falla.
+
+Se activa con `PURCHASE_GROUP_COMMIT=true`.
+===========================================================
+"""
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriterStopped(RuntimeError):
+    """La compra llegó después de detener el escritor y no se escribió."""
+
+
+class GroupCommitWriter:
+
+    def __init__(self, session_factory, max_rows: int, max_delay: float, enabled: bool = True, timeout: float = 30.0):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.enabled = enabled
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue | None = None
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    def submit(self, purchase: crud.PurchaseRecord) -> Future:
+        """Encola una compra; el `Future` devuelve su id una vez confirmada."""
+        future: Future = Future()
+        self._ensure_started().put((purchase, future))
+        return future
+
+    def write(self, purchase: crud.PurchaseRecord) -> int:
+        """Encola una compra y espera su id como mucho `timeout` segundos."""
+        future = self.submit(purchase)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"La compra no se confirmó en {self.timeout} s") from None
+
+    async def awrite(self, purchase: crud.PurchaseRecord) -> int:
+        """Versión asíncrona de `write` (al vencer, `wait_for` cancela el `Future`)."""
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self.submit(purchase)), self.timeout)
+        except TimeoutError:
+            raise TimeoutError(f"La compra no se confirmó en {self.timeout} s") from None
+
+    def _ensure_started(self) -> queue.SimpleQueue:
+        # Tras un fork el hilo escritor no existe en el proceso hijo: se crea otro
+        if self._thread is None or self._pid != os.getpid():
+            with self._lock:
+                if self._thread is None or self._pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                    self._pid = os.getpid()
+                    self._thread = threading.Thread(target=self._run, name="purchase-writer", daemon=True)
+                    self._thread.start()
+        return self._queue
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Vacía la cola pendiente y detiene el hilo escritor."""
+        with self._lock:
+            thread, q = self._thread, self._queue
+            if thread is None or self._pid != os.getpid():
+                return
+            q.put(_STOP)
+            self._thread = None
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        q = self._queue
+        stopping = False
+        while not stopping:
+            item = q.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+        self._reject_pending(q)
+
+    @staticmethod
+    def _reject_pending(q: queue.SimpleQueue) -> None:
+        # Un `submit` que tomó la cola antes de `stop` puede encolar detrás de _STOP
+        while True:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(WriterStopped("El escritor de compras se detuvo"))
+
+    def _flush(self, batch: list[tuple[crud.PurchaseRecord, Future]]) -> None:
+        # Filas cuyo handler ya se canceló no se escriben
+        batch = [(values, future) for values, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            ids = self._insert([values for values, _ in batch])
+        except Exception:
+            logger.exception("Falló el lote de %d compras; reintentando fila por fila", len(batch))
+            for values, future in batch:
+                try:
+                    future.set_result(self._insert([values])[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        for (_, future), purchase_id in zip(batch, ids):
+            future.set_result(purchase_id)
+
+    def _insert(self, purchases: list[crud.PurchaseRecord]) -> list[int]:
+        with self.session_factory() as db:
+            ids = crud.create_purchases(db, purchases)
+            metrics.timed_commit(db, metrics.COMMIT_GROUP)
+        return ids
+
+
+purchase_writer = GroupCommitWriter(
+    SessionLocal,
+    max_rows=settings.GROUP_COMMIT_MAX_ROWS,
+    max_delay=settings.GROUP_COMMIT_MAX_DELAY_MS / 1000,
+    enabled=settings.PURCHASE_GROUP_COMMIT,
+    timeout=settings.DB_POOL_TIMEOUT,
+)
@@ -0,0 +1,133 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+"""
+===========================================================
+📈 Benchmark: reporte de descuentos (ORM fila a fila vs columnas)
+===========================================================
+
+Arma el reporte tarjeta × día de la semana × beneficio sobre `--rows`
+compras sintéticas en un SQLite temporal, de tres formas:
+
+- orm      → objetos `Purchase` (con su `Client`) y un dict de totales,
+             llamando a `RULE_TABLE.lookup` por fila.
+- cold     → `PurchaseColumns` vacía: carga completa + `group_by`.
+- warm     → columnas ya cargadas: `refresh` (sin filas nuevas) + `group_by`,
+             lo que hace cada request de `GET /analytics/discounts`.
+
+Memoria: pico de tracemalloc por fila durante la agregación ORM frente a
+los bytes por fila de las columnas.
+
+Uso:
+    python -m benchmarks.analytics --rows 200000
+===========================================================
+"""
+
+CARDS = ("Classic", "Gold", "Platinum", "Black", "White")
+COUNTRIES = (840, 840, 840, 250, 484, 604)
+
+
+def seed(path: str, rows: int, clients: int = 500) -> None:
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO clients (id, name, country, monthly_income, vise_club, card_type) VALUES (?, ?, 840, 500000, 1, ?)",
+        ((i + 1, f"Bench {i}", CARDS[i % len(CARDS)]) for i in range(clients)),
+    )
+    start = datetime(2025, 1, 1)
+    conn.executemany(
+        "INSERT INTO purchases (client_id, amount, currency, purchase_date, purchase_country) VALUES (?, ?, 'USD', ?, ?)",
+        (
+            (i % clients + 1, 2_000 + (i * 3_701) % 48_000, (start + timedelta(minutes=7 * i)).isoformat(" "), COUNTRIES[i % len(COUNTRIES)])
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def orm_report() -> dict:
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload
+
+    from app import models
+    from app.database import SessionLocal
+    from app.money import apply_rate
+    from app.rules import RULE_TABLE
+
+    totals = defaultdict(lambda: [0, 0, 0])
+    with SessionLocal() as db:
+        purchases = db.execute(select(models.Purchase).options(joinedload(models.Purchase.client))).scalars().all()
+        for p in purchases:
+            weekday = p.purchase_date.weekday()
+            rate, benefit = RULE_TABLE.lookup(p.client.card_type, weekday, p.purchase_country != p.client.country, p.amount)
+            entry = totals[(p.client.card_type, weekday, benefit)]
+            entry[0] += 1
+            entry[1] += p.amount
+            entry[2] += apply_rate(p.amount, rate)
+    return totals
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="vise-analytics-") as tmp:
+        path = os.path.join(tmp, "analytics.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+        from app.analytics import PurchaseColumns
+        from app.database import engine
+        from app.migrate import migrate
+
+        migrate()
+        seed(path, args.rows)
+        dimensions = ["cardType", "weekday", "benefit"]
+
+        def cold():
+            columns = PurchaseColumns()
+            columns.refresh(engine)
+            return columns.group_by(dimensions)
+
+        warm_columns = PurchaseColumns()
+        warm_columns.refresh(engine)
+
+        def warm():
+            warm_columns.refresh(engine)
+            return warm_columns.group_by(dimensions)
+
+        results = {
+            "orm_ms": round(timed(orm_report, args.repeat), 1),
+            "cold_ms": round(timed(cold, args.repeat), 1),
+            "warm_ms": round(timed(warm, args.repeat), 2),
+        }
+
+        tracemalloc.start()
+        orm_report()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["orm_bytes_per_row"] = round(peak / args.rows)
+        results["columnar_bytes_per_row"] = round(warm_columns.nbytes / warm_columns.size, 1)
+
+        engine.dispose()
+        print(f"{args.rows} compras: {results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.analytics import seed
+
+"""
+===========================================================
+🧪 Benchmark: escalado del backtesting de reglas
+===========================================================
+
+Corre `app.backtest.backtest` (reglas actuales contra una copia de sí
+mismas) sobre `--rows` compras sintéticas con 1, 2, 4... procesos y
+muestra el tiempo, la aceleración frente a un proceso y el RSS máximo de
+los procesos del pool (debería depender de `--chunk-size`, no de `--rows`).
+
+Uso:
+    python -m benchmarks.backtest --rows 1000000 --workers 1,2,4,8
+===========================================================
+"""
+
+
+def default_worker_counts() -> list[int]:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--workers", type=lambda v: [int(x) for x in v.split(",")], default=default_worker_counts())
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="vise-backtest-") as tmp:
+        path = os.path.join(tmp, "backtest.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+        from app.backtest import backtest
+        from app.database import engine
+        from app.migrate import migrate
+        from app.rules import DISCOUNT_RULES
+
+        migrate()
+        seed(path, args.rows)
+        engine.dispose()
+
+        base = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            total = backtest(DISCOUNT_RULES, workers, args.chunk_size)
+            seconds = time.perf_counter() - start
+            base = base or seconds
+            rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+            print(f"{workers:>3} workers: {seconds:7.2f} s  x{base / seconds:.2f}  "
+                  f"{total['chunks']} rangos  RSS máx. worker {rss_mb:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+"""
+===========================================================
+⏱️ Utilidades compartidas por los benchmarks
+===========================================================
+
+- `run_requests` → lanza peticiones HTTP con concurrencia fija y mide latencias.
+- `summarize` → throughput y percentiles p50/p95/p99.
+- `run_isolated` → ejecuta un worker en un proceso nuevo (para cambiar
+  DATABASE_URL u otras variables que se leen al importar `app`).
+===========================================================
+"""
+
+
+# Una línea de log por petición distorsiona las mediciones
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def asgi_client(app) -> httpx.AsyncClient:
+    """Cliente HTTP contra la app en el mismo proceso (sin red)."""
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+
+
+async def run_requests(
+    client: httpx.AsyncClient,
+    requests: list[tuple[str, str, object]],
+    concurrency: int,
+    by_path: bool = False,
+) -> dict:
+    """
+    Ejecuta `requests` (método, ruta, cuerpo JSON) con `concurrency` peticiones en vuelo.
+
+    Cuenta como error cualquier respuesta 5xx o excepción de transporte
+    (los 400 de negocio son respuestas válidas). Con `by_path` agrega
+    `byPath`: el mismo resumen por ruta.
+    """
+    pending = iter(requests)
+    latencies: list[float] = []
+    paths: dict[str, list] = {}
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for method, path, body in pending:
+            failed = False
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                failed = response.status_code >= 500
+            except httpx.HTTPError:
+                failed = True
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            errors += failed
+            if by_path:
+                stats = paths.setdefault(path, [[], 0])
+                stats[0].append(elapsed)
+                stats[1] += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies, errors, elapsed)
+    if by_path:
+        result["byPath"] = {path: summarize(lat, err, elapsed) for path, (lat, err) in paths.items()}
+    return result
+
+
+def run_isolated(module: str, args: list[str], env: dict[str, str]) -> dict:
+    """Ejecuta `python -m module args` con `env` y devuelve el JSON de su última línea."""
+    completed = subprocess.run(
+        [sys.executable, "-m", module, *args],
+        env={**os.environ, **env},
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
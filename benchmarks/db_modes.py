@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+from benchmarks.common import asgi_client, run_isolated, run_requests
+
+"""
+===========================================================
+⚡ Benchmark: modo síncrono vs. asíncrono de la base de datos
+===========================================================
+
+Levanta la app en un proceso por modo (el modo se elige con DATABASE_URL),
+registra un cliente por tipo de tarjeta y lanza compras con alta concurrencia.
+
+Uso:
+    python -m benchmarks.db_modes --concurrency 200 --requests 4000
+    python -m benchmarks.db_modes --sync-url postgresql://... --async-url postgresql+asyncpg://...
+===========================================================
+"""
+
+CARDS = ["Classic", "Gold", "Platinum", "Black", "White"]
+
+
+async def _workload(requests: int, concurrency: int) -> dict:
+    from app.main import app
+    from app.database import async_engine, engine
+    from app.migrate import migrate
+
+    migrate()
+
+    try:
+        return await _run(app, requests, concurrency)
+    finally:
+        # Las conexiones aiosqlite viven en hilos propios: sin dispose el proceso no termina
+        if async_engine is not None:
+            await async_engine.dispose()
+        engine.dispose()
+
+
+async def _run(app, requests: int, concurrency: int) -> dict:
+    async with asgi_client(app) as client:
+        client_ids = []
+        for card in CARDS:
+            response = await client.post("/client", json={
+                "name": f"Bench {card}", "country": "USA", "monthlyIncome": 5000,
+                "viseClub": True, "cardType": card,
+            })
+            client_ids.append(response.json()["clientId"])
+
+        purchases = [
+            ("POST", "/purchase", {
+                "clientId": client_ids[i % len(client_ids)],
+                "amount": 50 + (i % 400),
+                "currency": "USD",
+                "purchaseDate": f"2025-09-{22 + i % 7:02d}T12:00:00",
+                "purchaseCountry": "USA" if i % 5 else "France",
+            })
+            for i in range(requests)
+        ]
+        return await run_requests(client, purchases, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--sync-url", help="DATABASE_URL del modo síncrono (por defecto SQLite temporal)")
+    parser.add_argument("--async-url", help="DATABASE_URL del modo asíncrono (por defecto aiosqlite temporal)")
+    parser.add_argument("--out", help="Archivo JSON de resultados")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_workload(args.requests, args.concurrency))))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        urls = {
+            "sync": args.sync_url or f"sqlite:///{os.path.join(tmp, 'sync.db')}",
+            "async": args.async_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'async.db')}",
+        }
+        for mode, url in urls.items():
+            results[mode] = run_isolated(
+                "benchmarks.db_modes",
+                ["--worker", "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                {"DATABASE_URL": url},
+            )
+            print(f"{mode:>5}: {results[mode]}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"concurrency": args.concurrency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
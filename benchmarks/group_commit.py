@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.common import run_isolated
+
+"""
+===========================================================
+📝 Benchmark: commit por petición vs. escritura agrupada
+===========================================================
+
+Ejecuta la misma carga de `/purchase` (ver `benchmarks.db_modes`) con
+PURCHASE_GROUP_COMMIT apagado y encendido. Por defecto usa
+SQLITE_SYNCHRONOUS=FULL para que cada commit pague su fsync.
+
+Uso:
+    python -m benchmarks.group_commit --concurrency 100 --requests 3000
+===========================================================
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--synchronous", default="FULL", help="PRAGMA synchronous de SQLite")
+    parser.add_argument("--max-rows", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--database-url", help="DATABASE_URL (por defecto SQLite temporal)")
+    parser.add_argument("--out", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, enabled in (("per-request", "false"), ("group-commit", "true")):
+            url = args.database_url or f"sqlite:///{os.path.join(tmp, mode + '.db')}"
+            results[mode] = run_isolated(
+                "benchmarks.db_modes",
+                ["--worker", "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                {
+                    "DATABASE_URL": url,
+                    "SQLITE_SYNCHRONOUS": args.synchronous,
+                    "PURCHASE_GROUP_COMMIT": enabled,
+                    "GROUP_COMMIT_MAX_ROWS": str(args.max_rows),
+                    "GROUP_COMMIT_MAX_DELAY_MS": str(args.max_delay_ms),
+                },
+            )
+            print(f"{mode:>12}: {results[mode]}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"concurrency": args.concurrency, "synchronous": args.synchronous, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+
+from benchmarks.common import summarize
+
+"""
+===========================================================
+📜 Escenarios derivados de `session.hurl`
+===========================================================
+
+Lee el subconjunto de Hurl que usa `session.hurl` y lo reproduce como
+escenario fijo de carga:
+
+- Peticiones `MÉTODO {{host}}/ruta` con cuerpo JSON y cabeceras opcionales.
+- Estado esperado (`HTTP 200`, `HTTP/1.1 200` o `HTTP *` = cualquiera).
+- `[Captures]` con `jsonpath "$['campo']"` o `"$.a.b"`; las variables
+  capturadas se sustituyen en los cuerpos siguientes (`{{ gold_id }}`).
+
+Los `[Asserts]` de negocio no se evalúan: para eso está `hurl --test`.
+Aquí solo cuenta que el estado HTTP sea el esperado.
+===========================================================
+"""
+
+SESSION_FILE = Path(__file__).resolve().parent.parent / "session.hurl"
+
+_REQUEST = re.compile(r"^(GET|POST|PUT|PATCH|DELETE)\s+(\S+)\s*$")
+_STATUS = re.compile(r"^HTTP(?:/[\d.]+)?\s+(\d{3}|\*)\s*$")
+_HEADER = re.compile(r"^[A-Za-z0-9-]+:\s")
+_CAPTURE = re.compile(r'^(\w+):\s*jsonpath\s+"([^"]+)"\s*$')
+_VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_HOST = re.compile(r"^\{\{\s*host\s*\}\}")
+
+
+class HurlEntry(NamedTuple):
+    method: str
+    path: str
+    body: str | None  # plantilla: puede contener {{ variables }}
+    status: int | None  # None → cualquier estado
+    captures: dict[str, str]
+
+
+def parse_hurl(text: str) -> list[HurlEntry]:
+    """Convierte el texto de un archivo Hurl en la lista de peticiones a reproducir."""
+    entries: list[HurlEntry] = []
+    current = None
+    section = None
+
+    def close():
+        if current is not None:
+            entries.append(HurlEntry(
+                current["method"],
+                current["path"],
+                "\n".join(current["body"]) or None,
+                current["status"],
+                current["captures"],
+            ))
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if match := _REQUEST.match(stripped):
+            close()
+            method, url = match.groups()
+            current = {"method": method, "path": _HOST.sub("", url), "body": [], "status": None, "captures": {}}
+            section = "request"
+            continue
+        if current is None:
+            continue
+        if match := _STATUS.match(stripped):
+            code = match.group(1)
+            current["status"] = None if code == "*" else int(code)
+            section = "response"
+        elif stripped.startswith("[") and stripped.endswith("]"):
+            section = stripped[1:-1]
+        elif section == "request" and not current["body"] and _HEADER.match(stripped):
+            continue
+        elif section == "request":
+            current["body"].append(line)
+        elif section == "Captures" and (match := _CAPTURE.match(stripped)):
+            current["captures"][match.group(1)] = match.group(2)
+    close()
+    return entries
+
+
+def load_session(path: Path = SESSION_FILE) -> list[HurlEntry]:
+    return parse_hurl(path.read_text(encoding="utf-8"))
+
+
+def jsonpath(document, expression: str):
+    """Subconjunto de JSONPath usado en las capturas: `$.a.b` y `$['a']`."""
+    keys = re.findall(r"\['([^']+)'\]|\.(\w+)", expression[1:])
+    for bracket, dotted in keys:
+        document = document[bracket or dotted]
+    return document
+
+
+def render(template: str | None, variables: dict):
+    if template is None:
+        return None
+    return json.loads(_VARIABLE.sub(lambda m: json.dumps(variables[m.group(1)]), template))
+
+
+async def replay(client: httpx.AsyncClient, entries: list[HurlEntry], latencies: list[float]) -> int:
+    """Reproduce la sesión una vez; devuelve cuántas peticiones fallaron."""
+    variables: dict = {}
+    errors = 0
+    for entry in entries:
+        start = time.perf_counter()
+        try:
+            response = await client.request(entry.method, entry.path, json=render(entry.body, variables))
+        except (httpx.HTTPError, KeyError):
+            errors += 1
+            latencies.append(time.perf_counter() - start)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 500 or (entry.status is not None and response.status_code != entry.status):
+            errors += 1
+            continue
+        for name, expression in entry.captures.items():
+            variables[name] = jsonpath(response.json(), expression)
+    return errors
+
+
+async def run_sessions(client: httpx.AsyncClient, entries: list[HurlEntry], sessions: int, concurrency: int) -> dict:
+    """`sessions` reproducciones de la sesión, `concurrency` de ellas en paralelo."""
+    latencies: list[float] = []
+    errors = 0
+    pending = iter(range(sessions))
+
+    async def user():
+        nonlocal errors
+        for _ in pending:
+            errors += await replay(client, entries, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - start)
+    result["sessions"] = sessions
+    return result
@@ -0,0 +1,289 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import asgi_client, run_isolated, run_requests
+from benchmarks.hurl import load_session, run_sessions
+
+"""
+===========================================================
+🏋️ Benchmark: carga local de /client y /purchase
+===========================================================
+
+Levanta la app contra una base SQLite temporal, en un proceso nuevo por
+almacenamiento, y mide throughput y latencias p50/p95/p99.
+
+Almacenamientos (`--storage`):
+- file   → archivo SQLite con journal clásico (DELETE) y synchronous=FULL.
+- wal    → archivo SQLite en WAL con synchronous=NORMAL (perfil por defecto).
+- memory → archivo en tmpfs (/dev/shm), WAL y synchronous=OFF: sin E/S de disco.
+  Un `:memory:` puro no sirve: cada conexión del pool tendría su propia base.
+
+Escenarios (`--scenario`):
+- mix  → tráfico mezclado: `--client-ratio` de altas de clientes y el resto
+         compras sobre clientes ya registrados (domésticas, en el exterior y
+         en países prohibidos), con semilla fija.
+- hurl → la sesión de `session.hurl` reproducida `--sessions` veces.
+
+Servidor (`--server`):
+- inprocess → la app en el mismo proceso que el cliente (ASGI, sin red).
+- uvicorn   → la app en un proceso uvicorn y peticiones HTTP por localhost.
+
+Los resultados se escriben en JSON (`--out`) junto con el commit actual;
+`--baseline` compara contra un JSON anterior.
+
+Uso:
+    python -m benchmarks.load --concurrency 50 --requests 2000 --out load.json
+    python -m benchmarks.load --server uvicorn --storage wal --baseline load.json
+===========================================================
+"""
+
+STORAGES = ("file", "wal", "memory")
+SCENARIOS = ("mix", "hurl")
+CARDS = ("Classic", "Gold", "Platinum", "Black", "White")
+COUNTRIES = ("USA", "Colombia", "Mexico", "Spain", "France")
+BANNED = ("China", "Vietnam", "India")
+
+
+def storage_env(storage: str, tmp: str, shm: str) -> dict[str, str]:
+    """Variables de entorno de cada almacenamiento (se leen al importar `app`); `shm` es un directorio en tmpfs."""
+    if storage == "file":
+        return {
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'file.db')}",
+            "SQLITE_JOURNAL_MODE": "DELETE",
+            "SQLITE_SYNCHRONOUS": "FULL",
+        }
+    if storage == "wal":
+        return {
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'wal.db')}",
+            "SQLITE_JOURNAL_MODE": "WAL",
+            "SQLITE_SYNCHRONOUS": "NORMAL",
+        }
+    return {
+        "DATABASE_URL": f"sqlite:///{os.path.join(shm, 'memory.db')}",
+        "SQLITE_JOURNAL_MODE": "WAL",
+        "SQLITE_SYNCHRONOUS": "OFF",
+    }
+
+
+# ============================================================
+# 🎲 Tráfico mezclado
+# ============================================================
+
+def client_payload(rng: random.Random, index: int) -> dict:
+    card = rng.choice(CARDS)
+    return {
+        "name": f"Load {card} {index}",
+        "country": rng.choice(COUNTRIES),
+        "monthlyIncome": rng.choice((300, 800, 1500, 2500, 6000)),
+        "viseClub": rng.random() < 0.7,
+        "cardType": card,
+    }
+
+
+def purchase_payload(rng: random.Random, client_ids: list[int]) -> dict:
+    roll = rng.random()
+    country = "USA" if roll < 0.8 else rng.choice(BANNED) if roll < 0.85 else rng.choice(COUNTRIES[1:])
+    return {
+        "clientId": rng.choice(client_ids),
+        "amount": round(rng.uniform(20, 500), 2),
+        "currency": "USD",
+        "purchaseDate": f"2025-09-{22 + rng.randrange(7):02d}T{rng.randrange(24):02d}:00:00",
+        "purchaseCountry": country,
+    }
+
+
+async def seed_clients(client: httpx.AsyncClient, count: int) -> list[int]:
+    """Clientes aptos (uno por tarjeta, en rotación) a los que apuntan las compras."""
+    ids = []
+    for i in range(count):
+        card = CARDS[i % len(CARDS)]
+        response = await client.post("/client", json={
+            "name": f"Seed {card} {i}", "country": "USA", "monthlyIncome": 5000,
+            "viseClub": True, "cardType": card,
+        })
+        ids.append(response.json()["clientId"])
+    return ids
+
+
+async def run_mix(client: httpx.AsyncClient, args) -> dict:
+    rng = random.Random(args.seed)
+    client_ids = await seed_clients(client, args.seed_clients)
+    requests = [
+        ("POST", "/client", client_payload(rng, i)) if rng.random() < args.client_ratio
+        else ("POST", "/purchase", purchase_payload(rng, client_ids))
+        for i in range(args.requests)
+    ]
+    await run_requests(client, requests[: args.warmup], args.concurrency)
+    return await run_requests(client, requests, args.concurrency, by_path=True)
+
+
+async def run_scenarios(client: httpx.AsyncClient, args) -> dict:
+    results = {}
+    for scenario in args.scenario:
+        if scenario == "mix":
+            results[scenario] = await run_mix(client, args)
+        else:
+            results[scenario] = await run_sessions(client, load_session(), args.sessions, args.concurrency)
+    return results
+
+
+# ============================================================
+# 🚀 Procesos: app en el mismo proceso o detrás de uvicorn
+# ============================================================
+
+async def _inprocess(args) -> dict:
+    from app.database import engine
+    from app.main import app
+    from app.migrate import migrate
+
+    migrate()
+    try:
+        async with app.router.lifespan_context(app):
+            async with asgi_client(app) as client:
+                return await run_scenarios(client, args)
+    finally:
+        engine.dispose()
+
+
+def _serve(port: int) -> None:
+    import uvicorn
+
+    from app.migrate import migrate
+
+    migrate()
+    uvicorn.run("app.main:app", host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _against_uvicorn(args, env: dict[str, str]) -> dict:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load", "--serve", str(port)],
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn no arrancó")
+                    await asyncio.sleep(0.1)
+            return await run_scenarios(client, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Imprime la variación de throughput y p95 frente a un JSON anterior."""
+    for storage, scenarios in results.items():
+        for scenario, stats in scenarios.items():
+            old = baseline.get("results", {}).get(storage, {}).get(scenario)
+            if not old:
+                continue
+            rps = (stats["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0.0
+            p95 = (stats["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+            print(f"{storage:>6}/{scenario:<4} throughput {rps:+6.1f}%  p95 {p95:+6.1f}%")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _choices(value: str, allowed: tuple[str, ...]) -> list[str]:
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = set(items) - set(allowed)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"valores no válidos: {', '.join(sorted(unknown))}")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage", type=lambda v: _choices(v, STORAGES), default=list(STORAGES))
+    parser.add_argument("--scenario", type=lambda v: _choices(v, SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--server", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--requests", type=int, default=2000, help="Peticiones del escenario mix")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--client-ratio", type=float, default=0.1, help="Fracción de altas de clientes en mix")
+    parser.add_argument("--seed-clients", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=100, help="Reproducciones de session.hurl")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", help="JSON anterior con el que comparar")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.serve)
+        return
+    if args.worker:
+        print(json.dumps(asyncio.run(_inprocess(args))))
+        return
+
+    forwarded = [
+        "--scenario", ",".join(args.scenario), "--requests", str(args.requests),
+        "--concurrency", str(args.concurrency), "--client-ratio", str(args.client_ratio),
+        "--seed-clients", str(args.seed_clients), "--warmup", str(args.warmup),
+        "--sessions", str(args.sessions), "--seed", str(args.seed),
+    ]
+    results = {}
+    shm_root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory(dir=shm_root) as shm:
+        for storage in args.storage:
+            env = storage_env(storage, tmp, shm)
+            if args.server == "inprocess":
+                results[storage] = run_isolated("benchmarks.load", ["--worker", *forwarded], env)
+            else:
+                results[storage] = asyncio.run(_against_uvicorn(args, env))
+            for scenario, stats in results[storage].items():
+                summary = {k: v for k, v in stats.items() if k != "byPath"}
+                print(f"{storage:>6}/{scenario:<4}: {summary}")
+
+    report = {
+        "commit": git_commit(),
+        "server": args.server,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "clientRatio": args.client_ratio,
+        "sessions": args.sessions,
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app import countries
+from app.money import to_cents
+from app.rules import (
+    BANNED_COUNTRIES,
+    DISCOUNT_RULES,
+    CardType,
+    calculate_discount,
+    validate_client,
+    validate_purchase,
+)
+
+"""
+===========================================================
+🧮 Microbenchmark: reglas de negocio (app/rules.py)
+===========================================================
+
+Mide `validate_client`, `validate_purchase` y `calculate_discount` sobre la
+matriz completa de casos y los compara con una línea base guardada.
+
+Casos:
+- calculate_discount → tarjeta × día de la semana × doméstica/exterior ×
+  montos en la frontera de cada umbral de `DISCOUNT_RULES` (umbral - 0.01,
+  umbral, umbral + 0.01) más un monto bajo y uno alto.
+- validate_client → tarjeta × ingresos en la frontera de cada mínimo ×
+  VISE CLUB sí/no × país permitido/prohibido.
+- validate_purchase → tarjeta × país permitido/prohibido.
+
+Métricas por función:
+- ns_per_op → mejor de `--repeat` pasadas sobre todos los casos.
+- normalized → costo relativo a una llamada Python trivial con los mismos
+  argumentos (pasadas alternadas, mediana de los cocientes). Es lo que se
+  compara con la línea base, para que el gate no dependa de la máquina.
+- alloc_bytes_per_call → pico de memoria transitoria de una llamada (tracemalloc).
+- retained_blocks_per_call → bloques que siguen vivos por llamada (debería ser 0).
+
+Uso:
+    python -m benchmarks.rules                       # mide y compara con la línea base
+    python -m benchmarks.rules --tolerance 0.10      # falla si algo es >10% más lento
+    python -m benchmarks.rules --update-baseline     # guarda la corrida como nueva línea base
+===========================================================
+"""
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "rules.json"
+DEFAULT_TOLERANCE = 0.25
+
+CARDS = [card.value for card in CardType]
+ALLOWED_COUNTRY = countries.parse("USA")
+FOREIGN_COUNTRY = countries.parse("France")
+BANNED_COUNTRY = sorted(BANNED_COUNTRIES)[0]
+MONDAY = datetime(2025, 9, 29, 12, 0)
+INCOME_THRESHOLDS = (500, 1000, 2000)
+
+
+def boundaries(thresholds) -> list[int]:
+    """Montos en centavos alrededor de cada umbral (en unidades): un centavo antes, en el umbral y después."""
+    values = {1_000, 1_000_000}
+    for threshold in thresholds:
+        cents = to_cents(threshold)
+        values.update((cents - 1, cents, cents + 1))
+    return sorted(values)
+
+
+def discount_cases() -> list[tuple]:
+    amounts = boundaries({r.min_amount for r in DISCOUNT_RULES if r.min_amount is not None})
+    return [
+        (card, amount, MONDAY + timedelta(days=weekday), purchase_country, ALLOWED_COUNTRY)
+        for card in CARDS
+        for weekday in range(7)
+        for purchase_country in (ALLOWED_COUNTRY, FOREIGN_COUNTRY)
+        for amount in amounts
+    ]
+
+
+def client_cases() -> list[tuple]:
+    return [
+        (card, income, club, country)
+        for card in CARDS
+        for income in boundaries(INCOME_THRESHOLDS)
+        for club in (False, True)
+        for country in (ALLOWED_COUNTRY, BANNED_COUNTRY)
+    ]
+
+
+def purchase_cases() -> list[tuple]:
+    return [(card, country) for card in CARDS for country in (ALLOWED_COUNTRY, BANNED_COUNTRY)]
+
+
+def _reference(*args):
+    """Llamada trivial de referencia: mismo número de argumentos, devuelve una tupla."""
+    return False, None
+
+
+SUITE = {
+    "calculate_discount": (calculate_discount, discount_cases),
+    "validate_client": (validate_client, client_cases),
+    "validate_purchase": (validate_purchase, purchase_cases),
+}
+
+
+def _calibrate(fn, cases: list[tuple], min_seconds: float) -> int:
+    """Vueltas sobre `cases` necesarias para que una pasada dure al menos `min_seconds`."""
+    loops = 1
+    while _pass(fn, cases, loops) < min_seconds * 1e9:
+        loops *= 2
+    return loops
+
+
+def _pass(fn, cases: list[tuple], loops: int) -> int:
+    start = time.perf_counter_ns()
+    for _ in range(loops):
+        for args in cases:
+            fn(*args)
+    return time.perf_counter_ns() - start
+
+
+def time_per_op(fn, cases: list[tuple], min_seconds: float, repeat: int) -> tuple[float, float]:
+    """
+    (ns por llamada, costo relativo a `_reference`).
+
+    Las pasadas de `fn` y de la referencia se alternan, así que ambas ven el
+    mismo estado de la máquina; el costo relativo es la mediana de los cocientes.
+    """
+    loops = _calibrate(fn, cases, min_seconds)
+    ref_loops = _calibrate(_reference, cases, min_seconds)
+    timings, ratios = [], []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            elapsed = _pass(fn, cases, loops) / loops
+            reference = _pass(_reference, cases, ref_loops) / ref_loops
+            timings.append(elapsed)
+            ratios.append(elapsed / reference)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return min(timings) / len(cases), statistics.median(ratios)
+
+
+def allocations(fn, cases: list[tuple]) -> dict:
+    """Memoria transitoria máxima de una llamada y bloques retenidos por llamada."""
+    for args in cases:
+        fn(*args)  # calentamiento: cachés e internados fuera de la medición
+
+    tracemalloc.start()
+    try:
+        peak = 0
+        for args in cases:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            fn(*args)
+            _, case_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, case_peak - current)
+    finally:
+        tracemalloc.stop()
+
+    rounds = 20
+    gc.collect()
+    before = sys.getallocatedblocks()
+    for _ in range(rounds):
+        for args in cases:
+            fn(*args)
+    gc.collect()
+    retained = (sys.getallocatedblocks() - before) / (rounds * len(cases))
+    return {"alloc_bytes_per_call": peak, "retained_blocks_per_call": round(max(retained, 0.0), 3)}
+
+
+def measure(min_seconds: float = 0.2, repeat: int = 5) -> dict:
+    results = {}
+    for name, (fn, make_cases) in SUITE.items():
+        cases = make_cases()
+        ns, normalized = time_per_op(fn, cases, min_seconds, repeat)
+        results[name] = {
+            "cases": len(cases),
+            "ns_per_op": round(ns, 1),
+            "normalized": round(normalized, 3),
+            **allocations(fn, cases),
+        }
+    return results
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Funciones cuyo costo normalizado supera la línea base en más de `tolerance`."""
+    failures = []
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        limit = base["normalized"] * (1 + tolerance)
+        if stats["normalized"] > limit:
+            failures.append(
+                f"{name}: {stats['normalized']}x > {base['normalized']}x (+{tolerance:.0%}) "
+                f"[{stats['ns_per_op']} ns/op]"
+            )
+    return failures
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> dict | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Margen permitido sobre la línea base (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Duración mínima de cada pasada")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    results = measure(args.min_seconds, args.repeat)
+    for name, stats in results.items():
+        print(f"{name:>18}: {stats}")
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"✅ Línea base actualizada: {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        sys.exit(f"❌ No hay línea base en {args.baseline} (usar --update-baseline)")
+    failures = regressions(results, baseline, args.tolerance)
+    if failures:
+        sys.exit("❌ Reglas más lentas que la línea base:\n  " + "\n  ".join(failures))
+    print(f"✅ Dentro de la línea base (+{args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app import schemas
+from app.main import app
+
+"""
+===========================================================
+🧬 Benchmark: costo de serialización por respuesta
+===========================================================
+
+Compara, sin red ni base de datos, lo que cuesta convertir el resultado de
+un endpoint en bytes:
+
+- antes → dicts sin tipar: `jsonable_encoder` recorre el contenido y
+  `JSONResponse` lo codifica con el módulo `json`.
+- ahora → modelos tipados: el `response_model` de la ruta (validación y
+  serialización en pydantic-core) y `ORJSONResponse`.
+
+Cada caso incluye armar el resultado (dicts o modelos), como lo haría el
+endpoint, y usa el mismo `serialize_response` que FastAPI en cada request.
+
+Casos:
+- purchase → compra aprobada de `POST /purchase`.
+- rejected → rechazo 400 (solo cambia la clase de respuesta).
+- batch    → `POST /purchases/batch` con `--batch-size` compras, 1 de cada 10 rechazada.
+
+Uso:
+    python -m benchmarks.serialization --batch-size 100
+===========================================================
+"""
+
+DETAIL = {
+    "clientId": 1,
+    "originalAmount": 250.75,
+    "discountApplied": 75.23,
+    "finalAmount": 175.52,
+    "benefit": "Sábado 30%",
+}
+ERROR = "El cliente con tarjeta Black no puede realizar compras desde China"
+
+
+def route(path: str) -> APIRoute:
+    return next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path)
+
+
+# ============================================================
+# 🧾 Antes: dicts + jsonable_encoder + JSONResponse
+# ============================================================
+
+async def purchase_before() -> bytes:
+    content = await serialize_response(response_content={"status": "Approved", "purchase": dict(DETAIL)})
+    return JSONResponse(content).body
+
+
+async def rejected_before() -> bytes:
+    return JSONResponse(status_code=400, content={"status": "Rejected", "error": ERROR}).body
+
+
+def batch_before(size: int):
+    async def run() -> bytes:
+        results = [
+            {"index": i, "status": "Rejected", "error": ERROR} if i % 10 == 0
+            else {"index": i, "status": "Approved", "purchase": dict(DETAIL)}
+            for i in range(size)
+        ]
+        content = await serialize_response(response_content={
+            "status": "Processed", "approved": size - len(range(0, size, 10)),
+            "rejected": len(range(0, size, 10)), "results": results,
+        })
+        return JSONResponse(content).body
+    return run
+
+
+# ============================================================
+# ⚡ Ahora: modelos + response_model de la ruta + ORJSONResponse
+# ============================================================
+
+def purchase_after():
+    r = route("/purchase")
+
+    async def run() -> bytes:
+        result = schemas.PurchaseResult(purchase=schemas.PurchaseDetail(**DETAIL))
+        content = await serialize_response(field=r.response_field, response_content=result)
+        return r.response_class(content).body
+    return run
+
+
+async def rejected_after() -> bytes:
+    return ORJSONResponse(status_code=400, content={"status": "Rejected", "error": ERROR}).body
+
+
+def batch_after(size: int):
+    r = route("/purchases/batch")
+
+    async def run() -> bytes:
+        results = [
+            schemas.PurchaseBatchItemResult(index=i, status="Rejected", error=ERROR) if i % 10 == 0
+            else schemas.PurchaseBatchItemResult(index=i, status="Approved", purchase=schemas.PurchaseDetail(**DETAIL))
+            for i in range(size)
+        ]
+        result = schemas.PurchaseBatchResponse(
+            status="Processed", approved=size - len(range(0, size, 10)),
+            rejected=len(range(0, size, 10)), results=results,
+        )
+        content = await serialize_response(
+            field=r.response_field, response_content=result, exclude_unset=r.response_model_exclude_unset
+        )
+        return r.response_class(content).body
+    return run
+
+
+async def time_per_call(fn, min_seconds: float, repeat: int) -> float:
+    """Mejor tiempo por llamada (µs) de `repeat` pasadas de al menos `min_seconds`."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await fn()
+        if time.perf_counter() - start >= min_seconds:
+            break
+        loops *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            await fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best * 1e6
+
+
+async def measure(batch_size: int, min_seconds: float, repeat: int) -> dict:
+    cases = {
+        "purchase": (purchase_before, purchase_after()),
+        "rejected": (rejected_before, rejected_after),
+        "batch": (batch_before(batch_size), batch_after(batch_size)),
+    }
+    results = {}
+    for name, (before, after) in cases.items():
+        before_us = await time_per_call(before, min_seconds, repeat)
+        after_us = await time_per_call(after, min_seconds, repeat)
+        results[name] = {
+            "before_us": round(before_us, 2),
+            "after_us": round(after_us, 2),
+            "speedup": round(before_us / after_us, 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--min-seconds", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = asyncio.run(measure(args.batch_size, args.min_seconds, args.repeat))
+    for name, stats in results.items():
+        print(f"{name:>9}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+"""
+===========================================================
+⏱️ Benchmark: tiempo de importación y de arranque de la app
+===========================================================
+
+Lanza un proceso nuevo por repetición con `python -X importtime`, mide el
+tiempo acumulado de importar `app.main` y el del arranque (lifespan), y
+lista los módulos pesados que no deberían cargarse sin configuración
+(SDK de OpenTelemetry, exportadores, Azure Monitor).
+
+Las variables de telemetría se quitan del entorno: se mide el arranque
+por defecto. `tests/test_startup.py` ejecuta este benchmark con presupuesto.
+
+Uso:
+    python -m benchmarks.startup --repeat 5 --import-budget-ms 2000
+===========================================================
+"""
+
+TELEMETRY_VARS = (
+    "OTEL_EXPORTER_OTLP_ENDPOINT",
+    "OTEL_EXPORTER_OTLP_HEADERS",
+    "APPLICATIONINSIGHTS_CONNECTION_STRING",
+)
+HEAVY_PREFIXES = ("opentelemetry.sdk", "opentelemetry.exporter", "opentelemetry.instrumentation", "azure")
+
+STARTUP_SCRIPT = """
+import asyncio, json, sys, time
+import app.main
+
+async def startup():
+    start = time.perf_counter()
+    async with app.main.app.router.lifespan_context(app.main.app):
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+elapsed = asyncio.run(startup())
+heavy = sorted(m for m in sys.modules if m.startswith(%r))
+print(json.dumps({"startupMs": round(elapsed * 1000, 1), "heavyModules": heavy}))
+""" % (HEAVY_PREFIXES,)
+
+
+def parse_importtime(stderr: str, module: str = "app.main") -> float:
+    """Tiempo acumulado (ms) de `module` en la salida de `-X importtime`."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module and name.startswith(" ") and not name.startswith("  "):
+            return int(cumulative) / 1000
+    raise ValueError(f"{module} no aparece en la salida de -X importtime")
+
+
+def measure_once(env: dict | None = None) -> dict:
+    """Una medición en un proceso nuevo: importación, arranque y módulos pesados cargados."""
+    run_env = {k: v for k, v in {**os.environ, **(env or {})}.items() if k not in TELEMETRY_VARS}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        env=run_env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats["importMs"] = parse_importtime(result.stderr)
+    return stats
+
+
+def measure(repeat: int = 3, env: dict | None = None) -> dict:
+    """Mediana de `repeat` procesos (el primero también calienta la caché de bytecode)."""
+    runs = [measure_once(env) for _ in range(repeat)]
+    return {
+        "importMs": round(statistics.median(r["importMs"] for r in runs), 1),
+        "startupMs": round(statistics.median(r["startupMs"] for r in runs), 1),
+        "heavyModules": sorted({m for r in runs for m in r["heavyModules"]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="DATABASE_URL del arranque (por defecto SQLite temporal)")
+    parser.add_argument("--import-budget-ms", type=float, help="Falla si la importación supera este tiempo")
+    parser.add_argument("--startup-budget-ms", type=float, help="Falla si el arranque supera este tiempo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        stats = measure(args.repeat, {"DATABASE_URL": url})
+    print(json.dumps(stats))
+
+    over = []
+    if args.import_budget_ms is not None and stats["importMs"] > args.import_budget_ms:
+        over.append(f"importación {stats['importMs']} ms > {args.import_budget_ms} ms")
+    if args.startup_budget_ms is not None and stats["startupMs"] > args.startup_budget_ms:
+        over.append(f"arranque {stats['startupMs']} ms > {args.startup_budget_ms} ms")
+    if over:
+        sys.exit("❌ Presupuesto superado: " + "; ".join(over))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+from benchmarks.common import asgi_client, run_isolated, run_requests
+
+"""
+===========================================================
+🔭 Benchmark: costo por request del perfil de trazas
+===========================================================
+
+Ejecuta la misma carga de `/purchase` con TRACING_PROFILE off, sampled y
+full, cada perfil en un proceso nuevo. Los spans se exportan a un
+exportador que los descarta: se mide la creación y el procesamiento en
+el SDK, no la red. Una de cada `--reject-every` compras se rechaza
+(país prohibido), para incluir el span forzado de los rechazos.
+
+Uso:
+    python -m benchmarks.tracing --requests 3000 --ratio 0.1
+===========================================================
+"""
+
+PROFILES = ("off", "sampled", "full")
+
+
+def _instrument(app) -> None:
+    """Misma instrumentación que el arranque real, con un exportador que descarta los spans."""
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+    from app import telemetry
+    from app.tracing import build_sampler, instrument_app
+
+    class DiscardExporter(SpanExporter):
+        def export(self, spans):
+            return SpanExportResult.SUCCESS
+
+    provider = TracerProvider(sampler=build_sampler())
+    provider.add_span_processor(BatchSpanProcessor(DiscardExporter()))
+    instrument_app(app, tracer_provider=provider)
+    telemetry.use_tracer_provider(provider)
+
+
+async def _workload(requests: int, concurrency: int, reject_every: int) -> dict:
+    from app.config import settings
+    from app.database import engine
+    from app.main import app
+    from app.migrate import migrate
+
+    migrate()
+    if settings.TRACING_PROFILE != "off":
+        _instrument(app)
+
+    async with asgi_client(app) as client:
+        response = await client.post("/client", json={
+            "name": "Bench Tracing", "country": "USA", "monthlyIncome": 5000,
+            "viseClub": True, "cardType": "Black",
+        })
+        client_id = response.json()["clientId"]
+        purchases = [
+            ("POST", "/purchase", {
+                "clientId": client_id,
+                "amount": 50 + (i % 400),
+                "currency": "USD",
+                "purchaseDate": f"2025-09-{22 + i % 7:02d}T12:00:00",
+                "purchaseCountry": "China" if i % reject_every == 0 else "USA",
+            })
+            for i in range(requests)
+        ]
+        # Calentamiento: caché de perfiles, sentencias compiladas y pool
+        await run_requests(client, purchases[:100], concurrency)
+        stats = await run_requests(client, purchases, concurrency)
+    engine.dispose()
+    stats["mean_us"] = round(stats["seconds"] / stats["requests"] * 1e6 * concurrency, 1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--ratio", type=float, default=0.1, help="TRACING_SAMPLE_RATIO del perfil sampled")
+    parser.add_argument("--reject-every", type=int, default=10)
+    parser.add_argument("--out", help="Archivo JSON de resultados")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_workload(args.requests, args.concurrency, args.reject_every))))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in PROFILES:
+            results[profile] = run_isolated(
+                "benchmarks.tracing",
+                ["--worker", "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                 "--reject-every", str(args.reject_every)],
+                {
+                    "DATABASE_URL": f"sqlite:///{os.path.join(tmp, profile + '.db')}",
+                    "TRACING_PROFILE": profile,
+                    "TRACING_SAMPLE_RATIO": str(args.ratio),
+                },
+            )
+    base = results["off"]["mean_us"]
+    for profile, stats in results.items():
+        stats["overhead_us"] = round(stats["mean_us"] - base, 1)
+        print(f"{profile:>7}: {stats}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"ratio": args.ratio, "concurrency": args.concurrency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from benchmarks.load import free_port, run_mix
+
+"""
+===========================================================
+📈 Benchmark: throughput según la cantidad de workers
+===========================================================
+
+Levanta `python -m app.server` (gunicorn + UvicornWorker, app precargada) con
+1, 2, 4... workers sobre un archivo SQLite nuevo en cada corrida y le aplica
+el tráfico mezclado de `benchmarks.load` (altas de clientes y compras).
+
+La carga la generan `--clients` procesos en paralelo, para que el cliente
+no sea el cuello de botella: el throughput es el total de peticiones sobre
+el tiempo del proceso más lento, y los percentiles son los peores entre
+procesos. `errors` cuenta respuestas 5xx y fallos de conexión (por ejemplo
+"database is locked").
+
+Uso:
+    python -m benchmarks.workers --workers 1,2,4 --requests 4000 --clients 4
+===========================================================
+"""
+
+
+def default_worker_counts() -> list[int]:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+async def _wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                await client.get("/")
+                return
+            except httpx.TransportError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("el servidor no arrancó")
+                await asyncio.sleep(0.1)
+
+
+async def _drive(args) -> dict:
+    """Un proceso generador de carga: el escenario mix contra `--drive`."""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.drive, timeout=None, limits=limits) as client:
+        return await run_mix(client, SimpleNamespace(
+            seed=args.seed, seed_clients=args.seed_clients, requests=args.requests,
+            client_ratio=args.client_ratio, warmup=args.warmup, concurrency=args.concurrency,
+        ))
+
+
+def run_clients(base_url: str, args) -> dict:
+    """Lanza los generadores en paralelo y combina sus resultados."""
+    per_client = max(1, args.requests // args.clients)
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.workers", "--drive", base_url,
+             "--requests", str(per_client), "--concurrency", str(args.concurrency),
+             "--client-ratio", str(args.client_ratio), "--seed-clients", str(args.seed_clients),
+             "--warmup", str(args.warmup), "--seed", str(args.seed + i)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        for i in range(args.clients)
+    ]
+    results = [json.loads(proc.communicate()[0].strip().splitlines()[-1]) for proc in procs]
+    requests = sum(r["requests"] for r in results)
+    seconds = max(r["seconds"] for r in results)
+    return {
+        "requests": requests,
+        "errors": sum(r["errors"] for r in results),
+        "seconds": seconds,
+        "throughput_rps": round(requests / seconds, 1) if seconds else 0.0,
+        "p50_ms": max(r["p50_ms"] for r in results),
+        "p95_ms": max(r["p95_ms"] for r in results),
+        "p99_ms": max(r["p99_ms"] for r in results),
+    }
+
+
+def measure(workers: int, args, tmp: str) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(tmp, f'workers-{workers}.db')}"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(_wait_ready(base_url, server))
+        return run_clients(base_url, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=lambda v: [int(x) for x in v.split(",")], default=default_worker_counts())
+    parser.add_argument("--requests", type=int, default=4000, help="Peticiones por corrida (repartidas entre clientes)")
+    parser.add_argument("--clients", type=int, default=2, help="Procesos generadores de carga")
+    parser.add_argument("--concurrency", type=int, default=25, help="Peticiones en vuelo por cliente")
+    parser.add_argument("--client-ratio", type=float, default=0.1)
+    parser.add_argument("--seed-clients", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Archivo JSON de resultados")
+    parser.add_argument("--drive", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.drive:
+        print(json.dumps(asyncio.run(_drive(args))))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            results[workers] = measure(workers, args, tmp)
+            base = results[args.workers[0]]["throughput_rps"]
+            speedup = results[workers]["throughput_rps"] / base if base else 0.0
+            print(f"{workers:>3} workers: {results[workers]}  (x{speedup:.2f})")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
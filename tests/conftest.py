@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+import pytest
+
+# La app ya no crea el esquema al importarse: las pruebas usan una base temporal
+# (salvo que DATABASE_URL venga definida, p. ej. para probar el modo asíncrono)
+# y la migran antes de importar cualquier módulo de prueba.
+_scratch = tempfile.mkdtemp(prefix="vise-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch, 'vise_test.db')}")
+
+from app.migrate import migrate  # noqa: E402
+
+migrate()
+
+
+@pytest.fixture(scope="session")
+def register_client():
+    """Registra un cliente por la API y devuelve su id (los valores por defecto valen para cualquier tarjeta)."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    api = TestClient(app)
+
+    def register(card_type="Gold", country="USA", income=3000, viseClub=True):
+        response = api.post("/client", json={
+            "name": f"Cliente_{card_type}", "country": country, "monthlyIncome": income,
+            "viseClub": viseClub, "cardType": card_type,
+        })
+        assert response.status_code == 200, f"No se pudo registrar cliente {card_type}: {response.text}"
+        return response.json()["clientId"]
+
+    return register
@@ -0,0 +1,135 @@
+from collections import defaultdict
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app import models
+from app.analytics import COLUMNS, PurchaseColumns, purchase_columns
+from app.database import SessionLocal, engine
+from app.main import app
+from app.money import MAX_CENTS, apply_rate, to_units
+from app.rules import RULE_TABLE
+from app.summary import NO_BENEFIT
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """Un cliente por tarjeta con compras en distintos días, montos y países."""
+    for card, income, club in (("Classic", 300, False), ("Gold", 800, False), ("Platinum", 1500, True), ("White", 5000, True)):
+        client_id = client.post("/client", json={
+            "name": f"Analytics {card}", "country": "USA", "monthlyIncome": income, "viseClub": club, "cardType": card,
+        }).json()["clientId"]
+        for day, amount, country in ((29, 150, "USA"), (30, 90, "USA"), (4, 250, "USA"), (5, 300, "France")):
+            month = 9 if day > 20 else 10
+            assert client.post("/purchase", json={
+                "clientId": client_id, "amount": amount, "currency": "USD",
+                "purchaseDate": f"2025-{month:02d}-{day:02d}T12:00:00", "purchaseCountry": country,
+            }).status_code == 200
+
+
+def reference(date_from=None):
+    """Mismo reporte calculado fila por fila con la tabla de reglas (centavos)."""
+    totals = defaultdict(lambda: [0, 0, 0])
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(models.Purchase.amount, models.Purchase.purchase_date, models.Purchase.purchase_country,
+                   models.Client.card_type, models.Client.country)
+            .join(models.Client, models.Client.id == models.Purchase.client_id)
+        ).all()
+    for amount, purchase_date, purchase_country, card_type, client_country in rows:
+        if date_from is not None and purchase_date.date() < date_from:
+            continue
+        rate, benefit = RULE_TABLE.lookup(card_type, purchase_date.weekday(), purchase_country != client_country, amount)
+        entry = totals[(card_type, purchase_date.weekday(), benefit or NO_BENEFIT)]
+        entry[0] += 1
+        entry[1] += amount
+        entry[2] += apply_rate(amount, rate)
+    return totals
+
+
+def test_discount_report_matches_row_by_row(seeded):
+    body = client.get("/analytics/discounts").json()
+    expected = reference()
+
+    assert body["groupBy"] == ["cardType", "weekday", "benefit"]
+    assert body["purchaseCount"] == sum(count for count, _, _ in expected.values())
+    assert {(g["cardType"], g["weekday"], g["benefit"]) for g in body["groups"]} == set(expected)
+    for group in body["groups"]:
+        count, amount, discount = expected[(group["cardType"], group["weekday"], group["benefit"])]
+        assert group["purchaseCount"] == count
+        assert group["totalAmount"] == to_units(amount)
+        assert group["totalDiscount"] == to_units(discount)
+        assert group["avgDiscount"] == pytest.approx(to_units(discount) / count, abs=0.01)
+
+
+def test_group_by_other_dimensions_and_dates(seeded):
+    body = client.get("/analytics/discounts", params={"groupBy": "scope", "dateFrom": "2025-10-05"}).json()
+    expected = reference(date(2025, 10, 5))
+    assert sum(g["purchaseCount"] for g in body["groups"]) == sum(count for count, _, _ in expected.values())
+    assert {g["scope"] for g in body["groups"]} <= {"domestic", "foreign"}
+    assert all(set(g) == {"scope", "purchaseCount", "totalAmount", "totalDiscount", "avgDiscount"} for g in body["groups"])
+
+    response = client.get("/analytics/discounts", params={"groupBy": "cardType,planet"})
+    assert response.status_code == 400
+    assert response.json()["error"] == "Dimensión desconocida: planet"
+
+
+def test_refresh_loads_only_new_rows(seeded):
+    columns = PurchaseColumns(chunk_size=3)
+    loaded = columns.refresh(engine)
+    assert loaded == columns.size > 0
+    assert columns.refresh(engine) == 0
+
+    client_id = client.post("/client", json={
+        "name": "Analytics late", "country": "USA", "monthlyIncome": 300, "viseClub": False, "cardType": "Classic",
+    }).json()["clientId"]
+    client.post("/purchase", json={"clientId": client_id, "amount": 10, "currency": "USD",
+                                   "purchaseDate": "2025-10-06T12:00:00", "purchaseCountry": "USA"})
+    watermark = columns.watermark
+    assert columns.refresh(engine) == 1
+    assert columns.watermark > watermark
+    assert columns.size == loaded + 1
+
+
+def test_memory_per_row(seeded):
+    purchase_columns.refresh(engine)
+    assert purchase_columns.nbytes / purchase_columns.size < 48
+    assert purchase_columns.nbytes == purchase_columns.size * sum(np.dtype(dtype).itemsize for dtype in COLUMNS.values())
+
+
+def test_refresh_picks_up_late_commits_below_watermark(seeded):
+    """Un id menor que confirma después de la carga entra en la ventana de solapamiento, sin duplicados."""
+    with SessionLocal() as db:
+        top = db.scalar(select(func.max(models.Purchase.id)))
+        client_id = db.scalar(select(models.Purchase.client_id).where(models.Purchase.id == top))
+    columns = PurchaseColumns()
+    columns.refresh(engine)
+
+    def insert(purchase_id):
+        with SessionLocal() as db:
+            db.add(models.Purchase(id=purchase_id, client_id=client_id, amount=1000, currency="USD",
+                                   purchase_date=datetime(2025, 10, 6, 12), purchase_country=840))
+            db.commit()
+
+    insert(top + 2)
+    assert columns.refresh(engine) == 1
+    insert(top + 1)  # confirmada tarde, por debajo de la marca de agua
+    assert columns.refresh(engine) == 1
+    assert columns.refresh(engine) == 0
+    ids = columns.columns()["id"]
+    assert len(set(ids.tolist())) == len(ids) and columns.watermark == top + 2
+
+
+def test_group_sums_are_exact_beyond_float_precision():
+    """Las sumas por grupo se acumulan en int64: pasado 2**53 centavos no se redondean como en float64."""
+    columns = PurchaseColumns()
+    amount = MAX_CENTS
+    columns.append([(i, 1, amount, datetime(2025, 9, 29, 12), 840, "Classic", 840) for i in range(1, 12)])
+    _, (group,) = columns.group_by([])
+    assert 11 * amount > 2**53
+    assert group["totalAmount"] == to_units(11 * amount)
@@ -0,0 +1,104 @@
+import json
+import sys
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app import backtest as backtest_module, models
+from app.backtest import backtest, report, rules_from_json, rules_to_json, score_rows
+from app.database import SessionLocal
+from app.main import app
+from app.money import MAX_CENTS, apply_rate, to_units
+from app.rules import DISCOUNT_RULES, RULE_TABLE, CardType, DiscountRule, compile_rules
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded():
+    for card, income, club in (("Gold", 800, False), ("Platinum", 1500, True)):
+        client_id = client.post("/client", json={
+            "name": f"Backtest {card}", "country": "USA", "monthlyIncome": income, "viseClub": club, "cardType": card,
+        }).json()["clientId"]
+        for day, amount in ((29, 120), (29, 180), (30, 90), (4, 250)):
+            month = 9 if day > 20 else 10
+            client.post("/purchase", json={
+                "clientId": client_id, "amount": amount, "currency": "USD",
+                "purchaseDate": f"2025-{month:02d}-{day:02d}T12:00:00", "purchaseCountry": "USA",
+            })
+
+
+def candidate_rules():
+    """Gold pasa a 20% y exige más de 150."""
+    rules = rules_to_json(DISCOUNT_RULES)
+    gold = next(r for r in rules if r["card_type"] == CardType.GOLD.value)
+    gold.update(rate=0.20, min_amount=150, benefit="Lunes - Miércoles 20%")
+    return rules_from_json(rules)
+
+
+def purchases():
+    with SessionLocal() as db:
+        return db.execute(
+            select(models.Client.card_type, models.Purchase.amount, models.Purchase.purchase_date,
+                   models.Purchase.purchase_country, models.Client.country)
+            .join(models.Client, models.Client.id == models.Purchase.client_id)
+        ).all()
+
+
+def test_rules_json_round_trip():
+    rules = rules_from_json(rules_to_json(DISCOUNT_RULES))
+    assert compile_rules(rules).entries == RULE_TABLE.entries
+    with pytest.raises(ValueError):
+        rules_from_json([{"card_type": "Gold"}])
+
+
+def test_same_rules_change_nothing():
+    result = report(backtest(DISCOUNT_RULES, workers=2, chunk_size=7))
+    assert result["purchaseCount"] == len(purchases())
+    assert result["discountDelta"] == 0
+    assert result["benefitChanges"] == []
+    assert all(card["changedPurchases"] == 0 for card in result["cards"])
+
+
+def test_candidate_matches_row_by_row():
+    candidate = candidate_rules()
+    table = compile_rules(candidate)
+    expected = {}
+    for card_type, amount, date, purchase_country, client_country in purchases():
+        foreign = purchase_country != client_country
+        now, _ = RULE_TABLE.lookup(card_type, date.weekday(), foreign, amount)
+        new, _ = table.lookup(card_type, date.weekday(), foreign, amount)
+        expected[card_type] = expected.get(card_type, 0) + apply_rate(amount, new) - apply_rate(amount, now)
+
+    total = backtest(candidate, workers=2, chunk_size=5)
+    result = report(total)
+    assert total["chunks"] > 1
+    for card in result["cards"]:
+        assert card["discountDelta"] == to_units(expected[card["cardType"]])
+    assert {(c["cardType"], c["from"]) for c in result["benefitChanges"]} == {("Gold", "Lunes - Miércoles 15%")}
+
+
+def test_discount_totals_are_exact_beyond_float_precision():
+    """Los descuentos por tarjeta se suman en int64: pasado 2**53 centavos no se redondean como en float64."""
+    full = compile_rules((DiscountRule("Gold", frozenset(range(7)), "any", None, 1.0, "Todo 100%"),))
+    rows = [("Gold", MAX_CENTS, datetime(2025, 9, 29, 12), 840, 840)] * 11
+    count, _, new, _ = score_rows(rows, RULE_TABLE, full)["cards"]["Gold"]
+    assert count == 11 and 11 * MAX_CENTS > 2**53
+    assert new == 11 * MAX_CENTS
+
+
+def test_main_rejects_candidate_that_does_not_compile(monkeypatch, tmp_path):
+    """Una regla que carga pero no compila se informa antes de arrancar el pool."""
+    rules = rules_to_json(DISCOUNT_RULES)
+    rules[0]["min_amount"] = "cien"
+    path = tmp_path / "candidate.json"
+    path.write_text(json.dumps(rules))
+    monkeypatch.setattr(backtest_module, "backtest", lambda *args: pytest.fail("no debe arrancar el pool"))
+    monkeypatch.setattr(sys, "argv", ["backtest", "run", str(path)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        backtest_module.main()
+    assert "Reglas candidatas inválidas" in str(exit_info.value.code)
+    assert "cien" in str(exit_info.value.code)
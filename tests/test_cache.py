@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.cache import TTLCache, client_cache
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_lru_eviction():
+    """Al superar el tamaño máximo se desaloja la entrada menos usada."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"  # 1 pasa a ser la más reciente
+    cache.put(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_ttl_cache_expiration():
+    """Las entradas vencidas cuentan como fallo y se eliminan."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.put("k", 1)
+    clock.now = 4.9
+    assert cache.get("k") == 1
+    clock.now = 5.0
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_purchase_uses_cached_profile():
+    """Registrar un cliente llena la caché y /purchase la aprovecha."""
+    response = client.post("/client", json={
+        "name": "Cache Gold", "country": "USA", "monthlyIncome": 800,
+        "viseClub": False, "cardType": "Gold",
+    })
+    client_id = response.json()["clientId"]
+    before = client_cache.stats()["hits"]
+
+    response = client.post("/purchase", json={
+        "clientId": client_id, "amount": 200, "currency": "USD",
+        "purchaseDate": "2025-09-29T12:00:00Z", "purchaseCountry": "USA",
+    })
+    assert response.status_code == 200
+    assert client_cache.stats()["hits"] == before + 1
+
+    stats = client.get("/cache/clients").json()
+    assert stats["size"] >= 1
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app import models
+from app.database import SessionLocal
+from app.importer import LINE_TOO_LONG, MAX_LINE_LENGTH, import_clients, iter_lines
+from app.main import app
+
+client = TestClient(app)
+
+
+def count_named(name):
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(models.Client).where(models.Client.name == name))
+
+
+def parse(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[0], lines[1:]
+
+
+def test_import_csv_summary_and_rejections():
+    """Las filas válidas se insertan y cada rechazo indica su fila y motivo."""
+    name = f"Import {uuid.uuid4().hex[:8]}"
+    body = "\n".join([
+        "name,country,monthlyIncome,viseClub,cardType",
+        f"{name},USA,800,false,Gold",
+        f"{name},USA,300,false,Gold",          # ingreso insuficiente
+        f"{name},China,5000,true,Black",       # país prohibido
+        f"{name},USA,1500,true,Platinum",
+        f"{name},USA,abc,true,Platinum",       # ingreso no numérico
+        f"{name},USA,900,true,Diamond",        # tarjeta inválida
+        f"{name},USA,900",                     # columnas incompletas
+    ])
+    response = client.post("/clients/import", content=body, headers={"content-type": "text/csv"})
+
+    assert response.status_code == 200
+    summary, rejections = parse(response)
+    assert summary == {"status": "Completed", "received": 7, "imported": 2, "rejected": 5}
+    assert [r["row"] for r in rejections] == [2, 3, 5, 6, 7]
+    assert "500" in rejections[0]["error"]
+    assert "China" in rejections[1]["error"] or "país" in rejections[1]["error"].lower()
+    assert count_named(name) == 2
+
+
+def test_import_ndjson_in_chunks():
+    """Con bloques pequeños el resultado es el mismo y cada bloque se inserta por separado."""
+    name = f"Import {uuid.uuid4().hex[:8]}"
+    records = [
+        {"name": name, "country": "USA", "monthlyIncome": 2500 if i % 3 else 100,
+         "viseClub": True, "cardType": "White"}
+        for i in range(10)
+    ]
+    body = "\n".join(json.dumps(r) for r in records) + "\nnot json\n"
+    inserted = []
+
+    async def chunks():
+        data = body.encode()
+        for start in range(0, len(data), 7):
+            yield data[start:start + 7]
+
+    summary, rejections = asyncio.run(
+        import_clients(chunks(), "ndjson", lambda rows: inserted.append(len(rows)), chunk_size=3)
+    )
+    lines = [json.loads(line) for line in rejections.read().splitlines()]
+
+    assert summary == {"status": "Completed", "received": 11, "imported": 6, "rejected": 5}
+    assert [r["row"] for r in lines] == [1, 4, 7, 10, 11]
+    assert max(inserted) <= 3 and sum(inserted) == 6
+
+
+def test_import_format_query_overrides_content_type():
+    name = f"Import {uuid.uuid4().hex[:8]}"
+    body = json.dumps({"name": name, "country": "USA", "monthlyIncome": 600,
+                       "viseClub": "false", "cardType": "Classic"})
+    response = client.post("/clients/import", params={"format": "ndjson"}, content=body,
+                           headers={"content-type": "text/csv"})
+    summary, _ = parse(response)
+    assert summary["imported"] == 1
+    assert count_named(name) == 1
+
+
+def test_import_normalizes_country():
+    """El país se guarda como código ISO; uno desconocido es un rechazo de formato."""
+    name = f"Import {uuid.uuid4().hex[:8]}"
+    body = "\n".join([
+        "name,country,monthlyIncome,viseClub,cardType",
+        f"{name},Perú,300,false,Classic",
+        f"{name},Narnia,300,false,Classic",
+    ])
+    summary, rejections = parse(client.post("/clients/import", content=body, headers={"content-type": "text/csv"}))
+    assert summary["imported"] == 1
+    assert [(r["row"], r["error"]) for r in rejections] == [(2, "País desconocido: Narnia")]
+    with SessionLocal() as db:
+        assert db.scalar(select(models.Client.country).where(models.Client.name == name)) == 604
+
+
+def test_iter_lines_drops_overlong_lines_while_streaming():
+    """Una línea demasiado larga no se acumula: sale como marca y las demás siguen igual."""
+    async def chunks():
+        yield b"a\r\nb"
+        for _ in range(MAX_LINE_LENGTH // 1000 + 1):
+            yield b"x" * 1000
+        yield b"\nc\n" + b"y" * (MAX_LINE_LENGTH + 1)
+
+    async def collect():
+        return [line async for line in iter_lines(chunks())]
+
+    assert asyncio.run(collect()) == ["a", LINE_TOO_LONG, "c", LINE_TOO_LONG]
+
+
+def test_import_rejects_overlong_line_as_row_error():
+    name = f"Import {uuid.uuid4().hex[:8]}"
+    body = "\n".join([
+        "name,country,monthlyIncome,viseClub,cardType",
+        f"{name},USA,800,false,Gold",
+        f"{name},USA,800,false," + "G" * MAX_LINE_LENGTH,
+        f"{name},USA,900,false,Gold",
+    ])
+    summary, rejections = parse(client.post("/clients/import", content=body, headers={"content-type": "text/csv"}))
+    assert summary == {"status": "Completed", "received": 3, "imported": 2, "rejected": 1}
+    assert [r["row"] for r in rejections] == [2]
+    assert str(MAX_LINE_LENGTH) in rejections[0]["error"]
+    assert count_named(name) == 2
+
+
+def test_import_rejects_unparseable_income_per_row():
+    """Un ingreso con exponente enorme es un rechazo de la fila, no un 500 a mitad de la importación."""
+    name = f"Import {uuid.uuid4().hex[:8]}"
+    body = "\n".join([
+        "name,country,monthlyIncome,viseClub,cardType",
+        f"{name},USA,800,false,Gold",
+        f"{name},USA,1e999999,false,Gold",
+        f"{name},USA,900,false,Gold",
+    ])
+    response = client.post("/clients/import", content=body, headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    summary, rejections = parse(response)
+    assert summary == {"status": "Completed", "received": 3, "imported": 2, "rejected": 1}
+    assert [(r["row"], r["error"]) for r in rejections] == [(2, "monthlyIncome no es un monto válido")]
+    assert count_named(name) == 2
@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import SessionLocal
+from app.summary import rebuild_summaries
+
+client = TestClient(app)
+
+
+def purchase(client_id, amount, date, country="USA"):
+    return {"clientId": client_id, "amount": amount, "currency": "USD",
+            "purchaseDate": date, "purchaseCountry": country}
+
+
+def test_summary_tracks_purchases_and_rebuild(register_client):
+    """El resumen incremental coincide con el recalculado desde `purchases`."""
+    client_id = register_client()
+    # Gold lunes >100 → 15% (30.0); jueves sin beneficio; octubre martes >100 → 15% (22.5)
+    assert client.post("/purchase", json=purchase(client_id, 200, "2025-09-29T12:00:00")).status_code == 200
+    client.post("/purchases/batch", json=[
+        purchase(client_id, 80, "2025-10-02T12:00:00"),
+        purchase(client_id, 150, "2025-10-07T12:00:00"),
+    ])
+
+    summary = client.get(f"/clients/{client_id}/summary").json()
+    assert summary["purchaseCount"] == 3
+    assert summary["totalAmount"] == 430
+    assert summary["totalDiscount"] == 52.5
+    assert {b["key"]: b["purchaseCount"] for b in summary["byBenefit"]} == {
+        "Lunes - Miércoles 15%": 2, "Sin beneficio": 1,
+    }
+    assert {m["key"]: m["totalAmount"] for m in summary["byMonth"]} == {"2025-09": 200, "2025-10": 230}
+
+    with SessionLocal() as db:
+        rebuild_summaries(db, chunk_size=2)
+    assert client.get(f"/clients/{client_id}/summary").json() == summary
+
+
+def test_summary_unknown_client():
+    assert client.get("/clients/999999999/summary").status_code == 404
+
+
+def test_summary_without_purchases(register_client):
+    client_id = register_client("Classic")
+    summary = client.get(f"/clients/{client_id}/summary").json()
+    assert summary["purchaseCount"] == 0
+    assert summary["byMonth"] == []
@@ -0,0 +1,114 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app import countries
+from app.main import app
+from app.migrate import migrate_country_codes
+from app.rules import BANNED_COUNTRIES, validate_client, validate_clients
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------
+# 🌍 Registro de países
+# ---------------------------------------------------
+
+@pytest.mark.parametrize("value", ["Irán", "Iran", "IRAN", "iran", "IR", "IRN", "364", 364, "Iran (Islamic Republic of)"])
+def test_parse_iran_variants(value):
+    assert countries.parse(value) == 364
+
+
+@pytest.mark.parametrize("value, code", [
+    ("Estados Unidos", 840), ("EEUU", 840), ("EE.UU.", 840), ("usa", 840), (" US ", 840),
+    ("México", 484), ("Brasil", 76), ("Perú", 604), ("Côte d’Ivoire", 384), ("Türkiye", 792),
+])
+def test_parse_aliases(value, code):
+    assert countries.parse(value) == code
+
+
+@pytest.mark.parametrize("value", ["Narnia", "UsssSA", "", "999", 0, True, None])
+def test_parse_unknown(value):
+    with pytest.raises(ValueError):
+        countries.parse(value)
+
+
+def test_banned_mask_matches_set():
+    """La máscara de bits y la tabla vectorizada coinciden con el conjunto de prohibidos."""
+    codes = list(countries.COUNTRIES)
+    scalar = [not validate_client("Black", 500_000, True, code)[0] for code in codes]
+    vector = ~validate_clients({
+        "card_type": ["Black"] * len(codes), "income": [500_000] * len(codes),
+        "vise_club": [True] * len(codes), "country": codes,
+    })
+    assert [code for code, banned in zip(codes, scalar) if banned] == sorted(BANNED_COUNTRIES)
+    assert list(vector) == scalar
+
+
+# ---------------------------------------------------
+# 🧾 Borde de la API
+# ---------------------------------------------------
+
+def test_register_rejects_iran_by_any_spelling():
+    for spelling in ("Irán", "IRN", "ir"):
+        response = client.post("/client", json={
+            "name": "Black Irán", "country": spelling, "monthlyIncome": 5000, "viseClub": True, "cardType": "Black",
+        })
+        assert response.status_code == 400
+        assert response.json()["error"].endswith("no puede residir en Iran")
+
+
+def test_unknown_country_is_422():
+    response = client.post("/client", json={
+        "name": "Nadie", "country": "Narnia", "monthlyIncome": 500, "viseClub": False, "cardType": "Classic",
+    })
+    assert response.status_code == 422
+    assert "País desconocido" in response.text
+
+
+def test_history_returns_alpha3_and_filters_by_any_spelling():
+    client_id = client.post("/client", json={
+        "name": "Países Classic", "country": "Estados Unidos", "monthlyIncome": 300, "viseClub": False, "cardType": "Classic",
+    }).json()["clientId"]
+    for country in ("Francia", "USA"):
+        assert client.post("/purchase", json={
+            "clientId": client_id, "amount": 50, "currency": "USD",
+            "purchaseDate": "2025-09-29T12:00:00Z", "purchaseCountry": country,
+        }).status_code == 200
+
+    body = client.get(f"/clients/{client_id}/purchases", params={"country": "fr"}).json()
+    assert [item["purchaseCountry"] for item in body["items"]] == ["FRA"]
+
+    response = client.get(f"/clients/{client_id}/purchases", params={"country": "Narnia"})
+    assert response.status_code == 400
+
+
+# ---------------------------------------------------
+# 🗄️ Migración de columnas de texto
+# ---------------------------------------------------
+
+def test_migrate_text_country_columns(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE clients (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, country VARCHAR NOT NULL,
+                              monthly_income FLOAT NOT NULL, vise_club BOOLEAN, card_type VARCHAR NOT NULL);
+        CREATE TABLE purchases (id INTEGER PRIMARY KEY, client_id INTEGER REFERENCES clients (id), amount FLOAT NOT NULL,
+                                currency VARCHAR, purchase_date DATETIME NOT NULL, purchase_country VARCHAR NOT NULL);
+        INSERT INTO clients VALUES (1, 'A', 'Estados Unidos', 100, 0, 'Classic'), (2, 'B', 'UsssSA', 100, 0, 'Classic');
+        INSERT INTO purchases VALUES (1, 1, 10, 'USD', '2025-09-29 12:00:00', 'México'), (2, 2, 10, 'USD', '2025-09-29 12:00:00', 'Italy');
+    """)
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    assert migrate_country_codes(engine) == {"clients.country": ["UsssSA"]}
+    assert migrate_country_codes(engine) == {}  # ya migrado: no hace nada
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT id, country FROM clients ORDER BY id").fetchall() == [(1, 840), (2, countries.UNKNOWN)]
+    assert conn.execute("SELECT id, purchase_country FROM purchases ORDER BY id").fetchall() == [(1, 484), (2, 380)]
+    conn.close()
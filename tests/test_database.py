@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import make_url
+
+from app.main import app
+from app.database import engine, engine_options
+
+client = TestClient(app)
+
+
+def test_sqlite_pragmas_applied():
+    """Cada conexión SQLite recibe el perfil de PRAGMAs configurado."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+
+
+def test_memory_sqlite_skips_pool_sizing():
+    """SQLite en memoria no acepta tamaño de pool ni overflow."""
+    options = engine_options(make_url("sqlite://"))
+    assert "pool_size" not in options
+    assert "max_overflow" not in options
+
+
+def test_pool_status_reports_checkout_waits():
+    """El endpoint de monitoreo expone el estado del pool y las esperas."""
+    client.get("/cache/clients")
+    body = client.get("/db/pool").json()
+    assert body["checkouts"] >= 1
+    assert "waitMaxMs" in body
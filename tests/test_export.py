@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+# Filas sintéticas del test de memoria y techo de RSS adicional permitido (MiB).
+# El subproceso apaga el mmap y limita la caché de páginas de SQLite: esas memorias
+# están acotadas por configuración y ocultarían el consumo propio de la exportación.
+EXPORT_ROWS = int(os.getenv("EXPORT_TEST_ROWS", "1000000"))
+EXPORT_RSS_CEILING_MB = 32
+
+
+def test_export_ndjson_and_csv(register_client):
+    """Ambos formatos incluyen la compra con el descuento recalculado."""
+    client_id = register_client("Gold")
+    client.post("/purchase", json={
+        "clientId": client_id, "amount": 200, "currency": "USD",
+        "purchaseDate": "2025-09-29T12:00:00Z", "purchaseCountry": "USA",
+    })
+
+    response = client.get("/exports/purchases", params={"format": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    mine = [r for r in rows if r["clientId"] == client_id]
+    assert mine[-1]["discountApplied"] == 30.0
+    assert mine[-1]["finalAmount"] == 170.0
+    assert mine[-1]["benefit"] == "Lunes - Miércoles 15%"
+
+    response = client.get("/exports/purchases", params={"format": "csv"})
+    reader = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(reader) == len(rows)
+    assert [r for r in reader if r["clientId"] == str(client_id)][-1]["discountApplied"] == "30.0"
+
+
+def test_export_rejects_unknown_format():
+    assert client.get("/exports/purchases", params={"format": "xml"}).status_code == 422
+
+
+EXPORT_MEMORY_SCRIPT = textwrap.dedent("""
+    import resource, sqlite3, sys
+    from datetime import datetime, timedelta
+
+    rows, ceiling_mb = int(sys.argv[1]), int(sys.argv[2])
+    from app.database import engine
+    from app.migrate import migrate
+    migrate()
+
+    conn = sqlite3.connect(engine.url.database)
+    conn.execute("INSERT INTO clients (id, name, country, monthly_income, vise_club, card_type) "
+                 "VALUES (1, 'Mem', 840, 500000, 1, 'White')")
+    start = datetime(2025, 1, 1)
+    conn.executemany(
+        "INSERT INTO purchases (client_id, amount, currency, purchase_date, purchase_country) VALUES (1, ?, 'USD', ?, ?)",
+        (((50 + i % 300) * 100, (start + timedelta(minutes=i)).isoformat(" "), 840 if i % 4 else 604) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+    from app.routers.exports import iter_purchases_export
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    lines = sum(chunk.count(b"\\n") for chunk in iter_purchases_export("ndjson"))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    assert lines == rows, lines
+    print(f"baseline={baseline}MiB peak={peak}MiB")
+    assert peak - baseline < ceiling_mb, (baseline, peak)
+""")
+
+
+def test_export_memory_stays_flat(tmp_path):
+    """Exportar muchas filas no hace crecer el RSS más allá del techo fijo."""
+    result = subprocess.run(
+        [sys.executable, "-c", EXPORT_MEMORY_SCRIPT, str(EXPORT_ROWS), str(EXPORT_RSS_CEILING_MB)],
+        env={
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp_path / 'export.db'}",
+            "SQLITE_MMAP_SIZE": "0",
+            "SQLITE_CACHE_SIZE": "-2000",
+        },
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr[-2000:]
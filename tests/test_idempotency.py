@@ -0,0 +1,94 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app import idempotency
+from app.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def purchase(client_id, country="USA", amount=200):
+    return {"clientId": client_id, "amount": amount, "currency": "USD",
+            "purchaseDate": "2025-09-30T12:00:00", "purchaseCountry": country}
+
+
+def purchase_count(client_id):
+    return client.get(f"/clients/{client_id}/summary").json()["purchaseCount"]
+
+
+def test_retry_returns_original_response_without_inserting(register_client):
+    """Un reintento con la misma clave devuelve la respuesta original y no inserta otra compra."""
+    client_id = register_client()
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post("/purchase", json=purchase(client_id), headers=headers)
+    assert first.status_code == 200
+    assert "idempotent-replayed" not in first.headers
+
+    second = client.post("/purchase", json=purchase(client_id), headers=headers)
+    assert second.status_code == 200
+    assert second.headers["idempotent-replayed"] == "true"
+    assert second.content == first.content
+
+    # Sin la LRU, la respuesta sale de la tabla
+    idempotency.idempotency_cache.clear()
+    third = client.post("/purchase", json=purchase(client_id), headers=headers)
+    assert third.headers["idempotent-replayed"] == "true"
+    assert third.content == first.content
+    assert purchase_count(client_id) == 1
+
+
+def test_key_reused_with_another_purchase_is_rejected(register_client):
+    client_id = register_client()
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    assert client.post("/purchase", json=purchase(client_id), headers=headers).status_code == 200
+
+    response = client.post("/purchase", json=purchase(client_id, amount=300), headers=headers)
+    assert response.status_code == 422
+    assert response.json()["status"] == "Rejected"
+    assert purchase_count(client_id) == 1
+
+
+def test_rejection_is_replayed(register_client):
+    client_id = register_client("Black")
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post("/purchase", json=purchase(client_id, country="China"), headers=headers)
+    assert first.status_code == 400
+    second = client.post("/purchase", json=purchase(client_id, country="China"), headers=headers)
+    assert second.status_code == 400
+    assert second.headers["idempotent-replayed"] == "true"
+    assert second.content == first.content
+
+
+def test_expired_key_runs_the_purchase_again(monkeypatch, register_client):
+    """Pasada la ventana, la clave vencida se reemplaza y la compra se vuelve a procesar."""
+    monkeypatch.setattr(settings, "IDEMPOTENCY_TTL_SECONDS", -1)
+    client_id = register_client()
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    for _ in range(2):
+        response = client.post("/purchase", json=purchase(client_id), headers=headers)
+        assert response.status_code == 200
+        assert "idempotent-replayed" not in response.headers
+    assert purchase_count(client_id) == 2
+
+
+def test_concurrent_duplicate_returns_stored_response(monkeypatch, register_client):
+    """Si dos requests no ven la clave, el segundo choca en el INSERT y responde lo guardado."""
+    client_id = register_client()
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    first = client.post("/purchase", json=purchase(client_id), headers=headers)
+
+    async def amiss(db, key):
+        return None
+
+    monkeypatch.setattr(idempotency, "lookup", lambda db, key: None)
+    monkeypatch.setattr(idempotency, "alookup", amiss)
+    second = client.post("/purchase", json=purchase(client_id), headers=headers)
+    assert second.status_code == 200
+    assert second.headers["idempotent-replayed"] == "true"
+    assert second.content == first.content
+    assert purchase_count(client_id) == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+from app.database import async_engine
+from app.main import app
+from benchmarks.common import asgi_client
+from benchmarks.hurl import load_session, parse_hurl, run_sessions
+
+
+def test_parse_hurl_entries():
+    entries = parse_hurl("""
+# comentario
+POST {{host}}/client
+Content-Type: application/json
+{"name": "A", "cardType": "Gold"}
+HTTP 200
+[Captures]
+gold_id: jsonpath "$['clientId']"
+
+POST {{host}}/purchase
+{"clientId": {{ gold_id }}}
+HTTP *
+""")
+    assert [(e.method, e.path, e.status) for e in entries] == [("POST", "/client", 200), ("POST", "/purchase", None)]
+    assert entries[0].captures == {"gold_id": "$['clientId']"}
+    assert entries[0].body == '{"name": "A", "cardType": "Gold"}'
+
+
+def test_session_replays_without_errors():
+    """El escenario derivado de session.hurl corre completo contra la app."""
+    entries = load_session()
+    assert sum(e.path == "/purchase" for e in entries) >= 10
+
+    async def run():
+        try:
+            async with asgi_client(app) as client:
+                return await run_sessions(client, entries, sessions=3, concurrency=3)
+        finally:
+            # Las conexiones aiosqlite quedan ligadas a este event loop
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    stats = asyncio.run(run())
+    assert stats["errors"] == 0
+    assert stats["requests"] == 3 * len(entries)
@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from app import metrics as business_metrics
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def reader():
+    """Proveedor global con lector en memoria: los instrumentos ya creados se enlazan a él."""
+    reader = InMemoryMetricReader()
+    metrics.set_meter_provider(MeterProvider(metric_readers=[reader]))
+    return reader
+
+
+def points(reader, name):
+    """{atributos: punto} del instrumento `name` (acumulados desde el inicio)."""
+    data = reader.get_metrics_data()
+    found = {}
+    for resource in data.resource_metrics if data else ():
+        for scope in resource.scope_metrics:
+            for metric in scope.metrics:
+                if metric.name == name:
+                    for point in metric.data.data_points:
+                        found[frozenset(point.attributes.items())] = point
+    return found
+
+
+def count(reader, name, **attrs):
+    point = points(reader, name).get(frozenset(attrs.items()))
+    if point is None:
+        return 0
+    return point.value if hasattr(point, "value") else point.count
+
+
+def test_purchase_counters_by_card_and_reason(reader):
+    client_id = client.post("/client", json={
+        "name": "Metrics White", "country": "USA", "monthlyIncome": 5000,
+        "viseClub": True, "cardType": "White",
+    }).json()["clientId"]
+    before = {
+        "approved": count(reader, "vise.purchases", status="approved", card_type="White"),
+        "banned": count(reader, "vise.purchases", status="rejected", card_type="White", reason="banned_country"),
+        "missing": count(reader, "vise.purchases", status="rejected", card_type="unknown", reason="client_not_found"),
+        "rates": count(reader, "vise.purchase.discount_rate", card_type="White"),
+        "commits": count(reader, "vise.db.commit.duration", operation="purchase"),
+    }
+
+    base = {"amount": 150, "currency": "USD", "purchaseDate": "2025-09-30T12:00:00Z"}
+    client.post("/purchase", json={**base, "clientId": client_id, "purchaseCountry": "USA"})
+    client.post("/purchase", json={**base, "clientId": client_id, "purchaseCountry": "Vietnam"})
+    client.post("/purchase", json={**base, "clientId": 999999999, "purchaseCountry": "USA"})
+
+    assert count(reader, "vise.purchases", status="approved", card_type="White") == before["approved"] + 1
+    assert count(reader, "vise.purchases", status="rejected", card_type="White",
+                 reason="banned_country") == before["banned"] + 1
+    assert count(reader, "vise.purchases", status="rejected", card_type="unknown",
+                 reason="client_not_found") == before["missing"] + 1
+    assert count(reader, "vise.purchase.discount_rate", card_type="White") == before["rates"] + 1
+    assert count(reader, "vise.db.commit.duration", operation="purchase") >= before["commits"] + 1
+    assert count(reader, "vise.rules.calculate_discount.duration") >= 1
+
+
+def test_registration_counter_and_gauges(reader):
+    before = count(reader, "vise.client.registrations", status="rejected", card_type="Gold")
+    client.post("/client", json={
+        "name": "Metrics Gold", "country": "USA", "monthlyIncome": 100,
+        "viseClub": False, "cardType": "Gold",
+    })
+    assert count(reader, "vise.client.registrations", status="rejected", card_type="Gold") == before + 1
+
+    utilization = points(reader, "vise.client_cache.utilization")
+    assert len(utilization) == 1
+    assert 0 <= next(iter(utilization.values())).value <= 1
+    assert points(reader, "vise.client_cache.hit_ratio")
+    assert points(reader, "vise.db.pool.utilization")
+
+
+def test_hot_path_reuses_attribute_dicts():
+    """Los atributos se arman una vez por combinación y se reutilizan."""
+    business_metrics.record_approved_purchase("Gold", 0.15)
+    first = business_metrics._approved["Gold"]
+    business_metrics.record_approved_purchase("Gold", 0.0)
+    assert business_metrics._approved["Gold"] is first
@@ -0,0 +1,125 @@
+import sqlite3
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app import money
+from app.main import app
+from app.migrate import migrate_money_to_cents
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------
+# 💵 Conversión y redondeo
+# ---------------------------------------------------
+
+@pytest.mark.parametrize("value, cents", [
+    (250.75, 25075), ("250.75", 25075), (100, 10000), ("0.1", 10), (0.29, 29), (1e3, 100000), (-5.5, -550),
+])
+def test_to_cents(value, cents):
+    assert money.to_cents(value) == cents
+
+
+@pytest.mark.parametrize("value", [10.005, "1.999", "abc", "nan", "inf", True, 1e17, "1e30", "-1e17", "1e999999", "-1e999999"])
+def test_to_cents_rejects(value):
+    with pytest.raises(ValueError):
+        money.to_cents(value)
+
+
+def test_max_cents_fits_int64_discounts():
+    top = money.MAX_CENTS // money.CENTS
+    assert money.to_cents(top) == top * money.CENTS
+    discount = money.apply_rate(np.array([top * money.CENTS], dtype=np.int64), np.array([money.RATE_SCALE]))
+    assert int(discount[0]) == top * money.CENTS
+
+
+def test_apply_rate_rounds_half_up():
+    assert money.apply_rate(25075, 1500) == 3761   # 37.6125
+    assert money.apply_rate(10, 500) == 1          # 0.5 centavos → 1
+    assert money.apply_rate(9, 500) == 0           # 0.45 centavos → 0
+    assert money.apply_rate(20000, 0) == 0
+
+
+# ---------------------------------------------------
+# 🧾 API: entrada en unidades, aritmética en centavos
+# ---------------------------------------------------
+
+def test_purchase_amounts_are_exact():
+    client_id = client.post("/client", json={
+        "name": "Centavos", "country": "USA", "monthlyIncome": 500.00, "viseClub": False, "cardType": "Gold",
+    }).json()["clientId"]
+
+    body = client.post("/purchase", json={
+        "clientId": client_id, "amount": 250.75, "currency": "USD",
+        "purchaseDate": "2025-09-29T12:00:00", "purchaseCountry": "USA",
+    }).json()
+    assert body["purchase"]["discountApplied"] == 37.61
+    assert body["purchase"]["finalAmount"] == 213.14
+
+    for _ in range(3):
+        client.post("/purchase", json={
+            "clientId": client_id, "amount": 0.1, "currency": "USD",
+            "purchaseDate": "2025-10-02T12:00:00", "purchaseCountry": "USA",
+        })
+    summary = client.get(f"/clients/{client_id}/summary").json()
+    assert summary["totalAmount"] == 251.05
+    assert {m["key"]: m["totalAmount"] for m in summary["byMonth"]}["2025-10"] == 0.3
+
+
+def test_more_than_two_decimals_is_rejected():
+    response = client.post("/client", json={
+        "name": "Décimas", "country": "USA", "monthlyIncome": 499.999, "viseClub": False, "cardType": "Gold",
+    })
+    assert response.status_code == 422
+
+
+def test_out_of_range_amounts_are_rejected():
+    """Montos fuera de int64 responden 422 (o rechazo por fila al importar), no 500."""
+    response = client.post("/client", json={
+        "name": "Enorme", "country": "USA", "monthlyIncome": 1e17, "viseClub": False, "cardType": "Gold",
+    })
+    assert response.status_code == 422
+
+    purchase = {"clientId": 1, "amount": "1e30", "currency": "USD",
+                "purchaseDate": "2025-09-29T12:00:00", "purchaseCountry": "USA"}
+    assert client.post("/purchase", json=purchase).status_code == 422
+    assert client.post("/purchases/batch", json=[purchase]).status_code == 422
+    assert client.post("/purchase", json={**purchase, "amount": "1e999999"}).status_code == 422
+
+    body = "name,country,monthlyIncome,viseClub,cardType\nEnorme,USA,1e30,false,Gold\n"
+    response = client.post("/clients/import", content=body, headers={"content-type": "text/csv"})
+    summary, rejection = response.text.splitlines()
+    assert '"rejected":1' in summary
+    assert "monthlyIncome" in rejection
+
+
+# ---------------------------------------------------
+# 🗄️ Migración de columnas de punto flotante
+# ---------------------------------------------------
+
+def test_migrate_float_money_columns(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE clients (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, country SMALLINT NOT NULL,
+                              monthly_income FLOAT NOT NULL, vise_club BOOLEAN, card_type VARCHAR NOT NULL);
+        CREATE TABLE purchases (id INTEGER PRIMARY KEY, client_id INTEGER REFERENCES clients (id), amount FLOAT NOT NULL,
+                                currency VARCHAR, purchase_date DATETIME NOT NULL, purchase_country SMALLINT NOT NULL);
+        INSERT INTO clients VALUES (1, 'A', 840, 1000.5, 0, 'Classic');
+        INSERT INTO purchases VALUES (1, 1, 0.29, 'USD', '2025-09-29 12:00:00', 840), (2, 1, 250.75, 'USD', '2025-09-29 12:00:00', 840);
+    """)
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    assert migrate_money_to_cents(engine) == ["clients.monthly_income", "purchases.amount"]
+    assert migrate_money_to_cents(engine) == []  # ya migrado: no hace nada
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT monthly_income FROM clients").fetchall() == [(100050,)]
+    assert conn.execute("SELECT id, amount FROM purchases ORDER BY id").fetchall() == [(1, 29), (2, 25075)]
+    conn.close()
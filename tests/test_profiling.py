@@ -0,0 +1,134 @@
+import pstats
+
+import pytest
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind
+
+from app import profiling, telemetry
+from app.database import async_engine, engine
+from app.main import app as main_app
+from app.routers import client as client_router, purchases
+from app.tracing import build_sampler, instrument_app as instrument_tracing
+
+
+def profiled_client(monkeypatch, tmp_path, tracer_provider=None):
+    """App aislada con las rutas reales y el perfilado activo."""
+    monkeypatch.setattr(profiling.settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling.settings, "PROFILING_DIR", str(tmp_path))
+    app = FastAPI()
+    app.include_router(client_router.router)
+    app.include_router(purchases.router)
+    profiling.instrument_app(app)
+    if tracer_provider is not None:
+        instrument_tracing(app, tracer_provider=tracer_provider)
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def remove_engine_listeners():
+    """`instrument_app` deja listeners en los motores globales: se quitan al terminar cada prueba."""
+    yield
+    profiling.uninstrument_engine(engine)
+    if async_engine is not None:
+        profiling.uninstrument_engine(async_engine.sync_engine)
+
+
+@pytest.fixture(scope="module")
+def gold_client_id():
+    return TestClient(main_app).post("/client", json={
+        "name": "Profiled Gold", "country": "USA", "monthlyIncome": 800, "viseClub": False, "cardType": "Gold",
+    }).json()["clientId"]
+
+
+def purchase(client_id):
+    return {"clientId": client_id, "amount": 150, "currency": "USD",
+            "purchaseDate": "2025-09-29T12:00:00", "purchaseCountry": "USA"}
+
+
+def server_timing(response) -> dict:
+    """{fase: (ms, desc)} de la cabecera Server-Timing."""
+    phases = {}
+    for entry in response.headers["server-timing"].split(", "):
+        name, *params = entry.split(";")
+        values = dict(p.split("=", 1) for p in params)
+        phases[name] = (float(values["dur"]), values.get("desc", "").strip('"'))
+    return phases
+
+
+def test_disabled_by_default(gold_client_id):
+    response = TestClient(main_app).post("/purchase", json=purchase(gold_client_id))
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert profiling.phase("rules") is profiling._NOOP
+
+
+def test_server_timing_breaks_down_purchase(monkeypatch, tmp_path, gold_client_id):
+    response = profiled_client(monkeypatch, tmp_path).post("/purchase", json=purchase(gold_client_id))
+    assert response.status_code == 200
+
+    phases = server_timing(response)
+    assert list(phases) == [*profiling.PHASES, "total"]
+    assert int(phases["db"][1].split()[0]) >= 1  # al menos el INSERT de la compra
+    assert all(phases[name][0] > 0 for name in ("parse", "db", "rules", "commit", "encode"))
+    assert sum(phases[name][0] for name in profiling.PHASES) <= phases["total"][0]
+    assert list(tmp_path.iterdir()) == []  # sin captura cProfile
+
+
+def test_profile_header_writes_cprofile_capture(monkeypatch, tmp_path, gold_client_id):
+    client = profiled_client(monkeypatch, tmp_path)
+    response = client.post("/purchase", json=purchase(gold_client_id), headers={"X-Profile": "1"})
+    assert response.status_code == 200
+
+    (capture,) = tmp_path.glob("*-POST-purchase.prof")
+    functions = {name for _, _, name in pstats.Stats(str(capture)).stats}
+    assert "evaluate_purchase" in functions
+    assert functions & {"make_purchase", "make_purchase_async"}
+
+
+def test_breakdown_lands_on_server_span(monkeypatch, tmp_path, gold_client_id):
+    monkeypatch.setattr(telemetry.settings, "TRACING_PROFILE", "full")
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=build_sampler("full", 1.0))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    client = profiled_client(monkeypatch, tmp_path, tracer_provider=provider)
+    client.post("/purchase", json=purchase(gold_client_id))
+
+    (server,) = [s for s in exporter.get_finished_spans() if s.kind == SpanKind.SERVER]
+    assert server.attributes["vise.profile.db_queries"] >= 1
+    assert server.attributes["vise.profile.total_ms"] > 0
+
+
+
+def test_main_app_routes_mark_endpoint_edges():
+    """Todas las rutas de la app (también `/` y `/db/pool`) se construyen con `ProfiledRoute`."""
+    routes = [route for route in main_app.routes if isinstance(route, APIRoute)]
+    assert routes and all(isinstance(route, profiling.ProfiledRoute) for route in routes)
+    assert {"/", "/db/pool"} <= {route.path for route in routes}
+
+
+def test_profiled_route_marks_sync_and_async_endpoints(monkeypatch):
+    """`ProfiledRoute` envuelve el endpoint antes de construir la ruta: el endpoint ve su inicio marcado."""
+    monkeypatch.setattr(profiling.settings, "PROFILING_ENABLED", True)
+    starts = []
+    app = FastAPI()
+    app.router.route_class = profiling.ProfiledRoute
+
+    @app.get("/sync")
+    def sync_endpoint(value: int = 1):
+        starts.append((value, profiling._current.get().endpoint_start))
+
+    @app.get("/async")
+    async def async_endpoint(value: int = 1):
+        starts.append((value, profiling._current.get().endpoint_start))
+
+    profiling.instrument_app(app)
+    client = TestClient(app)
+    assert client.get("/sync", params={"value": 2}).status_code == 200
+    assert client.get("/async", params={"value": 3}).status_code == 200
+    assert [value for value, _ in starts] == [2, 3] and None not in [start for _, start in starts]
@@ -5,22 +5,6 @@ from app.main import app
 
 client = TestClient(app)
 
-# ---------------------------------------------------
-# ⚙️ Helpers: registrar clientes de prueba antes de comprar
-# ---------------------------------------------------
-def register_client(card_type, country="USA", income=3000, viseClub=True):
-    """Crea un cliente válido según el tipo de tarjeta."""
-    data = {
-        "name": f"Cliente_{card_type}",
-        "country": country,
-        "monthlyIncome": income,
-        "viseClub": viseClub,
-        "cardType": card_type,
-    }
-    response = client.post("/client", json=data)
-    assert response.status_code == 200, f"No se pudo registrar cliente {card_type}"
-    return response.json()["clientId"]
-
 
 # ---------------------------------------------------
 # 🧩 Casos de prueba de beneficios y restricciones
@@ -127,7 +111,7 @@ purchase_cases = [
 
 
 @pytest.mark.parametrize("case", purchase_cases)
-def test_purchase_discounts(case):
+def test_purchase_discounts(case, register_client):
     """Valida descuentos y restricciones de /purchase según tipo de tarjeta."""
     client_id = register_client(case["card"])
 
@@ -162,3 +146,32 @@ def test_purchase_discounts(case):
         expected_final = round(original * (1 - case["expected_discount"]), 2)
         # margen de tolerancia
         assert abs(purchase["finalAmount"] - expected_final) < 0.01, f"{case['card']} descuento incorrecto"
+
+
+def test_purchase_response_schema_is_typed():
+    """El 200 de /purchase documenta `PurchaseResult` y su detalle, no un dict genérico."""
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/purchase"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert ok["$ref"].endswith("/PurchaseResult")
+    detail = schema["components"]["schemas"]["PurchaseDetail"]["properties"]
+    assert set(detail) == {"clientId", "originalAmount", "discountApplied", "finalAmount", "benefit"}
+
+
+def test_purchase_responses_keep_wire_format(register_client):
+    """Aprobadas y rechazadas salen con los mismos campos que antes de tiparlas."""
+    client_id = register_client("Classic")
+    payload = {"clientId": client_id, "amount": 120, "currency": "USD",
+               "purchaseDate": "2025-09-29T12:00:00", "purchaseCountry": "USA"}
+
+    response = client.post("/purchase", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "status": "Approved",
+        "purchase": {"clientId": client_id, "originalAmount": 120, "discountApplied": 0,
+                     "finalAmount": 120, "benefit": None},
+    }
+
+    response = client.post("/purchase", json={**payload, "clientId": 999999999})
+    assert response.status_code == 400
+    assert response.json() == {"status": "Rejected", "error": "Cliente no encontrado"}
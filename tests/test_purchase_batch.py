@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schemas import MAX_BATCH_SIZE
+
+client = TestClient(app)
+
+
+def test_purchase_batch_keeps_input_order(register_client):
+    """El lote devuelve un resultado por compra, en el orden de entrada."""
+    gold_id = register_client("Gold")
+    black_id = register_client("Black")
+
+    payload = [
+        # Gold → martes >100 → 15%
+        {"clientId": gold_id, "amount": 200, "currency": "USD",
+         "purchaseDate": "2025-09-30T12:00:00Z", "purchaseCountry": "USA"},
+        # Black → país prohibido (rechazo)
+        {"clientId": black_id, "amount": 200, "currency": "USD",
+         "purchaseDate": "2025-10-01T12:00:00Z", "purchaseCountry": "China"},
+        # Cliente inexistente (rechazo)
+        {"clientId": 999999999, "amount": 50, "currency": "USD",
+         "purchaseDate": "2025-10-01T12:00:00Z", "purchaseCountry": "USA"},
+        # Black → sábado >200 → 35%
+        {"clientId": black_id, "amount": 260, "currency": "USD",
+         "purchaseDate": "2025-10-04T12:00:00Z", "purchaseCountry": "USA"},
+    ]
+
+    response = client.post("/purchases/batch", json=payload)
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    assert body["approved"] == 2
+    assert body["rejected"] == 2
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
+    assert [r["status"] for r in body["results"]] == ["Approved", "Rejected", "Rejected", "Approved"]
+    assert body["results"][0]["purchase"]["finalAmount"] == 170
+    assert body["results"][2]["error"] == "Cliente no encontrado"
+    assert body["results"][3]["purchase"]["discountApplied"] == 91
+    # Cada resultado solo trae `purchase` o `error`, no ambos con null
+    assert "error" not in body["results"][0]
+    assert "purchase" not in body["results"][1]
+
+
+def test_purchase_batch_empty():
+    """Un lote vacío no falla ni escribe en la base de datos."""
+    response = client.post("/purchases/batch", json=[])
+    assert response.status_code == 200
+    assert response.json() == {"status": "Processed", "approved": 0, "rejected": 0, "results": []}
+
+
+def test_purchase_batch_rejects_oversized_lot():
+    """Un lote de más de MAX_BATCH_SIZE compras responde 422 sin procesar ninguna."""
+    item = {"clientId": 1, "amount": 10, "currency": "USD",
+            "purchaseDate": "2025-10-01T12:00:00Z", "purchaseCountry": "USA"}
+    response = client.post("/purchases/batch", json=[item] * (MAX_BATCH_SIZE + 1))
+    assert response.status_code == 422
+    assert client.post("/purchases/batch", json=[]).status_code == 200
@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.database import engine
+
+client = TestClient(app)
+
+
+def seed_purchases(client_id, days, country="USA"):
+    payload = [
+        {"clientId": client_id, "amount": 10 + day, "currency": "USD",
+         "purchaseDate": f"2025-09-{day:02d}T12:00:00", "purchaseCountry": country}
+        for day in days
+    ]
+    assert client.post("/purchases/batch", json=payload).json()["approved"] == len(days)
+
+
+def test_history_keyset_pages(register_client):
+    """Las páginas recorren todo el historial sin repetir ni saltar compras."""
+    client_id = register_client("Classic")
+    seed_purchases(client_id, [1, 2, 3, 3, 4, 5, 6])
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get(f"/clients/{client_id}/purchases", params=params).json()
+        seen.extend(body["items"])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len({item["id"] for item in seen}) == 7
+    keys = [(item["purchaseDate"], item["id"]) for item in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_history_filters(register_client):
+    """Filtros por rango de fechas (desde incluido, hasta excluido) y país."""
+    client_id = register_client("Classic")
+    seed_purchases(client_id, [10, 11, 12])
+    seed_purchases(client_id, [11], country="France")
+
+    body = client.get(f"/clients/{client_id}/purchases", params={
+        "dateFrom": "2025-09-11T00:00:00", "dateTo": "2025-09-12T00:00:00",
+    }).json()
+    assert len(body["items"]) == 2
+
+    body = client.get(f"/clients/{client_id}/purchases", params={"country": "France"}).json()
+    assert [item["purchaseCountry"] for item in body["items"]] == ["FRA"]
+
+
+def test_history_errors(register_client):
+    assert client.get("/clients/999999999/purchases").status_code == 404
+    client_id = register_client("Classic")
+    assert client.get(f"/clients/{client_id}/purchases", params={"cursor": "%%%"}).status_code == 400
+
+
+def test_history_uses_composite_index():
+    """La consulta de la primera página se resuelve con el índice compuesto."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM purchases WHERE client_id = 1 "
+            "ORDER BY purchase_date DESC, id DESC LIMIT 51"
+        )).all()
+    assert any("ix_purchases_client_date_id" in row[-1] for row in plan), plan
@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def purchase(client_id, amount=260, date="2025-10-04T12:00:00", country="USA"):
+    return {"clientId": client_id, "amount": amount, "currency": "USD",
+            "purchaseDate": date, "purchaseCountry": country}
+
+
+def test_quote_matches_purchase_without_recording_it(register_client):
+    """La cotización da el mismo detalle que la compra y no la registra."""
+    client_id = register_client("Black")
+    cases = [
+        purchase(client_id),                                        # sábado >200 → 35%
+        purchase(client_id, amount=200),                            # sábado, en el umbral → sin descuento
+        purchase(client_id, date="2025-09-30T12:00:00"),            # martes >100 → 25%
+        purchase(client_id, amount=50, country="France"),           # exterior → 5%
+    ]
+
+    quotes = []
+    for payload in cases:
+        response = client.post("/purchase/quote", json=payload)
+        assert response.status_code == 200, response.text
+        assert response.json()["status"] == "Quoted"
+        quotes.append(response.json()["purchase"])
+    assert [q["discountApplied"] for q in quotes] == [91, 0, 65, 2.5]
+    assert client.get(f"/clients/{client_id}/summary").json()["purchaseCount"] == 0
+
+    for payload, quote in zip(cases, quotes):
+        assert client.post("/purchase", json=payload).json()["purchase"] == quote
+
+
+def test_quote_rejections(register_client):
+    black_id = register_client("Black")
+
+    response = client.post("/purchase/quote", json=purchase(black_id, country="China"))
+    assert response.status_code == 400
+    assert response.json() == {
+        "status": "Rejected",
+        "error": "El cliente con tarjeta Black no puede realizar compras desde China",
+    }
+
+    response = client.post("/purchase/quote", json=purchase(999999999))
+    assert response.status_code == 400
+    assert response.json()["error"] == "Cliente no encontrado"
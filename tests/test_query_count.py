@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.cache import client_cache
+from app.database import async_engine, engine
+
+client = TestClient(app)
+
+PURCHASE = {"amount": 200, "currency": "USD", "purchaseDate": "2025-09-29T12:00:00Z", "purchaseCountry": "USA"}
+
+
+@contextmanager
+def count_queries():
+    """Cuenta las sentencias SQL enviadas al motor dentro del bloque."""
+    statements = []
+    targets = [engine] if async_engine is None else [engine, async_engine.sync_engine]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in targets:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def test_register_client_single_statement():
+    """Registrar un cliente es un único INSERT ... RETURNING (sin SELECT de refresh)."""
+    with count_queries() as statements:
+        response = client.post("/client", json={
+            "name": "Query Classic", "country": "USA", "monthlyIncome": 300,
+            "viseClub": False, "cardType": "Classic",
+        })
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+    assert statements[0].startswith("INSERT INTO clients")
+
+
+def test_purchase_with_cached_client(register_client):
+    """Con el cliente en caché: el INSERT y el UPSERT del resumen."""
+    client_id = register_client("Gold")
+    with count_queries() as statements:
+        response = client.post("/purchase", json={"clientId": client_id, **PURCHASE})
+    assert response.status_code == 200
+    assert len(statements) == 2, statements
+
+
+def test_purchase_with_cold_cache(register_client):
+    """Sin caché: un SELECT del cliente, el INSERT y el UPSERT del resumen."""
+    client_id = register_client("Gold")
+    client_cache.invalidate(client_id)
+    with count_queries() as statements:
+        response = client.post("/purchase", json={"clientId": client_id, **PURCHASE})
+    assert response.status_code == 200
+    assert len(statements) == 3, statements
+
+
+def test_purchase_batch_statements(register_client):
+    """Un lote con clientes fríos: una consulta IN, un INSERT y un UPSERT en bloque."""
+    ids = [register_client("Gold"), register_client("Gold")]
+    for client_id in ids:
+        client_cache.invalidate(client_id)
+    with count_queries() as statements:
+        response = client.post("/purchases/batch", json=[{"clientId": i, **PURCHASE} for i in ids * 3])
+    assert response.json()["approved"] == 6
+    assert len(statements) == 3, statements
+
+
+def test_quote_with_cached_client_has_no_queries(register_client):
+    """Cotizar con el perfil en caché no toca la base de datos."""
+    client_id = register_client("Gold")
+    with count_queries() as statements:
+        response = client.post("/purchase/quote", json={"clientId": client_id, **PURCHASE})
+    assert response.status_code == 200
+    assert statements == []
+
+
+def test_quote_with_cold_cache(register_client):
+    """Sin caché: solo el SELECT del cliente."""
+    client_id = register_client("Gold")
+    client_cache.invalidate(client_id)
+    with count_queries() as statements:
+        response = client.post("/purchase/quote", json={"clientId": client_id, **PURCHASE})
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
@@ -0,0 +1,62 @@
+import itertools
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.rules import RULE_TABLE, calculate_discount, calculate_discounts
+
+CARDS = ["Classic", "Gold", "Platinum", "Black", "White", "Desconocida"]
+AMOUNTS = [0, 5_000, 10_000, 10_001, 15_000, 20_000, 20_001, 500_000]  # centavos
+MONDAY = datetime(2025, 9, 29, 12)
+USA, FRANCE = 840, 250
+
+
+# ---------------------------------------------------
+# 🧩 Casos conocidos de la tabla de reglas
+# ---------------------------------------------------
+@pytest.mark.parametrize("card, amount, weekday, purchase_country, expected", [
+    ("Classic", 30_000, 0, USA, (0, None)),
+    ("Gold", 15_000, 1, USA, (1500, "Lunes - Miércoles 15%")),
+    ("Gold", 15_000, 1, FRANCE, (1500, "Lunes - Miércoles 15%")),
+    ("Gold", 10_000, 1, USA, (0, None)),
+    ("Gold", 10_001, 1, USA, (1500, "Lunes - Miércoles 15%")),
+    ("Platinum", 5_000, 4, FRANCE, (500, "Exterior 5%")),
+    ("Platinum", 30_000, 5, USA, (3000, "Sábado 30%")),
+    ("Black", 20_000, 5, USA, (0, None)),
+    ("White", 15_000, 4, USA, (2500, "Lunes - Viernes 25%")),
+    ("White", 30_000, 6, USA, (3500, "Fin de semana 35%")),
+])
+def test_calculate_discount(card, amount, weekday, purchase_country, expected):
+    """La tabla compilada conserva las reglas de negocio (montos en centavos, tasas en puntos básicos)."""
+    date = MONDAY + timedelta(days=weekday)
+    assert calculate_discount(card, amount, date, purchase_country, USA) == expected
+
+
+def test_calculate_discounts_matches_scalar():
+    """La versión vectorizada da exactamente el mismo resultado que la escalar."""
+    rows = list(itertools.product(CARDS, AMOUNTS, range(7), [USA, FRANCE]))
+    dates = [MONDAY + timedelta(days=wd) for _, _, wd, _ in rows]
+
+    rates, codes = calculate_discounts({
+        "card_type": [card for card, _, _, _ in rows],
+        "amount": [amount for _, amount, _, _ in rows],
+        "date": np.array(dates, dtype="datetime64[us]"),
+        "purchase_country": [country for _, _, _, country in rows],
+        "client_country": [USA] * len(rows),
+    })
+
+    for (card, amount, _, country), date, rate, code in zip(rows, dates, rates, codes):
+        expected = calculate_discount(card, amount, date, country, USA)
+        assert (int(rate), RULE_TABLE.benefits[code]) == expected, (card, amount, date, country)
+
+
+def test_quote_matches_lookup():
+    """La memo por franja de monto da lo mismo que evaluar la tabla, también en los umbrales."""
+    amounts = AMOUNTS + [9_999, 19_999, 20_000, 2**62]
+    for card, amount, weekday, foreign in itertools.product(CARDS, amounts, range(7), (False, True)):
+        expected = RULE_TABLE.lookup(card, weekday, foreign, amount)
+        assert RULE_TABLE.quote(card, weekday, foreign, amount) == expected, (card, amount, weekday, foreign)
+        # Segunda llamada: sale de la memo
+        assert RULE_TABLE.quote(card, weekday, foreign, amount) == expected
+    assert ("Desconocida", 0, False, 0) not in RULE_TABLE._quotes
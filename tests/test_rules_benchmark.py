@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+from app.money import to_cents
+from app.rules import CardType, DISCOUNT_RULES
+from benchmarks.rules import discount_cases, regressions
+
+# El gate corre junto al resto de la suite, con más margen que el CLI (ver benchmarks/rules.py)
+TOLERANCE = float(os.getenv("RULES_BENCH_TOLERANCE", "0.5"))
+
+
+def test_discount_matrix_covers_every_combination():
+    cases = discount_cases()
+    thresholds = {to_cents(r.min_amount) for r in DISCOUNT_RULES if r.min_amount is not None}
+    amounts = {case[1] for case in cases}
+
+    assert {case[0] for case in cases} == {card.value for card in CardType}
+    assert {case[2].weekday() for case in cases} == set(range(7))
+    assert {case[3] == case[4] for case in cases} == {True, False}
+    for threshold in thresholds:
+        assert {threshold - 1, threshold, threshold + 1} <= amounts
+    assert len(cases) == len(CardType) * 7 * 2 * len(amounts)
+
+
+def test_regressions_flags_slower_functions():
+    baseline = {"results": {"calculate_discount": {"normalized": 4.0}}}
+    assert regressions({"calculate_discount": {"normalized": 4.8, "ns_per_op": 500}}, baseline, 0.25) == []
+    assert regressions({"calculate_discount": {"normalized": 5.2, "ns_per_op": 540}}, baseline, 0.25)
+
+
+def test_rules_within_stored_baseline():
+    """
+    Las reglas no son más lentas que la línea base guardada.
+
+    Corre en un proceso aparte: aquí otras pruebas registran un MeterProvider
+    real y la medición dejaría de ser comparable con la línea base.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.rules", "--tolerance", str(TOLERANCE), "--min-seconds", "0.05"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr[-2000:]
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.database import dispose_after_fork, engine
+from app.server import tune_for_workers
+from benchmarks.load import free_port
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for name in ("PURCHASE_GROUP_COMMIT", "SQLITE_JOURNAL_MODE", "SQLITE_BUSY_TIMEOUT_MS"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_tune_for_workers_sqlite_file(clean_env):
+    settings = Settings(DATABASE_URL="sqlite:///./vise.db", _env_file=None)
+    assert tune_for_workers(settings, 8) == {"PURCHASE_GROUP_COMMIT": True, "SQLITE_BUSY_TIMEOUT_MS": 8000}
+    assert settings.PURCHASE_GROUP_COMMIT is True
+
+
+def test_tune_for_workers_keeps_explicit_settings(clean_env):
+    settings = Settings(DATABASE_URL="sqlite:///./vise.db", PURCHASE_GROUP_COMMIT=False, _env_file=None)
+    assert tune_for_workers(settings, 2) == {}
+    assert settings.PURCHASE_GROUP_COMMIT is False
+
+
+def test_tune_for_workers_other_cases(clean_env):
+    assert tune_for_workers(Settings(DATABASE_URL="sqlite:///./vise.db", _env_file=None), 1) == {}
+    assert tune_for_workers(Settings(DATABASE_URL="postgresql://u:p@db/vise", _env_file=None), 4) == {}
+    with pytest.raises(ValueError):
+        tune_for_workers(Settings(DATABASE_URL="sqlite:///:memory:", _env_file=None), 2)
+
+
+def test_dispose_after_fork_replaces_pool():
+    pool = engine.pool
+    dispose_after_fork()
+    assert engine.pool is not pool
+
+
+def test_multi_worker_server(tmp_path):
+    """Dos workers precargados sobre el mismo archivo SQLite atienden escrituras concurrentes."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "2", "--bind", f"127.0.0.1:{port}"],
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'server.db'}"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    async def scenario():
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            for _ in range(300):
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    assert server.poll() is None, "el servidor terminó al arrancar"
+                    await asyncio.sleep(0.1)
+            registered = await client.post("/client", json={
+                "name": "Server Gold", "country": "USA", "monthlyIncome": 5000,
+                "viseClub": True, "cardType": "Gold",
+            })
+            client_id = registered.json()["clientId"]
+            responses = await asyncio.gather(*(
+                client.post("/purchase", json={
+                    "clientId": client_id, "amount": 200, "currency": "USD",
+                    "purchaseDate": "2025-09-30T12:00:00", "purchaseCountry": "USA",
+                })
+                for _ in range(40)
+            ))
+            assert [r.status_code for r in responses] == [200] * 40
+            summary = await client.get(f"/clients/{client_id}/summary")
+            assert summary.json()["purchaseCount"] == 40
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
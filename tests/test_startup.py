@@ -0,0 +1,17 @@
+import os
+
+from benchmarks.startup import measure
+
+# Presupuestos del arranque por defecto (sin telemetría configurada), en ms.
+# `python -X importtime` añade su propia sobrecarga; el margen cubre máquinas lentas.
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "2500"))
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "500"))
+
+
+def test_import_and_startup_within_budget(tmp_path):
+    """Importar y arrancar la app sin telemetría no carga SDKs y cabe en el presupuesto."""
+    stats = measure(repeat=2, env={"DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"})
+
+    assert stats["heavyModules"] == []
+    assert stats["importMs"] < IMPORT_BUDGET_MS, stats
+    assert stats["startupMs"] < STARTUP_BUDGET_MS, stats
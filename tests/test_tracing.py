@@ -0,0 +1,103 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind
+
+from app import telemetry
+from app.main import app as main_app
+from app.routers import client as client_router, purchases
+from app.tracing import build_sampler, instrument_app
+
+
+def traced_client(monkeypatch, profile, ratio):
+    """App aislada con las rutas reales, instrumentada con un proveedor en memoria."""
+    monkeypatch.setattr(telemetry.settings, "TRACING_PROFILE", profile)
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=build_sampler(profile, ratio))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(telemetry, "_rejection_tracer", None)
+    telemetry.use_tracer_provider(provider)
+
+    app = FastAPI()
+    app.include_router(client_router.router)
+    app.include_router(purchases.router)
+    app.get("/")(lambda: {"ok": True})
+    instrument_app(app, tracer_provider=provider)
+    return TestClient(app), exporter
+
+
+@pytest.fixture
+def black_client_id():
+    response = TestClient(main_app).post("/client", json={
+        "name": "Traced Black", "country": "USA", "monthlyIncome": 5000,
+        "viseClub": True, "cardType": "Black",
+    })
+    return response.json()["clientId"]
+
+
+def purchase(client_id, country):
+    return {"clientId": client_id, "amount": 150, "currency": "USD",
+            "purchaseDate": "2025-09-30T12:00:00Z", "purchaseCountry": country}
+
+
+def test_full_profile_one_server_span_and_excluded_root(monkeypatch, black_client_id):
+    """Una sola capa ASGI: un span de servidor por request; la raíz no se traza."""
+    client, exporter = traced_client(monkeypatch, "full", 1.0)
+
+    client.get("/")
+    assert exporter.get_finished_spans() == ()
+
+    client.post("/purchase", json=purchase(black_client_id, "USA"))
+    server = [s for s in exporter.get_finished_spans() if s.kind == SpanKind.SERVER]
+    assert len(server) == 1
+
+
+def test_unsampled_trace_still_keeps_rejected_purchase(monkeypatch, black_client_id):
+    """Con razón 0 solo sobrevive el span forzado del rechazo."""
+    client, exporter = traced_client(monkeypatch, "sampled", 0.0)
+
+    assert client.post("/purchase", json=purchase(black_client_id, "USA")).status_code == 200
+    assert exporter.get_finished_spans() == ()
+
+    assert client.post("/purchase", json=purchase(black_client_id, "China")).status_code == 400
+    spans = exporter.get_finished_spans()
+    assert [s.name for s in spans] == ["purchase.rejected"]
+    assert spans[0].attributes["vise.card_type"] == "Black"
+    assert "China" in spans[0].attributes["vise.purchase.rejection_reason"]
+
+
+def test_sampled_trace_records_rejection_as_event(monkeypatch, black_client_id):
+    client, exporter = traced_client(monkeypatch, "sampled", 1.0)
+
+    client.post("/purchase", json=purchase(black_client_id, "China"))
+    events = [e.name for s in exporter.get_finished_spans() for e in s.events]
+    assert "purchase.rejected" in events
+    assert all(s.name != "purchase.rejected" for s in exporter.get_finished_spans())
+
+
+def test_azure_only_keeps_rejected_purchase(monkeypatch):
+    """Sin OTLP, el span forzado usa el proveedor que registra Azure Monitor."""
+    import azure.monitor.opentelemetry as azure_monitor
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace.sampling import TraceIdRatioBased
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=TraceIdRatioBased(0.0))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    calls = []
+    monkeypatch.setenv("APPLICATIONINSIGHTS_CONNECTION_STRING", "InstrumentationKey=00000000-0000-0000-0000-000000000000")
+    monkeypatch.setattr(telemetry.settings, "TRACING_PROFILE", "sampled")
+    monkeypatch.setattr(azure_monitor, "configure_azure_monitor", lambda **options: calls.append(options))
+    monkeypatch.setattr(trace, "get_tracer_provider", lambda: provider)
+    monkeypatch.setattr(telemetry, "_rejection_tracer", None)
+
+    telemetry.setup_azure_monitor()
+    telemetry.trace_rejected_purchase("Compra rechazada", "Black")
+
+    assert calls and calls[0]["sampling_ratio"] == telemetry.settings.TRACING_SAMPLE_RATIO
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "purchase.rejected"
+    assert span.attributes["vise.purchase.rejection_reason"] == "Compra rechazada"
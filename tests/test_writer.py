@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from app.crud import PurchaseRecord, create_client
+from app.database import SessionLocal
+from app.writer import GroupCommitWriter, WriterStopped
+
+
+class CountingSessions:
+    """Fábrica de sesiones que cuenta cuántas transacciones se abrieron."""
+
+    def __init__(self):
+        self.sessions = 0
+
+    def __call__(self):
+        self.sessions += 1
+        return SessionLocal()
+
+
+@pytest.fixture(scope="module")
+def client_id():
+    with SessionLocal() as db:
+        new_id = create_client(db, {
+            "name": "Writer Classic", "country": 840, "monthly_income": 30_000,
+            "vise_club": False, "card_type": "Classic",
+        })
+        db.commit()
+    return new_id
+
+
+def purchase_row(client_id, amount=10_000):
+    return PurchaseRecord(
+        values={
+            "client_id": client_id,
+            "amount": amount,
+            "currency": "USD",
+            "purchase_date": datetime(2025, 9, 29, 12),
+            "purchase_country": 840,
+        },
+        discount=0,
+        benefit=None,
+    )
+
+
+def test_group_commit_batches_rows(client_id):
+    """Varias compras concurrentes se confirman en menos commits que filas."""
+    sessions = CountingSessions()
+    writer = GroupCommitWriter(sessions, max_rows=50, max_delay=0.05)
+    try:
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            futures = list(pool.map(lambda _: writer.submit(purchase_row(client_id)), range(100)))
+        ids = [f.result(timeout=5) for f in futures]
+    finally:
+        writer.stop()
+
+    assert len(set(ids)) == 100
+    assert sessions.sessions < 100
+
+
+def test_group_commit_isolates_failed_row(client_id):
+    """Si una fila falla, solo su petición recibe el error."""
+    writer = GroupCommitWriter(SessionLocal, max_rows=10, max_delay=0.05)
+    try:
+        good = writer.submit(purchase_row(client_id))
+        bad = writer.submit(purchase_row(client_id, amount=None))  # amount es NOT NULL
+        other = writer.submit(purchase_row(client_id))
+        assert isinstance(good.result(timeout=5), int)
+        assert isinstance(other.result(timeout=5), int)
+        with pytest.raises(Exception):
+            bad.result(timeout=5)
+    finally:
+        writer.stop()
+
+
+class BlockingSessions:
+    """Fábrica de sesiones que retiene al escritor hasta `release`."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.release.wait(5)
+        return SessionLocal()
+
+
+def test_write_times_out_and_cancels_queued_row(client_id):
+    """Si el commit no llega a tiempo el handler recibe TimeoutError y la fila en cola se descarta."""
+    sessions = BlockingSessions()
+    writer = GroupCommitWriter(sessions, max_rows=1, max_delay=0, timeout=0.05)
+    try:
+        first = writer.submit(purchase_row(client_id))  # retiene al escritor
+        with pytest.raises(TimeoutError):
+            writer.write(purchase_row(client_id))
+        with pytest.raises(TimeoutError):
+            asyncio.run(writer.awrite(purchase_row(client_id)))
+        sessions.release.set()
+        assert isinstance(first.result(timeout=5), int)
+    finally:
+        sessions.release.set()
+        writer.stop()
+
+
+def test_rows_queued_behind_stop_fail_instead_of_hanging(client_id):
+    sessions = BlockingSessions()
+    writer = GroupCommitWriter(sessions, max_rows=10, max_delay=0.05)
+    first = writer.submit(purchase_row(client_id))
+    q = writer._queue
+    writer.stop(timeout=0)
+    late = Future()
+    q.put((purchase_row(client_id), late))  # un submit que tomó la cola antes de stop
+    sessions.release.set()
+
+    assert isinstance(first.result(timeout=5), int)
+    with pytest.raises(WriterStopped):
+        late.result(timeout=5)